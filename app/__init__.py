@@ -27,6 +27,8 @@ from app.api.v1.routes_places import api as places_ns
 from app.api.v1.routes_amenities import api as amenities_ns
 from app.api.v1.routes_reviews import api as reviews_ns
 from app.api.v1.routes_login import api as login_ns
+from app.api.v1.routes_monitoring import monitoring_bp
+from app.api.v1.routes_monitoring import api as monitoring_ns
 from app.services.facade import HBnBFacade
 from app.services.facade_user import UserFacade
 from app.services.facade_place import PlaceFacade
@@ -35,6 +37,8 @@ from app.services.facade_review import ReviewFacade
 from app.services.facade_relations_manager import FacadeRelationManager
 from app.services.sqlalchemy_facade_relation_manager import SQLAlchemyFacadeRelationManager
 from app.persistence.repo_selector import RepoSelector
+from app.persistence.repository import MULTI_VALUED, GEO, SORTED, TEXT
+from app.persistence.db_engine import MonitoredQueuePool, set_statement_timeout
 
 
 def create_app(config_name='default'):
@@ -53,32 +57,46 @@ def create_app(config_name='default'):
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API')
     bcrypt.init_app(app)
     jwt.init_app(app)
+
+    # Pooled database engines time their checkouts for /api/v1/monitoring
+    if app.config.get('SQLALCHEMY_POOL_MONITORING'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(
+            app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}), poolclass=MonitoredQueuePool
+        )
+
     db.init_app(app)
 
+    if app.config.get('SQLALCHEMY_STATEMENT_TIMEOUT'):
+        with app.app_context():
+            set_statement_timeout(db.engine, app.config['SQLALCHEMY_STATEMENT_TIMEOUT'])
+
     # Initialize repositories
     repo_type = app.config.get('REPO_TYPE', 'in_memory')
-    user_repo_selector = RepoSelector(repo_type, "user_data.json")
-    place_repo_selector = RepoSelector(repo_type, "place_data.json")
-    amenity_repo_selector = RepoSelector(repo_type, "amenity_data.json")
-    review_repo_selector = RepoSelector(repo_type, "review_data.json")
-
-    # Check if using a database repository and pass the models
-    if repo_type == 'in_DB':
-        user_repo = user_repo_selector.select_repo(User)
-        place_repo = place_repo_selector.select_repo(Place)
-        amenity_repo = amenity_repo_selector.select_repo(Amenity)
-        review_repo = review_repo_selector.select_repo(Review)
-    else:
-        # For in-memory or file repositories, no need to pass the model
-        user_repo = user_repo_selector.select_repo()
-        place_repo = place_repo_selector.select_repo()
-        amenity_repo = amenity_repo_selector.select_repo()
-        review_repo = review_repo_selector.select_repo()
+    file_options = {
+        'storage_mode': app.config.get('FILE_STORAGE_MODE', 'snapshot'),
+        'compact_threshold': app.config.get('FILE_LOG_COMPACT_THRESHOLD', 4 * 1024 * 1024),
+        'flush_interval': app.config.get('FILE_FLUSH_INTERVAL'),
+        'flush_max_changes': app.config.get('FILE_FLUSH_MAX_CHANGES'),
+        'snapshot_format': app.config.get('FILE_SNAPSHOT_FORMAT', 'json'),
+        'max_resident': app.config.get('FILE_MAX_RESIDENT_OBJECTS'),
+    }
+    cache_options = app.config.get('REPO_CACHE', {})
+    user_repo_selector = RepoSelector(repo_type, "user_data.json", {"email": True}, file_options, cache_options.get('user'))
+    place_repo_selector = RepoSelector(repo_type, "place_data.json", {"title": True, "owner_id": False, "amenities": MULTI_VALUED, ("latitude", "longitude"): GEO, "price": SORTED, "average_rating": SORTED, ("title", "description"): TEXT}, file_options, cache_options.get('place'))
+    amenity_repo_selector = RepoSelector(repo_type, "amenity_data.json", {"name": True}, file_options, cache_options.get('amenity'))
+    review_repo_selector = RepoSelector(repo_type, "review_data.json", {"place_id": False, "user_id": False, ("user_id", "place_id"): True, ("text",): TEXT}, file_options, cache_options.get('review'))
+
+    # The database repository queries the models, the in-memory and file
+    # repositories store their lightweight record counterparts
+    user_repo = user_repo_selector.select_repo(User)
+    place_repo = place_repo_selector.select_repo(Place)
+    amenity_repo = amenity_repo_selector.select_repo(Amenity)
+    review_repo = review_repo_selector.select_repo(Review)
 
     # Initialize facades
     user_facade = UserFacade(user_repo)
-    place_facade = PlaceFacade(place_repo)
-    review_facade = ReviewFacade(review_repo)
+    place_facade = PlaceFacade(place_repo, review_repo)
+    review_facade = ReviewFacade(review_repo, place_repo)
     amenity_facade = AmenityFacade(amenity_repo)
 
     # Initialize Facade with existing facades
@@ -97,6 +115,7 @@ def create_app(config_name='default'):
     app.register_blueprint(amenities_bp)
     app.register_blueprint(reviews_bp)
     app.register_blueprint(login_bp)
+    app.register_blueprint(monitoring_bp)
 
     # Register the namespaces
     api.add_namespace(users_ns, path='/api/v1/users')
@@ -104,6 +123,7 @@ def create_app(config_name='default'):
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(login_ns, path='/api/v1/login')
+    api.add_namespace(monitoring_ns, path='/api/v1/monitoring')
 
     print(f"Starting the app with config: {config_name}")
     print(f"Starting the app with storage: {repo_type}")
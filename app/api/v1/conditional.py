@@ -0,0 +1,116 @@
+"""
+conditional.py
+
+Conditional GET support of the read endpoints. Successful responses carry
+a strong ETag, and a request whose If-None-Match lists it is answered with
+304 Not Modified and no body. The ETag of a single resource is derived
+from its id and version, probed before the object is loaded or
+serialized; the ETag of a list is a hash of its marshalled content.
+"""
+
+import hashlib
+import json
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_restx.utils import unpack
+from werkzeug.http import quote_etag
+
+conditional_params = {
+    'If-None-Match': {
+        'description': 'ETag of a previous response, answered with 304 Not Modified while it matches',
+        'in': 'header',
+        'type': 'string',
+        'required': False
+    }
+}
+
+
+def make_etag(*parts):
+    """
+    Hash the parts identifying a representation into an entity tag.
+
+    Returns:
+        str: The unquoted entity tag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+
+    return digest.hexdigest()
+
+
+def content_etag(data):
+    """
+    Build the entity tag of a marshalled response body.
+
+    Args:
+        data: The marshalled body.
+
+    Returns:
+        str: The unquoted entity tag.
+    """
+    return make_etag(json.dumps(data, sort_keys=True, separators=(',', ':')))
+
+
+def not_modified(etag):
+    """
+    Build the 304 Not Modified response of a matching conditional request.
+
+    Args:
+        etag (str): Entity tag of the current representation.
+
+    Returns:
+        Response: The bodyless response.
+    """
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def conditional(version=None):
+    """
+    Decorator answering conditional GET requests. It goes above the
+    marshalling decorator, and below `streamable` so streamed responses are
+    left untouched.
+
+    Args:
+        version (callable, optional): Called with the facade and the route
+        arguments, returns the version of the resource or None when it does
+        not exist. Without it the ETag hashes the marshalled body.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            etag = None
+
+            if version is not None:
+                token = version(current_app.extensions['HBNB_FACADE'], **kwargs)
+
+                if token is not None:
+                    etag = make_etag(*kwargs.values(), token)
+
+                    if request.if_none_match.contains_weak(etag):
+                        return not_modified(etag)
+
+            data, code, headers = unpack(f(*args, **kwargs))
+
+            if code != 200:
+                return data, code, headers
+
+            if etag is None:
+                etag = content_etag(data)
+
+                if request.if_none_match.contains_weak(etag):
+                    return not_modified(etag)
+
+            return data, code, dict(headers or {}, ETag=quote_etag(etag))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,72 @@
+"""
+pagination.py
+
+Query parameters and response headers shared by the paginated list
+endpoints. A list endpoint is paginated as soon as `limit` or `cursor` is
+given; the cursor of the next page is returned in the X-Next-Cursor
+header and is absent on the last page.
+"""
+
+from flask import request
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+pagination_params = {
+    'limit': {
+        'description': f'Maximum number of items in the page, at most {MAX_PAGE_SIZE}',
+        'in': 'query',
+        'type': 'integer',
+        'required': False
+    },
+    'cursor': {
+        'description': f'Cursor returned in the {NEXT_CURSOR_HEADER} header of the previous page',
+        'in': 'query',
+        'type': 'string',
+        'required': False
+    }
+}
+
+
+def requested_page():
+    """
+    Read the pagination parameters of the current request.
+
+    Returns:
+        tuple: (cursor, limit) when a page is requested, None otherwise.
+
+    Raises:
+        ValueError: If `limit` is not an integer between 1 and MAX_PAGE_SIZE.
+    """
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit')
+
+    if cursor is None and limit is None:
+        return None
+
+    if limit is None:
+        return cursor, DEFAULT_PAGE_SIZE
+
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise ValueError(f"limit must be an integer, got: {limit}")
+
+    if not (0 < limit <= MAX_PAGE_SIZE):
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+
+    return cursor, limit
+
+
+def next_cursor_headers(next_cursor):
+    """
+    Build the response headers announcing the next page.
+
+    Args:
+        next_cursor (str, optional): Cursor of the next page.
+
+    Returns:
+        dict: Headers to add to the response.
+    """
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
@@ -21,6 +21,10 @@ from flask import Blueprint, current_app, request, abort
 from flask_restx import api, Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
 
+from app.api.v1.pagination import pagination_params, requested_page, next_cursor_headers
+from app.api.v1.streaming import stream_params, streamable
+from app.api.v1.conditional import conditional_params, conditional
+
 amenities_bp = Blueprint('amenities', __name__)
 api = Namespace('amenities', description='Amenity operations')
 
@@ -82,11 +86,15 @@ class AmenityList(Resource):
         except Exception as e:
             return {'error': 'An unexpected error occurred', 'details': str(e)}, 500
 
-    @api.doc('get_all_amenities')
+    @api.doc('get_all_amenities', params={**pagination_params, **stream_params, **conditional_params})
+    @streamable(amenity_model, lambda facade: facade.amenity_facade.iter_amenities())
+    @conditional()
     @api.marshal_with(amenity_model, code=201)  # type: ignore
     def get(self):
         """
-        Retrieves a list of all amenities.
+        Retrieves a list of all amenities, or one page of them when `limit`
+        or `cursor` is given.
+        Streamed as NDJSON with `?stream=1` or `Accept: application/x-ndjson`.
 
         Returns:
             List of amenities in JSON format.
@@ -94,6 +102,13 @@ class AmenityList(Resource):
         try:
             facade = current_app.extensions['HBNB_FACADE']
 
+            page = requested_page()
+
+            if page:
+                amenities, next_cursor = facade.amenity_facade.get_amenities_page(*page)
+
+                return amenities, 200, next_cursor_headers(next_cursor)
+
             amenities = facade.amenity_facade.get_all_amenities()
 
             return amenities
@@ -112,7 +127,8 @@ class AmenityList(Resource):
 class Amenity(Resource):
     """Resource for retrieving, updating, or deleting a specific amenity by ID."""
 
-    @api.doc('get_amenity')
+    @api.doc('get_amenity', params=conditional_params)
+    @conditional(lambda facade, amenity_id: facade.amenity_facade.get_amenity_version(amenity_id))
     @api.marshal_with(amenity_model)  # type: ignore
     def get(self, amenity_id):
         """
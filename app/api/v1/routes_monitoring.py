@@ -0,0 +1,132 @@
+"""
+routes_monitoring.py
+
+This module defines Flask routes exposing runtime metrics of the
+application, such as the state of the database connection pool.
+
+Classes:
+    DatabasePool (Resource): Reports the connection pool of the database
+        engine.
+    RepositoryCache (Resource): Reports the read-through caches of the
+        repositories.
+
+Attributes:
+    monitoring_bp (Blueprint): Flask blueprint for monitoring routes.
+    api (Namespace): Namespace for monitoring endpoints.
+    pool_status_model (model): Model schema for the pool status response.
+    repo_cache_model (model): Model schema for the cache counters response.
+"""
+
+from flask import Blueprint, abort, current_app
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
+
+from app.extensions import db
+from app.persistence.db_engine import pool_status
+from app.persistence.caching import CachingRepository
+
+
+monitoring_bp = Blueprint('monitoring', __name__)
+api = Namespace('monitoring', description='Monitoring operations')
+
+pool_status_model = api.model('Pool_status', {
+    'pool_class': fields.String(description='Class of the connection pool', example='MonitoredQueuePool'),
+    'pool_size': fields.Integer(description='Connections kept in the pool', example=10),
+    'checked_in': fields.Integer(description='Idle connections in the pool', example=8),
+    'checked_out': fields.Integer(description='Connections in use', example=2),
+    'overflow': fields.Integer(description='Overflow connections open beyond pool_size', example=0),
+    'checkouts': fields.Integer(description='Connections checked out since startup', example=1520),
+    'checkout_timeouts': fields.Integer(description='Checkouts that timed out waiting', example=0),
+    'avg_checkout_ms': fields.Float(description='Average checkout latency in ms', example=0.042),
+    'max_checkout_ms': fields.Float(description='Highest checkout latency in ms', example=3.5),
+    'peak_overflow': fields.Integer(description='Highest overflow in use at once', example=4),
+})
+
+repo_cache_model = api.model('Repository_cache', {
+    'entity': fields.String(description='Entity of the cached repository', example='place'),
+    'hits': fields.Integer(description='Lookups answered from the cache', example=9850),
+    'misses': fields.Integer(description='Lookups sent to the repository', example=150),
+    'evictions': fields.Integer(description='Entries dropped when full or expired', example=12),
+    'size': fields.Integer(description='Cached lookups', example=140),
+    'max_size': fields.Integer(description='Maximum number of cached lookups', example=1024),
+    'ttl': fields.Float(description='Lifetime of a cached lookup in seconds', example=300),
+})
+
+auth_header = {'Authorization': {
+        'description': 'Bearer <JWT Token>',
+        'in': 'header',
+        'type': 'string',
+        'required': True
+    }
+}
+
+#   <------------------------------------------------------------------------>
+
+
+@api.route('/db-pool')
+class DatabasePool(Resource):
+    """Resource reporting the database connection pool."""
+
+    @api.doc('get_db_pool_status', params=auth_header)
+    @api.marshal_with(pool_status_model)
+    @jwt_required()
+    def get(self):
+        """
+        Retrieves the state of the database connection pool and its
+        checkout statistics. Admin only.
+
+        Returns:
+            JSON object with the pool metrics.
+        """
+        try:
+            current_user = get_jwt_identity()
+            if not current_user.get('is_admin'):
+                raise ValueError('error: Admin privileges required')
+
+            return pool_status(db.engine), 200
+
+        except ValueError as e:
+            abort(400, str(e))
+
+        except Exception as e:
+            return {'error': 'An unexpected error occurred', 'details': str(e)}, 500
+
+#   <------------------------------------------------------------------------>
+
+
+@api.route('/repo-cache')
+class RepositoryCache(Resource):
+    """Resource reporting the read-through caches of the repositories."""
+
+    @api.doc('get_repo_cache_stats', params=auth_header)
+    @api.marshal_list_with(repo_cache_model)
+    @jwt_required()
+    def get(self):
+        """
+        Retrieves the hit, miss and eviction counters of each cached
+        repository, see REPO_CACHE. Admin only.
+
+        Returns:
+            JSON list with the counters of each cached entity.
+        """
+        try:
+            current_user = get_jwt_identity()
+            if not current_user.get('is_admin'):
+                raise ValueError('error: Admin privileges required')
+
+            facade = current_app.extensions['HBNB_FACADE']
+            repos = {
+                'user': facade.user_facade.user_repo,
+                'place': facade.place_facade.place_repo,
+                'amenity': facade.amenity_facade.amenity_repo,
+                'review': facade.review_facade.review_repo,
+            }
+
+            return [dict(repo.stats(), entity=entity) for entity, repo in repos.items()
+                    if isinstance(repo, CachingRepository)], 200
+
+        except ValueError as e:
+            abort(400, str(e))
+
+        except Exception as e:
+            return {'error': 'An unexpected error occurred', 'details': str(e)}, 500
@@ -7,6 +7,10 @@ related resources, like amenities and reviews associated with each place.
 
 Classes:
     PlaceList (Resource): Manages retrieval of all places.
+    PlaceNearby (Resource): Searches the places around a point or inside a
+        map view.
+    PlaceSearch (Resource): Searches the places by the words of their texts
+        and reviews.
     PlaceResource (Resource): Handles retrieval, updating, and deletion of a
         specific place.
     PlaceUserOwnerDetails (Resource): Deletes a place from both place and user
@@ -38,6 +42,9 @@ from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
 
 from app.api.v1.routes_reviews import review_model
 from app.api.v1.routes_amenities import amenity_model, amenity_creation_model
+from app.api.v1.pagination import pagination_params, requested_page, next_cursor_headers, DEFAULT_PAGE_SIZE
+from app.api.v1.streaming import stream_params, streamable
+from app.api.v1.conditional import conditional_params, conditional
 
 
 places_bp = Blueprint('places', __name__)
@@ -55,6 +62,10 @@ place_model = api.model('Place', {
     'longitude': fields.Float(required=True, description='Longitude coordinates of the place', example='54.4577'),
     'owner_first_name': fields.String(required=False, description='First_name of the owner of those places', example="Johnny"),
     'owner_id': fields.String(required=True, description='Id of the owner of the place', example='0defc403-97f3-4784-83c2-363dd7982c61'),
+    'review_count': fields.Integer(required=False, description='Number of reviews, given in response', example=4),
+    'rating_sum': fields.Integer(required=False, description='Sum of the review ratings, given in response', example=17),
+    'rating_histogram': fields.List(fields.Integer, required=False, description='Number of reviews rated 1 to 5, given in response', example=[0, 0, 1, 1, 2]),
+    'average_rating': fields.Float(required=False, description='Average review rating, null without reviews', example=4.25),
     'created_at': fields.String(required=False, description='Time of creation, given in response', example=''),
     'updated_at': fields.String(required=False, description='Time of update, given in response', example=''),
 })
@@ -96,23 +107,106 @@ auth_header = {'Authorization': {
     }
 }
 
+listing_params = {
+    'sort': {'description': 'Order of the places: created_at (oldest first, default), price (cheapest first) or rating (best rated first, places without reviews last)', 'in': 'query', 'type': 'string', 'required': False},
+    'min_price': {'description': 'Lowest price per night, included', 'in': 'query', 'type': 'number', 'required': False},
+    'max_price': {'description': 'Highest price per night, included', 'in': 'query', 'type': 'number', 'required': False},
+}
+
+nearby_params = {
+    'lat': {'description': 'Latitude of the point to search around', 'in': 'query', 'type': 'number', 'required': False},
+    'lon': {'description': 'Longitude of the point to search around', 'in': 'query', 'type': 'number', 'required': False},
+    'radius_km': {'description': 'Search radius around the point, in kilometers', 'in': 'query', 'type': 'number', 'required': False},
+    'bbox': {'description': 'Map view to search instead, as min_lon,min_lat,max_lon,max_lat', 'in': 'query', 'type': 'string', 'required': False},
+}
+
+nearby_place_model = api.inherit('Nearby_place', place_model, {
+    'distance_km': fields.Float(required=False, description='Distance from the searched point, null for a bbox search', example=1.234),
+})
+
+# Default and largest number of search results
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+search_params = {
+    'q': {'description': 'Words to search in the title, description and reviews of the places', 'in': 'query', 'type': 'string', 'required': True},
+    'limit': {'description': f'Maximum number of places, at most {SEARCH_MAX_LIMIT}', 'in': 'query', 'type': 'integer', 'required': False},
+}
+
+search_place_model = api.inherit('Search_place', place_model, {
+    'score': fields.Float(required=False, description='Relevance of the place to the query, higher is better', example=3.1416),
+})
+
+
+def requested_listing():
+    """
+    Read the sort and price range parameters of the current request.
+
+    Returns:
+        dict: The ones given, as keyword arguments of get_places_page.
+
+    Raises:
+        ValueError: If a price is not a number.
+    """
+    listing = {}
+
+    if 'sort' in request.args:
+        listing['sort'] = request.args['sort']
+
+    for name in ('min_price', 'max_price'):
+        if name in request.args:
+            listing[name] = float_arg(name)
+
+    return listing
+
+
+def float_arg(name):
+    """
+    Read a required float query parameter of the current request.
+
+    Raises:
+        ValueError: If the parameter is missing or not a number.
+    """
+    value = request.args.get(name)
+
+    if value is None:
+        raise ValueError(f"{name} is required.")
+
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got: {value}")
+
+
 @api.route('/')
 class PlaceList(Resource):
     """Resource for retrieving all places."""
 
-    @api.doc('get_all_places')
+    @api.doc('get_all_places', params={**pagination_params, **listing_params, **stream_params, **conditional_params})
+    @streamable(place_model, lambda facade: facade.place_facade.iter_places())
+    @conditional()
     @api.marshal_list_with(place_model)
     def get(self):
         """
-        Retrieves all places.
+        Retrieves all places, or one page of them when `limit` or `cursor`
+        is given. Pages can be sorted with `sort` and narrowed to a price
+        range with `min_price` and `max_price`.
+        Streamed as NDJSON with `?stream=1` or `Accept: application/x-ndjson`.
 
         Returns:
-            JSON array of all places, with place attributes.
+            JSON array of places, with place attributes.
         """
         try:
             facade = current_app.extensions['HBNB_FACADE']
 
-        
+            page = requested_page()
+            listing = requested_listing()
+
+            if page or listing:
+                places, next_cursor = facade.place_facade.get_places_page(*(page or (None, DEFAULT_PAGE_SIZE)), **listing)
+
+                return places, 200, next_cursor_headers(next_cursor)
+
             places = facade.place_facade.get_all_places()
 
             if not places:
@@ -129,12 +223,96 @@ class PlaceList(Resource):
  #   <------------------------------------------------------------------------>
 
 
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    """Resource for searching the places around a point or inside a map view."""
+
+    @api.doc('get_places_nearby', params=nearby_params)
+    @api.marshal_list_with(nearby_place_model)
+    def get(self):
+        """
+        Retrieves the places within `radius_km` of `lat`/`lon`, nearest
+        first, or the places inside `bbox` when it is given.
+
+        Returns:
+            JSON array of places, with their distance to the point.
+        """
+        try:
+            facade = current_app.extensions['HBNB_FACADE']
+
+            bbox = request.args.get('bbox')
+
+            if bbox is not None:
+                try:
+                    min_lon, min_lat, max_lon, max_lat = (float(bound) for bound in bbox.split(','))
+                except ValueError:
+                    raise ValueError(f"bbox must be min_lon,min_lat,max_lon,max_lat, got: {bbox}")
+
+                return facade.place_facade.get_places_in_box(min_lat, min_lon, max_lat, max_lon), 200
+
+            places = facade.place_facade.get_places_nearby(float_arg('lat'), float_arg('lon'), float_arg('radius_km'))
+
+            return places, 200
+
+        except ValueError as e:
+            abort(400, str(e))
+
+        except Exception as e:
+            return {'error': 'An unexpected error occurred', 'details': str(e)}, 500
+
+ #   <------------------------------------------------------------------------>
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    """Resource for searching the places by the words of their texts and reviews."""
+
+    @api.doc('search_places', params=search_params)
+    @api.marshal_list_with(search_place_model)
+    def get(self):
+        """
+        Retrieves the places whose title, description or reviews contain
+        words of `q`, most relevant first.
+
+        Returns:
+            JSON array of places, with their relevance score.
+        """
+        try:
+            facade = current_app.extensions['HBNB_FACADE']
+
+            query = request.args.get('q')
+
+            if query is None:
+                raise ValueError("q is required.")
+
+            limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT)
+
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise ValueError(f"limit must be an integer, got: {limit}")
+
+            if not (0 < limit <= SEARCH_MAX_LIMIT):
+                raise ValueError(f"limit must be between 1 and {SEARCH_MAX_LIMIT}.")
+
+            return facade.place_facade.search_places(query, limit), 200
+
+        except ValueError as e:
+            abort(400, str(e))
+
+        except Exception as e:
+            return {'error': 'An unexpected error occurred', 'details': str(e)}, 500
+
+ #   <------------------------------------------------------------------------>
+
+
 @api.route('/<string:place_id>')
 @api.param('place_id', 'The place identifier')
 class PlaceResource(Resource):
     """Resource for retrieving, updating, or deleting a specific place by ID."""
 
-    @api.doc('get_place')
+    @api.doc('get_place', params=conditional_params)
+    @conditional(lambda facade, place_id: facade.place_facade.get_place_version(place_id))
     @api.marshal_with(place_model)
     def get(self, place_id):
         """
@@ -455,10 +633,8 @@ class ReviewPlaceUser(Resource):
             if not place:
                 return {'error': 'Place not found'}, 404
 
-            reviews = facade.review_facade.get_all_reviews()
-            for review in reviews:
-                if not is_admin and review["user_id"] == current_user["id"] and review["place_id"] == place_id:
-                    raise ValueError('error: Unauthorized action: You already reviewed this place.')
+            if facade.review_facade.has_reviewed(user_id, place_id):
+                raise ValueError('error: Unauthorized action: You already reviewed this place.')
 
             if not is_admin and place["owner_id"] == user_id:
                 raise ValueError('error: Unauthorized action, you can not review your own place')
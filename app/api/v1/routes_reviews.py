@@ -22,6 +22,10 @@ from flask import jsonify, abort, request, Blueprint, current_app
 from flask_restx import api, Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
 
+from app.api.v1.pagination import pagination_params, requested_page, next_cursor_headers
+from app.api.v1.streaming import stream_params, streamable
+from app.api.v1.conditional import conditional_params, conditional
+
 reviews_bp = Blueprint('reviews', __name__)
 api = Namespace('reviews', description='Reviews operations')
 
@@ -105,11 +109,15 @@ class ReviewList(Resource):
         except Exception as e:
             return {'error': 'An unexpected error occurred', 'details': str(e)}, 500
 
-    @api.doc('get_all_reviews')
+    @api.doc('get_all_reviews', params={**pagination_params, **stream_params, **conditional_params})
+    @streamable(review_model, lambda facade: facade.review_facade.iter_reviews())
+    @conditional()
     @api.marshal_with(review_model, code=201)  # type: ignore
     def get(self):
         """
-        Retrieves all reviews.
+        Retrieves all reviews, or one page of them when `limit` or `cursor`
+        is given.
+        Streamed as NDJSON with `?stream=1` or `Accept: application/x-ndjson`.
 
         Returns:
             List of reviews.
@@ -117,6 +125,13 @@ class ReviewList(Resource):
         try:
             facade = current_app.extensions['HBNB_FACADE']
 
+            page = requested_page()
+
+            if page:
+                reviews, next_cursor = facade.review_facade.get_reviews_page(*page)
+
+                return reviews, 200, next_cursor_headers(next_cursor)
+
             reviews = facade.review_facade.get_all_reviews()
 
             if not reviews:
@@ -138,7 +153,8 @@ class ReviewList(Resource):
 class ReviewResource(Resource):
     """Resource for retrieving, updating, or deleting a review by ID."""
 
-    @api.doc('get_a_review_by_id')
+    @api.doc('get_a_review_by_id', params=conditional_params)
+    @conditional(lambda facade, review_id: facade.review_facade.get_review_version(review_id))
     @api.marshal_with(review_model)
     def get(self, review_id):
         """
@@ -38,6 +38,9 @@ from email_validator import EmailNotValidError
 
 from app.api.v1.routes_places import place_model, place_creation_model
 from app.api.v1.routes_reviews import review_model
+from app.api.v1.pagination import pagination_params, requested_page, next_cursor_headers
+from app.api.v1.streaming import stream_params, streamable
+from app.api.v1.conditional import conditional_params, conditional
 from app.extensions import bcrypt
 
 
@@ -155,11 +158,17 @@ class UserList(Resource):
             return {'error': 'An unexpected error occurred', 'details': str(e)}, 500
     
 
-    @api.doc('list_users')
+    @api.doc('list_users', params={**pagination_params, **stream_params, **conditional_params})
+    @streamable(user_model, lambda facade: (
+        dict(user, password="****") for user in facade.user_facade.iter_users()
+    ))
+    @conditional()
     @api.marshal_list_with(user_model)
     def get(self):
         """
-        Retrieves all users in the system.
+        Retrieves all users in the system, or one page of them when `limit`
+        or `cursor` is given.
+        Streamed as NDJSON with `?stream=1` or `Accept: application/x-ndjson`.
 
         Returns:
             List of user dictionaries with masked passwords.
@@ -167,15 +176,23 @@ class UserList(Resource):
         try:
             facade = current_app.extensions['HBNB_FACADE']
 
-            users = facade.user_facade.get_all_users()
+            page = requested_page()
+            headers = {}
 
-            if not users:
-                raise ValueError("No user found")
+            if page:
+                users, next_cursor = facade.user_facade.get_users_page(*page)
+                headers = next_cursor_headers(next_cursor)
+
+            else:
+                users = facade.user_facade.get_all_users()
+
+                if not users:
+                    raise ValueError("No user found")
         
             for user in users:
                 user["password"] = "****"
 
-            return users, 200
+            return users, 200, headers
 
         except ValueError as e:
             abort(400, str(e))
@@ -190,7 +207,8 @@ class UserList(Resource):
 class UserResource(Resource):
     """Resource for retrieving, updating, or deleting a specific user by ID."""
 
-    @api.doc('get_user')
+    @api.doc('get_user', params=conditional_params)
+    @conditional(lambda facade, user_id: facade.user_facade.get_user_version(user_id))
     @api.marshal_with(user_model)
     def get(self, user_id):
         """
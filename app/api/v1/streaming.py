@@ -0,0 +1,84 @@
+"""
+streaming.py
+
+Streaming mode of the list endpoints. When the client sends
+`Accept: application/x-ndjson` or `?stream=1`, the items are pulled from the
+facade one at a time, marshalled and sent as newline delimited JSON in a
+chunked response, so the whole list is never built in memory.
+"""
+
+import json
+from functools import wraps
+
+from flask import Response, current_app, request, stream_with_context
+from flask_restx import marshal
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+stream_params = {
+    'stream': {
+        'description': f'Set to 1 to stream the items as {NDJSON_MIMETYPE}',
+        'in': 'query',
+        'type': 'integer',
+        'required': False
+    }
+}
+
+
+def stream_requested():
+    """
+    Tell whether the current request asks for a streamed response.
+
+    Returns:
+        bool: True if `stream` is set or NDJSON is the preferred media type.
+    """
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def ndjson_response(items, model):
+    """
+    Build a chunked NDJSON response from an iterable of items.
+
+    Args:
+        items (iterable): Items in dictionary form.
+        model (Model): Model each item is marshalled with.
+
+    Returns:
+        Response: The streamed response.
+    """
+    def generate():
+        for item in items:
+            yield json.dumps(marshal(item, model)) + '\n'
+
+    return Response(stream_with_context(generate()), 200, mimetype=NDJSON_MIMETYPE)
+
+
+def streamable(model, items):
+    """
+    Decorator letting a list endpoint stream its items. It goes above the
+    marshalling decorator, which is skipped for streamed requests.
+
+    Args:
+        model (Model): Model each item is marshalled with.
+        items (callable): Called with the facade, returns an iterable of
+        the items in dictionary form.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not stream_requested():
+                return f(*args, **kwargs)
+
+            facade = current_app.extensions['HBNB_FACADE']
+            return ndjson_response(items(facade), model)
+
+        return wrapper
+
+    return decorator
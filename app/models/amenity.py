@@ -14,6 +14,12 @@ class Amenity(BaseModel):
         name (str): The name of the amenity.
     """
     __tablename__ = 'amenities'
+    __table_args__ = (
+        # Keyset pagination range scans
+        db.Index('ix_amenities_created_at_id', 'created_at', 'id'),
+        # Amenity names are unique
+        db.Index('ix_amenities_name', 'name', unique=True),
+    )
 
     name = db.Column(db.String(50), nullable=False)
 
@@ -55,7 +61,7 @@ class Amenity(BaseModel):
         
         return True
 
-    def to_dict(self):
+    def _serialize(self):
         """
         Convert the Amenity instance into a dictionary format.
 
@@ -3,15 +3,20 @@ BaseModel module providing a base class for models with common attributes
 and methods for saving and updating instances.
 """
 
+import json
 import uuid
 from datetime import datetime
+
+import sqlalchemy as sa
+
 from app.extensions import db
 
 
 class BaseModel(db.Model):
     """
     A base class for all models in the application, containing common fields
-    and methods for saving and updating instances.
+    and methods for saving and updating instances. Each model defines
+    `_serialize`, returning its dictionary form.
 
     Attributes:
         id (str): Unique identifier for the instance.
@@ -24,12 +29,103 @@ class BaseModel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # List fields of the dictionary form, copied into it. They are changed
+    # by setting them, not in place, so that the cached form is dropped
+    LIST_FIELDS = ()
+
     def __init__(self):
         """Initialize a new instance with a unique ID and timestamps."""
         self.id = str(uuid.uuid4())
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
 
+    def __setattr__(self, name, value):
+        """Set an attribute, dropping the cached dictionary form."""
+        object.__setattr__(self, name, value)
+
+        if name != '_serialized':
+            object.__setattr__(self, '_serialized', None)
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Check that a concrete model defines `_serialize`, which builds its
+        dictionary form for `to_dict` and `to_json`.
+
+        Raises:
+            TypeError: If the model does not define `_serialize`.
+        """
+        super().__init_subclass__(**kwargs)
+
+        if not cls.__dict__.get('__abstract__') and not callable(getattr(cls, '_serialize', None)):
+            raise TypeError(f"Model {cls.__name__} must define _serialize()")
+
+    def _serialized_form(self):
+        """
+        Return the cached [dictionary, JSON bytes] pair of the instance,
+        rebuilding it if a field was set since.
+        """
+        cached = getattr(self, '_serialized', None)
+
+        if cached is None:
+            data = self._serialize()
+
+            for field in self.LIST_FIELDS:
+                data[field] = list(data[field])
+
+            cached = [data, None]
+            object.__setattr__(self, '_serialized', cached)
+
+        return cached
+
+    def to_dict(self):
+        """
+        Converts the instance to a dictionary. The dictionary is built once
+        and reused until a field changes, each call returning a copy.
+
+        Returns:
+            dict: A dictionary representation of the instance.
+        """
+        return dict(self._serialized_form()[0])
+
+    def to_json(self):
+        """
+        Encodes the dictionary form of the instance as JSON, cached along
+        with it.
+
+        Returns:
+            bytes: The UTF-8 JSON encoding of `to_dict()`.
+        """
+        cached = self._serialized_form()
+
+        if cached[1] is None:
+            cached[1] = json.dumps(cached[0], separators=(",", ":")).encode()
+
+        return cached[1]
+
+    def cached_state(self):
+        """
+        State of the instance, other than its column values, that the
+        repository caches keep with it.
+
+        Returns:
+            dict: The state, restored by `restore_cached_state`.
+        """
+        return {}
+
+    def restore_cached_state(self, state):
+        """Restore the state returned by `cached_state` on a cached instance."""
+
+    @classmethod
+    def version_columns(cls):
+        """
+        Columns whose values change whenever the dictionary form of a row
+        does, selected to build its ETag without loading it.
+
+        Returns:
+            list: The column expressions.
+        """
+        return [cls.updated_at]
+
     def save(self, repo_type=None):
         """
         Save the object instance to the database or update its timestamps
@@ -70,3 +166,28 @@ class BaseModel(db.Model):
                 setattr(self, key, datetime.fromisoformat(value))
 
         self.save(repo_type)
+
+
+def _drop_serialized(target, *args):
+    """Drop the cached dictionary form of an instance reloaded from the database."""
+    # Expiring a session also reaches instances already garbage collected
+    if target is not None:
+        object.__setattr__(target, '_serialized', None)
+
+
+# Loads and flushes fill the attributes without going through __setattr__
+for event_name in ('expire', 'refresh', 'refresh_flush'):
+    sa.event.listen(BaseModel, event_name, _drop_serialized, propagate=True)
+
+
+def drop_serialized_on_change(collection):
+    """
+    Drop the cached dictionary form of an instance whenever one of its
+    relationship collections changes in place, e.g. through an association
+    proxy list.
+
+    Args:
+        collection: The relationship attribute, e.g. Place.amenity_links.
+    """
+    for event_name in ('append', 'remove', 'bulk_replace'):
+        sa.event.listen(collection, event_name, _drop_serialized)
@@ -5,8 +5,40 @@ This module defines the `Place` class, including attributes, methods, and
 validations associated with properties in the application.
 """
 
-from app.models.base_model import BaseModel
+import sqlalchemy as sa
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.ext.orderinglist import ordering_list
+from sqlalchemy.orm import object_session
+
+from app.models.base_model import BaseModel, drop_serialized_on_change
+from app.models.review import Review
 from app.extensions import db
+from app.persistence.full_text import full_text_table
+
+
+class PlaceAmenity(db.Model):
+    """
+    Association between a place and the name of one of its amenities.
+
+    Attributes:
+        place_id (str): ID of the place.
+        amenity_name (str): Name of the amenity.
+        position (int): Rank of the amenity in the place's list.
+    """
+    __tablename__ = 'place_amenities'
+    __table_args__ = (
+        # Places having an amenity
+        db.Index('ix_place_amenities_amenity_name', 'amenity_name', 'place_id'),
+    )
+
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id', ondelete='CASCADE'), primary_key=True)
+    amenity_name = db.Column(db.String(50), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def from_name(cls, amenity_name):
+        """Create the association of an amenity name, added to a place's list."""
+        return cls(amenity_name=amenity_name)
 
 
 class Place(BaseModel):
@@ -21,10 +53,31 @@ class Place(BaseModel):
         longitude (float): Geographical longitude of the place.
         owner_first_name (str): First name of the owner.
         owner_id (str): ID of the user who owns this place.
-        reviews (list): List of reviews associated with the place.
-        amenities (list): List of amenities available at the place.
+        reviews (list): IDs of the reviews of the place, read from the
+        indexed reviews.place_id column.
+        amenities (list): Names of the amenities available at the place,
+        stored in the place_amenities table.
+        review_count (int): Number of reviews of the place.
+        rating_sum (int): Sum of the ratings of the reviews.
+        rating_histogram (list): Number of reviews rated 1 to 5.
+        average_rating (float): Average rating of the reviews, None
+        without reviews.
     """
     __tablename__ = 'places'
+    __table_args__ = (
+        # Keyset pagination range scans
+        db.Index('ix_places_created_at_id', 'created_at', 'id'),
+        # Place titles are unique
+        db.Index('ix_places_title', 'title', unique=True),
+        # Places of an owner
+        db.Index('ix_places_owner_id', 'owner_id'),
+        # Searches around a point or inside a map view
+        db.Index('ix_places_latitude_longitude', 'latitude', 'longitude'),
+        # Listings sorted by price or rating, and price ranges
+        db.Index('ix_places_price_id', 'price', 'id'),
+        db.Index('ix_places_average_rating_id', 'average_rating', 'id'),
+    )
+    LIST_FIELDS = ('reviews', 'amenities')
 
     title = db.Column(db.String(50), nullable=False)
     description = db.Column(db.String(1024), nullable=False)
@@ -33,8 +86,26 @@ class Place(BaseModel):
     longitude = db.Column(db.Float, nullable=True)
     owner_first_name = db.Column(db.String(50), nullable=False)
     owner_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    reviews = db.Column(db.JSON, default=[])
-    amenities = db.Column(db.JSON, default=[])
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_histogram = db.Column(db.JSON, nullable=False, default=[0] * 5)
+    average_rating = db.Column(db.Float, nullable=True)
+    # Loaded on access only: reading a place must not load its reviews
+    review_links = db.relationship(
+        Review, primaryjoin='Place.id == foreign(Review.place_id)', order_by=Review.created_at,
+        viewonly=True, lazy='select'
+    )
+    amenity_links = db.relationship(
+        PlaceAmenity, order_by=PlaceAmenity.position, collection_class=ordering_list('position'),
+        cascade='all, delete-orphan', lazy='selectin'
+    )
+    amenities = association_proxy('amenity_links', 'amenity_name', creator=PlaceAmenity.from_name)
+
+    # Review ids of a place that is not stored in the database yet
+    _review_ids = None
+    # Review ids of a stored place, selected on first access along with
+    # the ones of the other places of the session
+    _loaded_review_ids = None
 
     def __init__(self, title, description, price, latitude, longitude, owner_id, owner_first_name, amenities=None, reviews=None):
         """Initialize a new Place instance."""
@@ -48,6 +119,81 @@ class Place(BaseModel):
         self.owner_id = owner_id
         self.reviews = reviews if reviews is not None else []
         self.amenities = amenities if amenities is not None else []
+        self.review_count = 0
+        self.rating_sum = 0
+        self.rating_histogram = [0] * 5
+        self.average_rating = None
+
+    @property
+    def reviews(self):
+        """
+        IDs of the reviews of the place, oldest first. Once the place is
+        stored they are selected from the reviews holding its place_id,
+        without loading the reviews, and kept until the place is expired
+        or its review count changes. The first stored place read loads
+        the review ids of every place of the session at once, so that
+        serializing a listing takes one query.
+        """
+        if not sa.inspect(self).has_identity:
+            return self._review_ids
+
+        if self._loaded_review_ids is None:
+            session = object_session(self) or db.session
+            places = [obj for obj in session.identity_map.values()
+                      if isinstance(obj, Place) and obj._loaded_review_ids is None]
+            Place.load_review_ids([self, *places])
+
+        return list(self._loaded_review_ids)
+
+    @reviews.setter
+    def reviews(self, review_ids):
+        """
+        Set the review ids of a place that is not stored yet.
+
+        Raises:
+            ValueError: If the place is stored and the ids differ from the
+            ones of its reviews, which follow their place_id instead.
+        """
+        review_ids = list(review_ids)
+
+        if not sa.inspect(self).has_identity:
+            self._review_ids = review_ids
+        elif review_ids != self.reviews:
+            raise ValueError("The reviews of a stored place are added and deleted as reviews, not through the place.")
+
+    @classmethod
+    def load_review_ids(cls, places, chunk_size=500):
+        """
+        Select the review ids of stored places with one
+        SELECT ... WHERE place_id IN (...) per chunk of places, and keep
+        them on the places.
+
+        Args:
+            places (list): The stored places.
+            chunk_size (int): Number of place ids per IN clause.
+        """
+        places = {place.id: place for place in places}
+        place_ids = list(places)
+        review_ids = {place_id: [] for place_id in place_ids}
+
+        for start in range(0, len(place_ids), chunk_size):
+            query = (sa.select(Review.place_id, Review.id)
+                     .where(Review.place_id.in_(place_ids[start:start + chunk_size]))
+                     .order_by(Review.created_at))
+
+            for place_id, review_id in db.session.execute(query):
+                review_ids[place_id].append(review_id)
+
+        for place_id, place in places.items():
+            object.__setattr__(place, '_loaded_review_ids', review_ids[place_id])
+
+    def cached_state(self):
+        """Keep the review ids with a cached place, serialized without a query."""
+        return {"reviews": self.reviews}
+
+    def restore_cached_state(self, state):
+        """Restore the review ids of a cached place."""
+        object.__setattr__(self, '_loaded_review_ids', list(state["reviews"]))
 
     def add_review(self, review):
         """
@@ -55,8 +201,11 @@ class Place(BaseModel):
 
         Args:
             review (str): The review to add.
+
+        Raises:
+            ValueError: If the place is stored, see `reviews`.
         """
-        self.reviews.append(review)
+        self.reviews = [*self.reviews, review]
 
     def add_amenity(self, amenity):
         """
@@ -65,7 +214,60 @@ class Place(BaseModel):
         Args:
             amenity (str): The amenity to add.
         """
-        self.amenities.append(amenity)
+        self.amenities = [*self.amenities, amenity]
+
+    @staticmethod
+    def rating_aggregates(histogram):
+        """
+        Compute the rating aggregates of a place from its histogram.
+
+        Args:
+            histogram (list): Number of reviews rated 1 to 5.
+
+        Returns:
+            dict: The review_count, rating_sum, rating_histogram and
+            average_rating fields.
+        """
+        review_count = sum(histogram)
+        rating_sum = sum(rating * count for rating, count in enumerate(histogram, 1))
+
+        return {
+            "review_count": review_count,
+            "rating_sum": rating_sum,
+            "rating_histogram": list(histogram),
+            "average_rating": rating_sum / review_count if review_count else None,
+        }
+
+    def rating_update(self, added=None, removed=None):
+        """
+        Compute the rating aggregates of the place once a review rating is
+        added, removed, or changed from `removed` to `added`, without
+        going through the reviews.
+
+        Args:
+            added (int, optional): Rating of the new or updated review.
+            removed (int, optional): Rating of the deleted review, or the
+            former rating of the updated one.
+
+        Returns:
+            dict: The new review_count, rating_sum, rating_histogram and
+            average_rating.
+        """
+        histogram = list(self.rating_histogram)
+        review_count, rating_sum = self.review_count, self.rating_sum
+
+        for rating, step in ((added, 1), (removed, -1)):
+            if rating is not None:
+                histogram[rating - 1] += step
+                review_count += step
+                rating_sum += step * rating
+
+        return {
+            "review_count": review_count,
+            "rating_sum": rating_sum,
+            "rating_histogram": histogram,
+            "average_rating": rating_sum / review_count if review_count else None,
+        }
 
     def is_valid(self):
         """
@@ -111,7 +313,7 @@ class Place(BaseModel):
         
         return True
 
-    def to_dict(self):
+    def _serialize(self):
         """
         Converts the place instance to a dictionary.
 
@@ -130,6 +332,28 @@ class Place(BaseModel):
             "owner_id": self.owner_id,
             "reviews": self.reviews,
             "amenities": self.amenities,
+            "review_count": self.review_count,
+            "rating_sum": self.rating_sum,
+            "rating_histogram": list(self.rating_histogram),
+            "average_rating": self.average_rating,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
+
+
+def _drop_review_ids(target, *args):
+    """Drop the review ids loaded for a place reloaded from the database or reviewed."""
+    # Expiring a session also reaches instances already garbage collected
+    if target is not None:
+        object.__setattr__(target, '_loaded_review_ids', None)
+
+
+# The review count of a place changes whenever one of its reviews is added or deleted
+sa.event.listen(Place.review_count, 'set', _drop_review_ids)
+for event_name in ('expire', 'refresh'):
+    sa.event.listen(Place, event_name, _drop_review_ids)
+drop_serialized_on_change(Place.amenity_links)
+
+
+# Full-text search of the places by title and description, see app/persistence/full_text.py
+full_text_table(Place.__table__, ("title", "description"))
@@ -0,0 +1,199 @@
+"""
+Plain record classes used by the in-memory and in-file repositories.
+
+The SQLAlchemy models carry instance state and instrumented attributes
+that only matter inside a database session. These records store the same
+fields in `__slots__` and borrow the validation, serialization and update
+methods of their model, so they can be used wherever a model instance is
+expected outside of the database backend.
+"""
+
+import uuid
+from datetime import datetime
+
+from app.models.base_model import BaseModel
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+
+
+class BaseRecord:
+    """
+    Base class of the records, holding the common fields.
+
+    Attributes:
+        id (str): Unique identifier for the instance.
+        created_at (datetime): Timestamp of when the instance was created.
+        updated_at (datetime): Timestamp of the last update.
+    """
+    __slots__ = ('id', 'created_at', 'updated_at', '_serialized')
+
+    TYPE = None
+    FIELDS = ()
+    LIST_FIELDS = ()
+    # Factories of the fields missing from records written by earlier versions
+    DEFAULTS = {}
+
+    def __init__(self):
+        """Initialize a new record with a unique ID and timestamps."""
+        self.id = str(uuid.uuid4())
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+
+    __setattr__ = BaseModel.__setattr__
+    _serialized_form = BaseModel._serialized_form
+    to_dict = BaseModel.to_dict
+    to_json = BaseModel.to_json
+    save = BaseModel.save
+    update = BaseModel.update
+
+    @property
+    def type(self):
+        """Type of the record, as given in its dictionary form."""
+        return self.TYPE
+
+    @type.setter
+    def type(self, value):
+        """Accept the type the callers tag model instances with, which is fixed for a record."""
+        if value != self.TYPE:
+            raise ValueError(f"A {self.TYPE} record cannot be of type {value}.")
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from its dictionary form, as returned by to_dict.
+
+        Args:
+            data (dict): Record fields, timestamps as datetimes or ISO
+            strings.
+
+        Returns:
+            BaseRecord: The record.
+        """
+        record = cls.__new__(cls)
+        record.id = data['id']
+
+        for field in cls.FIELDS:
+            setattr(record, field, data[field] if field in data else cls.DEFAULTS[field]())
+
+        for field in ('created_at', 'updated_at'):
+            value = data[field]
+            setattr(record, field, datetime.fromisoformat(value) if isinstance(value, str) else value)
+
+        return record
+
+    @classmethod
+    def from_model(cls, obj):
+        """
+        Build a record holding the same data as a model instance.
+
+        Args:
+            obj (BaseModel): The model instance.
+
+        Returns:
+            BaseRecord: The record.
+        """
+        return cls.from_dict(obj.to_dict())
+
+
+class UserRecord(BaseRecord):
+    """Record counterpart of the User model."""
+    TYPE = 'user'
+    FIELDS = ('first_name', 'last_name', 'email', 'password', 'is_admin', 'places')
+    LIST_FIELDS = User.LIST_FIELDS
+    __slots__ = FIELDS
+
+    def __init__(self, first_name, last_name, email, password, is_admin=False, places=None):
+        """Initialize a new user record."""
+        super().__init__()
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.password = password
+        self.is_admin = is_admin
+        self.places = places if places is not None else []
+
+    hash_password = User.hash_password
+    verify_password = User.verify_password
+    is_valid = User.is_valid
+    _serialize = User._serialize
+
+
+class PlaceRecord(BaseRecord):
+    """Record counterpart of the Place model."""
+    TYPE = 'place'
+    FIELDS = ('title', 'description', 'price', 'latitude', 'longitude',
+              'owner_first_name', 'owner_id', 'reviews', 'amenities',
+              'review_count', 'rating_sum', 'rating_histogram', 'average_rating')
+    LIST_FIELDS = Place.LIST_FIELDS
+    DEFAULTS = {'review_count': int, 'rating_sum': int, 'rating_histogram': lambda: [0] * 5,
+                'average_rating': lambda: None}
+    __slots__ = FIELDS
+
+    def __init__(self, title, description, price, latitude, longitude, owner_id, owner_first_name,
+                 amenities=None, reviews=None):
+        """Initialize a new place record."""
+        super().__init__()
+        self.title = title
+        self.description = description
+        self.price = price
+        self.latitude = latitude
+        self.longitude = longitude
+        self.owner_first_name = owner_first_name
+        self.owner_id = owner_id
+        self.reviews = reviews if reviews is not None else []
+        self.amenities = amenities if amenities is not None else []
+        self.review_count = 0
+        self.rating_sum = 0
+        self.rating_histogram = [0] * 5
+        self.average_rating = None
+
+    add_review = Place.add_review
+    add_amenity = Place.add_amenity
+    rating_update = Place.rating_update
+    is_valid = Place.is_valid
+    _serialize = Place._serialize
+
+
+class ReviewRecord(BaseRecord):
+    """Record counterpart of the Review model."""
+    TYPE = 'review'
+    FIELDS = ('text', 'rating', 'place_id', 'place_name', 'user_id', 'user_first_name')
+    __slots__ = FIELDS
+
+    def __init__(self, text, rating, place_id, place_name, user_id, user_first_name):
+        """Initialize a new review record."""
+        super().__init__()
+        self.text = text
+        self.rating = rating
+        self.place_id = place_id
+        self.place_name = place_name
+        self.user_id = user_id
+        self.user_first_name = user_first_name
+
+    is_valid = Review.is_valid
+    _serialize = Review._serialize
+
+
+class AmenityRecord(BaseRecord):
+    """Record counterpart of the Amenity model."""
+    TYPE = 'amenity'
+    FIELDS = ('name',)
+    __slots__ = FIELDS
+
+    def __init__(self, name):
+        """Initialize a new amenity record."""
+        super().__init__()
+        self.name = name
+
+    is_valid = Amenity.is_valid
+    _serialize = Amenity._serialize
+
+
+RECORD_CLASSES = {
+    User: UserRecord,
+    Place: PlaceRecord,
+    Review: ReviewRecord,
+    Amenity: AmenityRecord,
+}
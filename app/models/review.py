@@ -3,6 +3,7 @@ Review model representing user reviews for places.
 """
 from app.models.base_model import BaseModel
 from app.extensions import db
+from app.persistence.full_text import full_text_table
 
 
 class Review(BaseModel):
@@ -20,6 +21,14 @@ class Review(BaseModel):
         review.
     """
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # Keyset pagination range scans
+        db.Index('ix_reviews_created_at_id', 'created_at', 'id'),
+        # Reviews of a place
+        db.Index('ix_reviews_place_id', 'place_id'),
+        # Reviews of a user, one per place
+        db.Index('ix_reviews_user_id_place_id', 'user_id', 'place_id', unique=True),
+    )
 
     text = db.Column(db.String(1024), nullable=False)
     rating = db.Column(db.Integer, nullable=False)
@@ -93,7 +102,7 @@ class Review(BaseModel):
         
         return True
 
-    def to_dict(self):
+    def _serialize(self):
         """
         Convert the Review instance into a dictionary format.
 
@@ -112,3 +121,7 @@ class Review(BaseModel):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
+
+
+# Full-text search of the reviews by text, see app/persistence/full_text.py
+full_text_table(Review.__table__, ("text",))
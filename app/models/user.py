@@ -24,6 +24,11 @@ class User(BaseModel):
     """
 
     __tablename__ = 'users'
+    __table_args__ = (
+        # Keyset pagination range scans
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    LIST_FIELDS = ('places',)
 
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
@@ -96,7 +101,7 @@ class User(BaseModel):
 
         return True
 
-    def to_dict(self):
+    def _serialize(self):
         """
         Converts the user instance to a dictionary.
 
@@ -0,0 +1,276 @@
+"""
+Compact binary encoding for the in-file repository snapshots.
+
+Layout (all integers little-endian):
+
+    magic        b"HBNBSNP1"
+    strings      uint32 count, uint32 blob size in bytes, uint32 end
+                 offset in characters per string, then the UTF-8 blob.
+                 Every string value and key is stored once and referenced
+                 by its index.
+    order        uint32 record count, then the uint16 schema id of every
+                 record, in storage order.
+    schemas      uint16 count, then per schema a uint16 field count and,
+                 per field, the uint32 index of its name and a type code,
+                 followed by the block of its records: uint32 record
+                 count, the fixed-width fields of every record packed back
+                 to back with the schema struct, then per list of strings
+                 field a uint32 item count and the uint32 string indexes of
+                 the items of every record.
+
+Records sharing a schema are decoded a whole block at a time: one
+Struct.iter_unpack call for the fixed-width fields, then one conversion
+per column, so the per-record work left in Python is building its dict.
+
+Timestamps are stored as integer microseconds since the Unix epoch and
+are returned as such: they become datetimes when the record is hydrated
+(see timestamps.to_datetime).
+"""
+
+import json
+import struct
+from datetime import datetime
+from itertools import accumulate, repeat
+from operator import itemgetter
+
+from app.persistence.timestamps import TIMESTAMP_FIELDS, to_micros
+
+MAGIC = b"HBNBSNP1"
+
+# Type code -> struct format of the fixed-width part of a field
+FIELD_FORMATS = {
+    "N": "",    # always None
+    "S": "I",   # string table index
+    "J": "I",   # string table index of a JSON document
+    "B": "B",   # bool
+    "q": "q",   # int
+    "d": "d",   # float
+    "M": "q",   # datetime as epoch microseconds
+    "L": "I",   # list of strings: item count, items stored after the block
+    "K": "I",   # list of ints: string table index of the comma-joined ints
+}
+
+def is_binary_snapshot(payload):
+    """Tell whether a snapshot payload uses the binary format."""
+    return payload.startswith(MAGIC)
+
+
+def _type_code(key, value):
+    """Return the type code used to store a value."""
+    if value is None:
+        return "N"
+    if key in TIMESTAMP_FIELDS and isinstance(value, (str, int, datetime)) and not isinstance(value, bool):
+        return "M"
+    if isinstance(value, bool):
+        return "B"
+    if isinstance(value, int):
+        return "q"
+    if isinstance(value, float):
+        return "d"
+    if isinstance(value, datetime):
+        return "M"
+    if isinstance(value, str):
+        return "S"
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "L"
+    if isinstance(value, list) and all(isinstance(item, int) and not isinstance(item, bool) for item in value):
+        return "K"
+    return "J"
+
+
+def encode_snapshot(data):
+    """
+    Encode a snapshot in the binary format.
+
+    Args:
+        data (dict): Mapping of object id to the object dictionary, as
+        written in the JSON snapshots.
+
+    Returns:
+        bytes: The encoded snapshot.
+    """
+    strings = {}
+    schemas = {}
+    blocks = []
+    order = []
+
+    def intern(text):
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    for obj_data in data.values():
+        schema = tuple((key, _type_code(key, value)) for key, value in obj_data.items())
+        schema_id = schemas.get(schema)
+
+        if schema_id is None:
+            schema_id = schemas[schema] = len(schemas)
+            for key, _ in schema:
+                intern(key)
+            blocks.append(([], {key: [] for key, code in schema if code == "L"}))
+
+        rows, items = blocks[schema_id]
+        fixed = []
+        order.append(schema_id)
+
+        for (key, code), value in zip(schema, obj_data.values()):
+            if code == "S":
+                fixed.append(intern(value))
+            elif code == "J":
+                fixed.append(intern(json.dumps(value)))
+            elif code == "M":
+                fixed.append(to_micros(value))
+            elif code == "L":
+                fixed.append(len(value))
+                items[key].extend(intern(item) for item in value)
+            elif code == "K":
+                fixed.append(intern(",".join(map(str, value))))
+            elif code != "N":
+                fixed.append(value)
+
+        rows.append(fixed)
+
+    texts = list(strings)
+    blob = "".join(texts).encode("utf-8")
+
+    parts = [
+        MAGIC,
+        struct.pack("<II", len(texts), len(blob)),
+        struct.pack(f"<{len(texts)}I", *accumulate(map(len, texts))),
+        blob,
+        struct.pack(f"<I{len(order)}H", len(order), *order),
+        struct.pack("<H", len(schemas)),
+    ]
+
+    for schema, (rows, items) in zip(schemas, blocks):
+        parts.append(struct.pack("<H", len(schema)))
+        for key, code in schema:
+            parts.append(struct.pack("<Ic", strings[key], code.encode("ascii")))
+
+        record_struct = struct.Struct("<" + "".join(FIELD_FORMATS[code] for _, code in schema))
+        parts.append(struct.pack("<I", len(rows)))
+        parts.extend(record_struct.pack(*fixed) for fixed in rows)
+
+        for key, item_indexes in items.items():
+            parts.append(struct.pack(f"<I{len(item_indexes)}I", len(item_indexes), *item_indexes))
+
+    return b"".join(parts)
+
+
+def decode_snapshot(payload):
+    """
+    Decode a binary snapshot.
+
+    Args:
+        payload (bytes): The encoded snapshot.
+
+    Returns:
+        dict: Mapping of object id to object dictionary. Timestamps are
+        returned as epoch microseconds.
+
+    Raises:
+        ValueError: If the payload is not a binary snapshot.
+    """
+    if not is_binary_snapshot(payload):
+        raise ValueError("Not a binary snapshot")
+
+    payload = memoryview(payload)
+    offset = len(MAGIC)
+    count, blob_size = struct.unpack_from("<II", payload, offset)
+    offset += 8
+    offsets = struct.unpack_from(f"<{count}I", payload, offset)
+    offset += 4 * count
+
+    text = str(payload[offset:offset + blob_size], "utf-8")
+    offset += blob_size
+    strings = list(map(text.__getitem__, map(slice, (0, *offsets), offsets)))
+
+    record_count, = struct.unpack_from("<I", payload, offset)
+    offset += 4
+    order = struct.unpack_from(f"<{record_count}H", payload, offset)
+    offset += 2 * record_count
+
+    schema_count, = struct.unpack_from("<H", payload, offset)
+    offset += 2
+    blocks = []
+
+    for _ in range(schema_count):
+        fields, offset = _read_schema(payload, offset, strings)
+        records, offset = _decode_block(payload, offset, fields, strings)
+        blocks.append(records)
+
+    if len(blocks) == 1:
+        records = blocks[0]
+    else:
+        iterators = [iter(records) for records in blocks]
+        records = map(next, map(iterators.__getitem__, order))
+
+    records = list(records)
+
+    return dict(zip(map(itemgetter("id"), records), records))
+
+
+def _read_schema(payload, offset, strings):
+    """Read a schema definition, returning its (key, type code) fields and the offset after it."""
+    field_count, = struct.unpack_from("<H", payload, offset)
+    offset += 2
+    fields = []
+
+    for _ in range(field_count):
+        key_index, code = struct.unpack_from("<Ic", payload, offset)
+        offset += 5
+        fields.append((strings[key_index], code.decode("ascii")))
+
+    return fields, offset
+
+
+def _decode_block(payload, offset, fields, strings):
+    """
+    Decode the block of records of one schema, column by column.
+
+    Returns:
+        tuple: The record dictionaries, keys in their original order, and
+        the offset after the block.
+    """
+    count, = struct.unpack_from("<I", payload, offset)
+    offset += 4
+    record_struct = struct.Struct("<" + "".join(FIELD_FORMATS[code] for _, code in fields))
+    end = offset + record_struct.size * count
+    columns = iter(zip(*record_struct.iter_unpack(payload[offset:end]))) if record_struct.size else iter(())
+    offset = end
+
+    values = []
+
+    for key, code in fields:
+        if code == "N":
+            values.append(repeat(None, count))
+            continue
+
+        column = next(columns, ())
+
+        if code == "S":
+            values.append(map(strings.__getitem__, column))
+        elif code == "J":
+            values.append(map(json.loads, map(strings.__getitem__, column)))
+        elif code == "B":
+            values.append(map(bool, column))
+        elif code == "K":
+            # Few distinct lists, e.g. rating histograms: parse each once
+            parsed = {index: tuple(map(int, strings[index].split(","))) if strings[index] else ()
+                      for index in set(column)}
+            values.append(map(list, map(parsed.__getitem__, column)))
+        elif code == "L":
+            item_count, = struct.unpack_from("<I", payload, offset)
+            items = list(map(strings.__getitem__, struct.unpack_from(f"<{item_count}I", payload, offset + 4)))
+            offset += 4 + 4 * item_count
+
+            ends = list(accumulate(column))
+            values.append(map(items.__getitem__, map(slice, (0, *ends), ends)))
+        else:
+            values.append(column)
+
+    keys = [key for key, _ in fields]
+    records = [dict(zip(keys, row)) for row in zip(*values)] if fields else [{} for _ in range(count)]
+
+    return records, offset
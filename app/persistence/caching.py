@@ -0,0 +1,404 @@
+"""
+Read-through cache placed in front of a repository, keeping the results of
+`get` and `get_by_attribute` in a bounded LRU with a time-to-live.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from app.persistence.repository import Repository
+
+
+class LRUCache:
+    """
+    Least recently used cache whose entries also expire after a fixed time.
+
+    Attributes:
+        max_size (int): Number of entries kept, the least recently used
+        ones being evicted beyond it.
+        ttl (float): Seconds an entry stays valid, None to keep entries
+        until they are evicted or invalidated.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found no valid entry.
+        evictions (int): Entries dropped to respect `max_size` or because
+        they expired.
+    """
+
+    def __init__(self, max_size=1024, ttl=300, clock=time.monotonic):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int): Maximum number of entries.
+            ttl (float, optional): Lifetime of an entry in seconds.
+            clock (callable): Source of the current time in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Return the valid entry of `key`, marking it as recently used.
+
+        Args:
+            key: Key of the entry.
+            default: Value returned when there is no valid entry.
+        """
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            expires_at, value = entry
+
+            if expires_at is None or expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            del self._entries[key]
+            self.evictions += 1
+
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        """
+        Store `value` under `key`, evicting the least recently used entries
+        beyond `max_size`.
+        """
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key):
+        """Drop the entry of `key`, if any."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachingRepository(Repository):
+    """
+    Repository wrapper answering `get` and `get_by_attribute` from an LRU
+    cache, and forwarding everything else to the wrapped repository.
+
+    Writes made through the wrapper invalidate the entries of the objects
+    they touch: their `get` entry and the `get_by_attribute` entries for
+    their former and new attribute values. Attribute lookups are cached as
+    lists of ids resolved through the `get` entries, so an object is never
+    cached twice. The wrapped repository also reports the changes made
+    behind the wrapper's back, see Repository.watch_changes.
+
+    Attributes:
+        repository (Repository): The wrapped repository.
+        cache (LRUCache): Cache of the lookups.
+    """
+
+    def __init__(self, repository, max_size=1024, ttl=300, clock=time.monotonic):
+        """
+        Wrap a repository.
+
+        Args:
+            repository (Repository): Repository to cache.
+            max_size (int): Maximum number of cached lookups.
+            ttl (float, optional): Lifetime of a cached lookup in seconds.
+            clock (callable): Source of the current time in seconds.
+        """
+        self.repository = repository
+        self.cache = LRUCache(max_size, ttl, clock)
+        self._lock = threading.RLock()
+        self._cached_attributes = set()
+
+        self._unwatch = repository.watch_changes(self.invalidate, self.clear)
+
+    def __getattr__(self, name):
+        """Expose the other attributes of the wrapped repository, e.g. `model`."""
+        if name == 'repository':
+            raise AttributeError(name)
+
+        return getattr(self.repository, name)
+
+    def close(self):
+        """
+        Stop following the changes of the wrapped repository, drop the
+        cache and close the wrapped repository if it can be.
+        """
+        self._unwatch()
+        self.clear()
+
+        close = getattr(self.repository, 'close', None)
+
+        if close is not None:
+            close()
+
+    def stats(self):
+        """
+        Report the cache counters.
+
+        Returns:
+            dict: Hits, misses, evictions and current size of the cache.
+        """
+        with self._lock:
+            return {
+                'hits': self.cache.hits,
+                'misses': self.cache.misses,
+                'evictions': self.cache.evictions,
+                'size': len(self.cache),
+                'max_size': self.cache.max_size,
+                'ttl': self.cache.ttl,
+            }
+
+    # Invalidation
+    # <--------------------------------------------------------->
+
+    def invalidate(self, obj_id, values=None):
+        """
+        Drop the cached lookups an object change can affect.
+
+        Args:
+            obj_id (str): ID of the changed object.
+            values (dict, optional): Attribute values the object held or
+            now holds, e.g. {"title": ["Old title", "New title"]}.
+        """
+        with self._lock:
+            self.cache.discard(('id', obj_id))
+
+            for attr_name, attr_values in (values or {}).items():
+                if attr_name in self._cached_attributes:
+                    for value in attr_values:
+                        self._discard_attribute(attr_name, value)
+
+    def clear(self):
+        """Drop every cached lookup."""
+        with self._lock:
+            self.cache.clear()
+
+    def _discard_attribute(self, attr_name, value):
+        """Drop the cached lookup of an attribute value, if it is hashable."""
+        try:
+            self.cache.discard(('attr', attr_name, value))
+        except TypeError:
+            pass
+
+    def _store(self, obj):
+        """Cache an object under its id, unless the repository refuses it."""
+        entry = self.repository.to_cache(obj)
+
+        if entry is not None:
+            self.cache.set(('id', obj.id), entry)
+
+    def _values_of(self, obj, data=None):
+        """Return the cached attribute values held by an object, and given in `data`."""
+        values = {}
+
+        for attr_name in self._cached_attributes:
+            values[attr_name] = [getattr(obj, attr_name, None)] if obj is not None else []
+
+            if data and attr_name in data:
+                values[attr_name].append(data[attr_name])
+
+        return values
+
+    # Reads
+    # <--------------------------------------------------------->
+
+    def get(self, obj_id):
+        """Retrieve an object by its ID, from the cache when possible."""
+        with self._lock:
+            entry = self.cache.get(('id', obj_id))
+
+        if entry is not None:
+            return self.repository.from_cache(entry)
+
+        obj = self.repository.get(obj_id)
+
+        if obj is not None:
+            with self._lock:
+                self._store(obj)
+
+        return obj
+
+    def get_many(self, obj_ids):
+        """Retrieve several objects, fetching only the uncached ones at once."""
+        obj_ids = list(obj_ids)
+        found = {}
+
+        with self._lock:
+            entries = {obj_id: self.cache.get(('id', obj_id)) for obj_id in obj_ids}
+
+        for obj_id, entry in entries.items():
+            if entry is not None:
+                found[obj_id] = self.repository.from_cache(entry)
+
+        missing = [obj_id for obj_id in obj_ids if obj_id not in found]
+
+        if missing:
+            fetched = self.repository.get_many(missing)
+
+            with self._lock:
+                for obj in fetched:
+                    found[obj.id] = obj
+                    self._store(obj)
+
+        return [found[obj_id] for obj_id in obj_ids if obj_id in found]
+
+    def get_by_attribute(self, attr_name, attr_value):
+        """Retrieve objects by attribute value, from the cache when possible."""
+        key = ('attr', attr_name, attr_value)
+
+        try:
+            hash(key)
+        except TypeError:
+            return self.repository.get_by_attribute(attr_name, attr_value)
+
+        with self._lock:
+            obj_ids = self.cache.get(key)
+
+        if obj_ids is not None:
+            return self.get_many(obj_ids)
+
+        objs = self.repository.get_by_attribute(attr_name, attr_value)
+
+        with self._lock:
+            self._cached_attributes.add(attr_name)
+            self.cache.set(key, [obj.id for obj in objs])
+
+            for obj in objs:
+                self._store(obj)
+
+        return objs
+
+    def get_all(self):
+        """Retrieve all objects from the wrapped repository."""
+        return self.repository.get_all()
+
+    def get_page(self, after_key=None, limit=50):
+        """Retrieve a page of objects from the wrapped repository."""
+        return self.repository.get_page(after_key, limit)
+
+    def get_sorted_page(self, attr_name, after_key=None, limit=50, descending=False, bounds=None):
+        """Retrieve a sorted page of objects from the wrapped repository."""
+        return self.repository.get_sorted_page(attr_name, after_key, limit, descending, bounds)
+
+    def iter_all(self, batch_size=500):
+        """Iterate over the objects of the wrapped repository."""
+        return self.repository.iter_all(batch_size)
+
+    def get_containing(self, attr_name, value):
+        """Retrieve the objects whose list attribute contains a value."""
+        return self.repository.get_containing(attr_name, value)
+
+    def get_in_box(self, attr_names, box):
+        """Retrieve the objects located inside a box, through the wrapped repository."""
+        return self.repository.get_in_box(attr_names, box)
+
+    def search_text(self, attr_names, query, limit=20):
+        """Rank the objects matching a query, through the wrapped repository."""
+        return self.repository.search_text(attr_names, query, limit)
+
+    def exists(self, **criteria):
+        """Tell whether an object holds every given attribute value."""
+        return self.repository.exists(**criteria)
+
+    def get_version(self, obj_id):
+        """Return the version of an object, probed in the wrapped repository."""
+        return self.repository.get_version(obj_id)
+
+    # Writes
+    # <--------------------------------------------------------->
+
+    def add(self, obj):
+        """Add an object and drop the lookups it now matches."""
+        stored = self.repository.add(obj)
+        obj = stored if stored is not None else obj
+        self.invalidate(obj.id, self._values_of(obj))
+
+        return stored
+
+    def update(self, obj_id, data):
+        """Update an object and drop the lookups of its former and new values."""
+        old = self.repository.get(obj_id)
+        values = self._values_of(old, data)
+
+        try:
+            self.repository.update(obj_id, data)
+        finally:
+            self.invalidate(obj_id, values)
+
+    def update_with(self, obj_id, change):
+        """Update an object from its current state and drop the lookups of its former and new values."""
+        values = {}
+
+        def tracked_change(obj):
+            data = change(obj)
+            values.update(self._values_of(obj, data))
+            return data
+
+        try:
+            return self.repository.update_with(obj_id, tracked_change)
+        finally:
+            self.invalidate(obj_id, values)
+
+    def delete(self, obj_id):
+        """Delete an object and drop the lookups it matched."""
+        values = self._values_of(self.repository.get(obj_id))
+
+        try:
+            self.repository.delete(obj_id)
+        finally:
+            self.invalidate(obj_id, values)
+
+    def add_many(self, objs):
+        """Add several objects and drop the lookups they now match."""
+        stored = self.repository.add_many(objs)
+
+        for obj in stored:
+            self.invalidate(obj.id, self._values_of(obj))
+
+        return stored
+
+    def update_many(self, obj_ids, data):
+        """Update several objects and drop the lookups of their former and new values."""
+        changes = [(obj.id, self._values_of(obj, data)) for obj in self.repository.get_many(obj_ids)]
+
+        try:
+            self.repository.update_many(obj_ids, data)
+        finally:
+            for obj_id, values in changes:
+                self.invalidate(obj_id, values)
+
+    def delete_many(self, obj_ids):
+        """Delete several objects and drop the lookups they matched."""
+        changes = [(obj.id, self._values_of(obj)) for obj in self.repository.get_many(obj_ids)]
+
+        try:
+            self.repository.delete_many(obj_ids)
+        finally:
+            for obj_id, values in changes:
+                self.invalidate(obj_id, values)
+
+    def delete_by_attribute(self, attr_name, attr_values):
+        """Delete the matching objects, dropping the whole cache since they are not listed."""
+        try:
+            self.repository.delete_by_attribute(attr_name, attr_values)
+        finally:
+            self.clear()
+
+    def flush(self):
+        """Persist the pending writes of the wrapped repository."""
+        self.repository.flush()
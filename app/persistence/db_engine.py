@@ -0,0 +1,151 @@
+"""
+Connection pool monitoring and session settings for the database backend.
+
+The pool configured in config.py is a MonitoredQueuePool, which times every
+checkout so that slow checkouts, the overflow in use and checkout timeouts
+can be read with pool_status() while the application runs.
+"""
+
+import time
+import threading
+
+import sqlalchemy as sa
+from sqlalchemy.pool import QueuePool
+
+
+class CheckoutStats:
+    """
+    Running statistics of the checkouts of a pool.
+
+    Attributes:
+        count (int): Number of connections checked out.
+        total_wait (float): Seconds spent waiting for them.
+        max_wait (float): Longest wait, in seconds.
+        timeouts (int): Checkouts that gave up waiting.
+        peak_overflow (int): Highest number of overflow connections open
+        at the same time.
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.peak_overflow = 0
+
+    def record(self, wait, overflow, timed_out=False):
+        """
+        Account for one checkout.
+
+        Args:
+            wait (float): Seconds the checkout took.
+            overflow (int): Overflow connections open after it.
+            timed_out (bool): Whether it gave up waiting.
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.count += 1
+                self.total_wait += wait
+
+            self.max_wait = max(self.max_wait, wait)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def to_dict(self):
+        """Return the statistics, waits in milliseconds."""
+        with self._lock:
+            return {
+                "checkouts": self.count,
+                "checkout_timeouts": self.timeouts,
+                "avg_checkout_ms": round(self.total_wait / self.count * 1000, 3) if self.count else 0.0,
+                "max_checkout_ms": round(self.max_wait * 1000, 3),
+                "peak_overflow": self.peak_overflow,
+            }
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the pool and its checkout statistics."""
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def _do_get(self):
+        """Check out a connection, timing the wait."""
+        start = time.perf_counter()
+
+        try:
+            connection = super()._do_get()
+
+        except sa.exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - start, max(self.overflow(), 0), timed_out=True)
+            raise
+
+        self.checkout_stats.record(time.perf_counter() - start, max(self.overflow(), 0))
+        return connection
+
+
+def pool_status(engine):
+    """
+    Describe the connection pool of an engine.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine.
+
+    Returns:
+        dict: Pool size, connections checked in and out, overflow in use
+        and, for a MonitoredQueuePool, the checkout statistics.
+    """
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update({
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+
+    if isinstance(pool, MonitoredQueuePool):
+        status.update(pool.checkout_stats.to_dict())
+
+    return status
+
+
+# Statement setting the per-session time limit, in milliseconds, by dialect
+STATEMENT_TIMEOUT_SQL = {
+    "mysql": "SET SESSION max_execution_time = {timeout}",
+    "postgresql": "SET statement_timeout = {timeout}",
+}
+
+
+def set_statement_timeout(engine, timeout):
+    """
+    Limit the duration of the statements of every new connection. Dialects
+    without a session setting for it, like SQLite, are left unchanged.
+
+    Args:
+        engine (Engine): The SQLAlchemy engine.
+        timeout (int): Time limit in milliseconds, 0 for none.
+
+    Returns:
+        bool: True if the limit is applied.
+    """
+    statement = STATEMENT_TIMEOUT_SQL.get(engine.dialect.name)
+
+    if not timeout or statement is None:
+        return False
+
+    @sa.event.listens_for(engine, "connect")
+    def apply_timeout(dbapi_connection, connection_record):
+        """Set the time limit on a new DBAPI connection."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute(statement.format(timeout=int(timeout)))
+        cursor.close()
+
+    return True
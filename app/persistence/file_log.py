@@ -0,0 +1,97 @@
+"""
+Append-only write-ahead log used by the in-file repository when it runs in
+log-structured mode. Each mutation is written as one JSON record per line.
+"""
+
+import os
+import json
+
+
+class AppendOnlyLog:
+    """
+    Newline-delimited JSON log file that only ever grows until it is
+    truncated by a compaction.
+
+    Attributes:
+        path (str): Location of the log file.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the log for the given path. The file is created on the
+        first append.
+
+        Args:
+            path (str): Location of the log file.
+        """
+        self.path = path
+        self._file = None
+
+    def append(self, record):
+        """
+        Write one record at the end of the log.
+
+        Args:
+            record (dict): JSON serializable record.
+        """
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def replay(self):
+        """
+        Yield the records of the log in the order they were written.
+
+        A torn last line, left by a crash in the middle of an append, is
+        cut off the file once the complete records are replayed, so the
+        next append starts on a line of its own.
+
+        Yields:
+            dict: The logged records.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        torn_at = None
+
+        with open(self.path, "rb") as log_file:
+            offset = 0
+
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    torn_at = offset
+                    break
+
+                offset += len(line)
+
+                if line.strip():
+                    yield json.loads(line)
+
+        if torn_at is not None:
+            print(f"Truncating incomplete record at the end of {self.path}")
+            os.truncate(self.path, torn_at)
+
+    def size(self):
+        """Return the size of the log file in bytes."""
+        if self._file is not None:
+            return self._file.tell()
+
+        if os.path.exists(self.path):
+            return os.path.getsize(self.path)
+
+        return 0
+
+    def truncate(self):
+        """Empty the log once its records are part of a snapshot."""
+        self.close()
+
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+
+    def close(self):
+        """Close the underlying file handle if it is open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,157 @@
+"""
+Full-text search support shared by the backends.
+
+Texts are split into words the way the unicode61 tokenizer of SQLite FTS5
+does with remove_diacritics 2: letters and digits only, lowercased and
+stripped of their accents. The memory and file repositories keep an
+inverted index of these words (see indexes.FullTextIndex), the database
+backend on SQLite keeps an FTS5 table per searched model, declared with
+`full_text_table` and kept up to date by triggers.
+"""
+
+import re
+import unicodedata
+
+import sqlalchemy as sa
+
+WORD = re.compile(r"[^\W_]+")
+
+# FTS5 tables declared with full_text_table: table name -> (FTS5 table
+# name, indexed columns)
+FULL_TEXT_TABLES = {}
+
+
+def tokenize(text):
+    """
+    Split a text into searchable words.
+
+    Args:
+        text (str): Text to split, None for no text.
+
+    Returns:
+        list: The words, lowercased and without accents, in order.
+    """
+    if not text:
+        return []
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return WORD.findall(stripped.casefold())
+
+
+def match_expression(query):
+    """
+    Build the FTS5 MATCH expression of a search query, matching the rows
+    containing any of its words. Words are quoted, so the operators of the
+    FTS5 query syntax typed in a query are searched as plain words.
+
+    Args:
+        query (str): Search query.
+
+    Returns:
+        str: The expression, None if the query has no word.
+    """
+    words = dict.fromkeys(tokenize(query))
+
+    return " OR ".join(f'"{word}"' for word in words) or None
+
+
+def full_text_statements(table_name, columns):
+    """
+    Build the statements creating the FTS5 table of a table and the
+    triggers copying every insert, update and delete of the columns into it.
+
+    Args:
+        table_name (str): Name of the searched table.
+        columns (tuple): Text columns to index.
+
+    Returns:
+        list: The CREATE statements.
+    """
+    fts_name = f"{table_name}_fts"
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_name} USING fts5({column_list}, content='{table_name}', "
+        f"content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_name}_insert AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts_name}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_name}_delete AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts_name}({fts_name}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_name}_update AFTER UPDATE OF {column_list} ON {table_name} BEGIN "
+        f"INSERT INTO {fts_name}({fts_name}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values}); "
+        f"INSERT INTO {fts_name}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END",
+    ]
+
+
+def supports_full_text(connection):
+    """Tell whether a database connection is SQLite built with FTS5."""
+    if connection.dialect.name != "sqlite":
+        return False
+
+    return bool(connection.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def create_full_text_table(connection, table_name, rebuild=False):
+    """
+    Create the FTS5 table and triggers declared for a table, if missing.
+
+    Args:
+        connection: Connection to a SQLite database supporting FTS5.
+        table_name (str): Name of the searched table.
+        rebuild (bool): Index the rows already in the table again.
+
+    Returns:
+        bool: Whether the FTS5 table was missing.
+    """
+    fts_name, columns = FULL_TEXT_TABLES[table_name]
+    missing = not sa.inspect(connection).has_table(fts_name)
+
+    for statement in full_text_statements(table_name, columns):
+        connection.exec_driver_sql(statement)
+
+    if rebuild:
+        connection.exec_driver_sql(f"INSERT INTO {fts_name}({fts_name}) VALUES ('rebuild')")
+
+    return missing
+
+
+def full_text_table(table, columns):
+    """
+    Declare the FTS5 table searching text columns of a table. It is
+    created and dropped along with the table on SQLite databases
+    supporting FTS5, other databases are searched without it.
+
+    The FTS5 table points to the rowid of the table, which VACUUM may
+    renumber on tables without an INTEGER PRIMARY KEY: rebuild it after
+    a VACUUM with create_search_tables(rebuild=True).
+
+    Args:
+        table (Table): The searched table.
+        columns (tuple): Text columns to index.
+    """
+    FULL_TEXT_TABLES[table.name] = (f"{table.name}_fts", tuple(columns))
+
+    def after_create(target, connection, **kw):
+        if supports_full_text(connection):
+            create_full_text_table(connection, target.name)
+
+    def before_drop(target, connection, **kw):
+        if connection.dialect.name == "sqlite":
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FULL_TEXT_TABLES[target.name][0]}")
+
+    sa.event.listen(table, "after_create", after_create)
+    sa.event.listen(table, "before_drop", before_drop)
+
+
+def full_text_table_of(table_name, columns):
+    """
+    Return the name of the FTS5 table indexing exactly some columns of a
+    table, None if none is declared.
+    """
+    fts_name, indexed = FULL_TEXT_TABLES.get(table_name, (None, ()))
+
+    return fts_name if indexed == tuple(columns) else None
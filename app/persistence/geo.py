@@ -0,0 +1,99 @@
+"""
+Geographic helpers of the place searches around a point or inside a map
+view.
+
+Searches run in two steps: the repositories return the candidates inside
+latitude/longitude boxes through their spatial index, then the exact
+great-circle distance is computed for those candidates only. Boxes are
+(min_lat, min_lon, max_lat, max_lon) tuples in degrees, bounds included,
+and never cross the antimeridian: a search crossing it is split in two
+boxes.
+"""
+
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Compute the great-circle distance between two points.
+
+    Args:
+        lat1, lon1 (float): First point, in degrees.
+        lat2, lon2 (float): Second point, in degrees.
+
+    Returns:
+        float: Distance in kilometers.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(lon2 - lon1) / 2
+
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def in_box(latitude, longitude, box):
+    """
+    Tell whether a point lies in a box, points without coordinates never do.
+
+    Args:
+        latitude, longitude (float): The point, in degrees.
+        box (tuple): (min_lat, min_lon, max_lat, max_lon).
+
+    Returns:
+        bool: True if the point is inside the box or on its edge.
+    """
+    if latitude is None or longitude is None:
+        return False
+
+    min_lat, min_lon, max_lat, max_lon = box
+
+    return min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon
+
+
+def split_box(min_lat, min_lon, max_lat, max_lon):
+    """
+    Split a box whose longitudes go past ±180 into boxes within
+    [-180, 180], the part beyond the antimeridian being wrapped around.
+
+    Returns:
+        list: One or two (min_lat, min_lon, max_lat, max_lon) boxes.
+    """
+    if max_lon - min_lon >= 360:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+
+    if min_lon < -180:
+        return [(min_lat, min_lon + 360, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+
+    if max_lon > 180:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360)]
+
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def radius_boxes(latitude, longitude, radius_km):
+    """
+    Compute the boxes enclosing the circle of `radius_km` around a point.
+    A circle reaching a pole is enclosed by a band covering every
+    longitude.
+
+    Args:
+        latitude, longitude (float): Center of the circle, in degrees.
+        radius_km (float): Radius of the circle, in kilometers.
+
+    Returns:
+        list: One or two (min_lat, min_lon, max_lat, max_lon) boxes.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    delta_lat = math.degrees(angle)
+    min_lat, max_lat = latitude - delta_lat, latitude + delta_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return [(max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0)]
+
+    delta_lon = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(latitude)))))
+
+    return split_box(min_lat, longitude - delta_lon, max_lat, longitude + delta_lon)
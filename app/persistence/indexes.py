@@ -0,0 +1,595 @@
+"""
+Secondary index structures used by the non-database repositories to answer
+attribute lookups without scanning the whole storage.
+"""
+
+import math
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from operator import itemgetter
+
+from app.persistence.full_text import tokenize
+
+
+def in_range(value, low=None, high=None):
+    """
+    Tell whether a value lies between two bounds, missing values never do.
+
+    Args:
+        value: Value to check.
+        low, high (optional): Bounds, included, None for no bound.
+
+    Returns:
+        bool: True if the value is within the bounds.
+    """
+    return value is not None and (low is None or value >= low) and (high is None or value <= high)
+
+
+class AttributeIndex:
+    """
+    Hash index mapping the value of one attribute to the ids of the objects
+    holding that value.
+
+    Attributes:
+        attr_name (str): Name of the indexed attribute.
+        unique (bool): Whether two objects may share the same value.
+    """
+
+    def __init__(self, attr_name, unique=False):
+        """
+        Initialize an empty index.
+
+        Args:
+            attr_name (str): Name of the attribute to index.
+            unique (bool): Reject duplicate values when True.
+        """
+        self.attr_name = attr_name
+        self.unique = unique
+        self._entries = {}
+        self._values = {}
+
+    def check(self, obj_id, value):
+        """
+        Make sure that indexing `value` for `obj_id` keeps the index valid.
+
+        Args:
+            obj_id (str): ID of the object about to be indexed.
+            value: Value of the indexed attribute for that object.
+
+        Raises:
+            ValueError: If the index is unique and another object already
+            holds this value.
+        """
+        if not self.unique or value is None:
+            return
+
+        owners = self._entries.get(value)
+
+        if owners and any(owner_id != obj_id for owner_id in owners):
+            raise ValueError(f"An object with {self.attr_name}: {value} already exists.")
+
+    def add(self, obj_id, value, check_unique=True):
+        """
+        Index `value` for `obj_id`, replacing any previous value.
+
+        Args:
+            obj_id (str): ID of the indexed object.
+            value: Value of the indexed attribute for that object.
+            check_unique (bool): Enforce the unique constraint.
+        """
+        if check_unique:
+            self.check(obj_id, value)
+
+        self.remove(obj_id)
+        self._entries.setdefault(value, {})[obj_id] = None
+        self._values[obj_id] = value
+
+    def remove(self, obj_id):
+        """
+        Drop the entry of `obj_id` from the index, if any.
+
+        Args:
+            obj_id (str): ID of the object to forget.
+        """
+        if obj_id not in self._values:
+            return
+
+        value = self._values.pop(obj_id)
+        owners = self._entries.get(value)
+
+        if owners is not None:
+            owners.pop(obj_id, None)
+            if not owners:
+                del self._entries[value]
+
+    def lookup(self, value):
+        """
+        Return the ids of the objects holding `value`.
+
+        Args:
+            value: Value to look for.
+
+        Returns:
+            list: IDs in insertion order, empty if none match.
+        """
+        return list(self._entries.get(value, ()))
+
+    def clear(self):
+        """Remove every entry from the index."""
+        self._entries.clear()
+        self._values.clear()
+
+
+class MultiValueIndex(AttributeIndex):
+    """
+    Index of an attribute holding a list, mapping each element of the list
+    to the ids of the objects containing it.
+    """
+
+    def __init__(self, attr_name):
+        """
+        Initialize an empty index.
+
+        Args:
+            attr_name (str): Name of the list attribute to index.
+        """
+        super().__init__(attr_name, unique=False)
+
+    def add(self, obj_id, value, check_unique=True):
+        """
+        Index every element of `value` for `obj_id`, replacing any
+        previous elements.
+
+        Args:
+            obj_id (str): ID of the indexed object.
+            value (list): Elements of the indexed attribute.
+            check_unique (bool): Ignored, elements are never unique.
+        """
+        self.remove(obj_id)
+        elements = tuple(dict.fromkeys(value or ()))
+
+        for element in elements:
+            self._entries.setdefault(element, {})[obj_id] = None
+
+        self._values[obj_id] = elements
+
+    def remove(self, obj_id):
+        """
+        Drop the entries of `obj_id` from the index, if any.
+
+        Args:
+            obj_id (str): ID of the object to forget.
+        """
+        for element in self._values.pop(obj_id, ()):
+            owners = self._entries.get(element)
+
+            if owners is not None:
+                owners.pop(obj_id, None)
+                if not owners:
+                    del self._entries[element]
+
+
+class GeoGridIndex(AttributeIndex):
+    """
+    Spatial index of a (latitude, longitude) pair of attributes, bucketing
+    the points of the objects into a grid of square cells so a box query
+    only visits the cells it overlaps.
+
+    Attributes:
+        cell_size (float): Side of the cells, in degrees.
+    """
+
+    def __init__(self, attr_name, cell_size=0.1):
+        """
+        Initialize an empty index.
+
+        Args:
+            attr_name (tuple): Latitude and longitude attributes to index.
+            cell_size (float): Side of the cells, in degrees.
+        """
+        super().__init__(attr_name, unique=False)
+        self.cell_size = cell_size
+
+    def _cell(self, latitude, longitude):
+        """Return the grid cell of a point."""
+        return (int(latitude // self.cell_size), int(longitude // self.cell_size))
+
+    def add(self, obj_id, value, check_unique=True):
+        """
+        Index the point `value` for `obj_id`, replacing any previous point.
+        Objects missing a coordinate are left out of the index.
+
+        Args:
+            obj_id (str): ID of the indexed object.
+            value (tuple): (latitude, longitude) of the object.
+            check_unique (bool): Ignored, points are never unique.
+        """
+        self.remove(obj_id)
+        latitude, longitude = value
+
+        if latitude is None or longitude is None:
+            return
+
+        self._entries.setdefault(self._cell(latitude, longitude), {})[obj_id] = None
+        self._values[obj_id] = (latitude, longitude)
+
+    def remove(self, obj_id):
+        """
+        Drop the point of `obj_id` from the index, if any.
+
+        Args:
+            obj_id (str): ID of the object to forget.
+        """
+        point = self._values.pop(obj_id, None)
+
+        if point is None:
+            return
+
+        cell = self._cell(*point)
+        owners = self._entries.get(cell)
+
+        if owners is not None:
+            owners.pop(obj_id, None)
+            if not owners:
+                del self._entries[cell]
+
+    def lookup(self, value):
+        """
+        Return the ids of the objects located exactly at a point.
+
+        Args:
+            value (tuple): (latitude, longitude) to look for.
+
+        Returns:
+            list: IDs in insertion order, empty if none match.
+        """
+        latitude, longitude = value
+
+        if latitude is None or longitude is None:
+            return []
+
+        return [obj_id for obj_id in self._entries.get(self._cell(latitude, longitude), ())
+                if self._values[obj_id] == (latitude, longitude)]
+
+    def within(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Return the ids of the objects located inside a box. The cells
+        overlapping the box are probed one by one, or the occupied cells
+        are filtered when they are fewer, as for a box over a whole
+        continent.
+
+        Args:
+            min_lat, min_lon, max_lat, max_lon (float): Bounds of the box,
+            included.
+
+        Returns:
+            list: IDs of the objects inside the box.
+        """
+        low_row, low_column = self._cell(min_lat, min_lon)
+        high_row, high_column = self._cell(max_lat, max_lon)
+
+        if (high_row - low_row + 1) * (high_column - low_column + 1) <= len(self._entries):
+            cells = [(row, column) for row in range(low_row, high_row + 1)
+                     for column in range(low_column, high_column + 1)]
+        else:
+            cells = [cell for cell in self._entries
+                     if low_row <= cell[0] <= high_row and low_column <= cell[1] <= high_column]
+
+        obj_ids = []
+
+        for cell in cells:
+            for obj_id in self._entries.get(cell, ()):
+                latitude, longitude = self._values[obj_id]
+
+                if min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon:
+                    obj_ids.append(obj_id)
+
+        return obj_ids
+
+
+class SortedIndex(AttributeIndex):
+    """
+    Ordered index of an attribute, keeping the (value, id) keys of the
+    objects in a sorted list so range queries and sorted listings are
+    binary searches. Keys added since the last query wait in a pending set:
+    a few of them are inserted in place, a bulk of them, as when a
+    snapshot is loaded, is merged with one sort.
+
+    Objects without a value are kept apart: walks without bounds list
+    them last, by id, with (None, id) keys, in both directions.
+    """
+
+    # Pending keys beyond which the list is sorted again
+    BULK_THRESHOLD = 64
+
+    def __init__(self, attr_name):
+        """
+        Initialize an empty index.
+
+        Args:
+            attr_name (str): Name of the attribute to index.
+        """
+        super().__init__(attr_name, unique=False)
+        self._keys = []
+        self._pending = {}
+        self._missing = set()
+        self._missing_sorted = []
+
+    def add(self, obj_id, value, check_unique=True):
+        """
+        Index `value` for `obj_id`, replacing any previous value.
+
+        Args:
+            obj_id (str): ID of the indexed object.
+            value: Value of the indexed attribute for that object.
+            check_unique (bool): Ignored, values are never unique.
+        """
+        self.remove(obj_id)
+
+        if value is None:
+            self._missing.add(obj_id)
+            self._missing_sorted = None
+            return
+
+        self._values[obj_id] = value
+        self._pending[(value, obj_id)] = None
+
+    def remove(self, obj_id):
+        """
+        Drop the key of `obj_id` from the index, if any.
+
+        Args:
+            obj_id (str): ID of the object to forget.
+        """
+        if obj_id in self._missing:
+            self._missing.discard(obj_id)
+            self._missing_sorted = None
+            return
+
+        if obj_id not in self._values:
+            return
+
+        key = (self._values.pop(obj_id), obj_id)
+
+        if key in self._pending:
+            del self._pending[key]
+            return
+
+        del self._keys[bisect_left(self._keys, key)]
+
+    def _ensure_sorted(self):
+        """Move the pending keys into the sorted list."""
+        if not self._pending:
+            return
+
+        if len(self._pending) <= self.BULK_THRESHOLD:
+            for key in self._pending:
+                insort(self._keys, key)
+        else:
+            self._keys.extend(self._pending)
+            self._keys.sort()
+
+        self._pending.clear()
+
+    def _span(self, low, high):
+        """Return the positions delimiting the keys whose values lie in [low, high]."""
+        self._ensure_sorted()
+        start = 0 if low is None else bisect_left(self._keys, low, key=itemgetter(0))
+        stop = len(self._keys) if high is None else bisect_right(self._keys, high, key=itemgetter(0))
+
+        return start, stop
+
+    def walk(self, after=None, descending=False, low=None, high=None):
+        """
+        Iterate over the keys in order, starting after a given key. Without
+        bounds, the keys of the objects without a value come last.
+
+        Args:
+            after (tuple, optional): (value, id) key to start after.
+            descending (bool): Walk from the largest value down.
+            low, high (optional): Bounds of the values, included.
+
+        Yields:
+            tuple: The (value, id) keys.
+        """
+        if after is None or after[0] is not None:
+            start, stop = self._span(low, high)
+
+            if descending:
+                if after is not None:
+                    stop = min(stop, bisect_left(self._keys, after))
+                positions = range(stop - 1, start - 1, -1)
+            else:
+                if after is not None:
+                    start = max(start, bisect_right(self._keys, after))
+                positions = range(start, stop)
+
+            for position in positions:
+                yield self._keys[position]
+
+        if low is not None or high is not None:
+            return
+
+        if self._missing_sorted is None:
+            self._missing_sorted = sorted(self._missing)
+
+        missing = self._missing_sorted
+        start = bisect_right(missing, after[1]) if after is not None and after[0] is None else 0
+
+        for position in range(start, len(missing)):
+            yield None, missing[position]
+
+    @staticmethod
+    def follows(key, after, descending=False):
+        """
+        Tell whether a key comes after another one in a walk.
+
+        Args:
+            key (tuple): (value, id) key to place.
+            after (tuple): (value, id) key to compare with, None for the
+            start of the walk.
+            descending (bool): Whether the walk goes from the largest value
+            down.
+
+        Returns:
+            bool: True if `key` is walked after `after`.
+        """
+        if after is None:
+            return True
+        if key[0] is None:
+            return after[0] is not None or key[1] > after[1]
+        if after[0] is None:
+            return False
+
+        return key < after if descending else key > after
+
+    def count(self, low=None, high=None):
+        """
+        Count the objects whose value lies in [low, high].
+
+        Returns:
+            int: Number of objects.
+        """
+        start, stop = self._span(low, high)
+
+        return stop - start
+
+    def lookup_range(self, low=None, high=None):
+        """
+        Return the ids of the objects whose value lies in [low, high].
+
+        Returns:
+            list: IDs ordered by value, then id.
+        """
+        return [obj_id for value, obj_id in self.walk(low=low, high=high) if value is not None]
+
+    def key_of(self, obj_id):
+        """
+        Return the (value, id) key of an object, (None, id) if it has no
+        value, None if it is not indexed.
+        """
+        if obj_id in self._missing:
+            return None, obj_id
+
+        value = self._values.get(obj_id)
+
+        return None if value is None else (value, obj_id)
+
+    def lookup(self, value):
+        """
+        Return the ids of the objects holding `value`.
+
+        Args:
+            value: Value to look for.
+
+        Returns:
+            list: IDs ordered by id, empty if none match.
+        """
+        if value is None:
+            return []
+
+        return [obj_id for _, obj_id in self.walk(low=value, high=value)]
+
+    def clear(self):
+        """Remove every entry from the index."""
+        super().clear()
+        self._keys = []
+        self._pending.clear()
+        self._missing = set()
+        self._missing_sorted = []
+
+
+class FullTextIndex(MultiValueIndex):
+    """
+    Inverted index of text attributes, mapping each word to the ids of the
+    objects whose texts contain it along with its number of occurrences,
+    and ranking the objects matching a query with BM25.
+    """
+
+    # BM25 term frequency saturation and length normalization
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, attr_name):
+        """
+        Initialize an empty index.
+
+        Args:
+            attr_name (str or tuple): Text attribute, or tuple of text
+            attributes searched together.
+        """
+        super().__init__(attr_name)
+        self._lengths = {}
+        self._total_length = 0
+
+    def add(self, obj_id, value, check_unique=True):
+        """
+        Index the words of `value` for `obj_id`, replacing any previous
+        words.
+
+        Args:
+            obj_id (str): ID of the indexed object.
+            value (str or tuple): Text, or texts of the indexed attributes.
+            check_unique (bool): Ignored, words are never unique.
+        """
+        self.remove(obj_id)
+        texts = value if isinstance(value, tuple) else (value,)
+        frequencies = Counter(word for text in texts for word in tokenize(text))
+
+        for word, frequency in frequencies.items():
+            self._entries.setdefault(word, {})[obj_id] = frequency
+
+        length = sum(frequencies.values())
+        self._values[obj_id] = tuple(frequencies)
+        self._lengths[obj_id] = length
+        self._total_length += length
+
+    def remove(self, obj_id):
+        """
+        Drop the words of `obj_id` from the index, if any.
+
+        Args:
+            obj_id (str): ID of the object to forget.
+        """
+        super().remove(obj_id)
+        self._total_length -= self._lengths.pop(obj_id, 0)
+
+    def search(self, query, limit=20):
+        """
+        Rank the objects containing any word of a query.
+
+        Args:
+            query (str): Search query.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: (obj_id, score) pairs, best score first.
+        """
+        count = len(self._lengths)
+
+        if not count:
+            return []
+
+        average_length = self._total_length / count or 1
+        scores = {}
+
+        for word in dict.fromkeys(tokenize(query)):
+            postings = self._entries.get(word)
+
+            if not postings:
+                continue
+
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+
+            for obj_id, frequency in postings.items():
+                norm = self.K1 * (1 - self.B + self.B * self._lengths[obj_id] / average_length)
+                scores[obj_id] = scores.get(obj_id, 0.0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+    def clear(self):
+        """Remove every entry from the index."""
+        super().clear()
+        self._lengths.clear()
+        self._total_length = 0
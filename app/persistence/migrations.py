@@ -0,0 +1,222 @@
+"""
+Data migrations of the database backend, for schemas created by earlier
+versions of the models. Each migration can be run again safely.
+"""
+
+import json
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.full_text import FULL_TEXT_TABLES, supports_full_text, create_full_text_table
+from app.models.place import Place, PlaceAmenity
+from app.models.review import Review
+from app.models.user import User
+from app.models.amenity import Amenity
+
+
+def migrate_place_amenities(drop_json_column=False):
+    """
+    Copy the amenity names of the former JSON `places.amenities` column
+    into the place_amenities association table.
+
+    Args:
+        drop_json_column (bool): Drop the JSON column once copied.
+
+    Returns:
+        int: Number of associations created.
+    """
+    columns = {column['name'] for column in sa.inspect(db.session.connection()).get_columns('places')}
+
+    if 'amenities' not in columns:
+        return 0
+
+    PlaceAmenity.__table__.create(db.session.connection(), checkfirst=True)
+
+    existing = set(db.session.execute(sa.select(PlaceAmenity.place_id, PlaceAmenity.amenity_name)).all())
+    links = []
+
+    for place_id, amenities in db.session.execute(sa.text("SELECT id, amenities FROM places")).all():
+        if isinstance(amenities, str):
+            amenities = json.loads(amenities)
+
+        for position, amenity_name in enumerate(dict.fromkeys(amenities or ())):
+            if (place_id, amenity_name) not in existing:
+                links.append({"place_id": place_id, "amenity_name": amenity_name, "position": position})
+
+    try:
+        if links:
+            db.session.execute(sa.insert(PlaceAmenity), links)
+
+        if drop_json_column:
+            db.session.execute(sa.text("ALTER TABLE places DROP COLUMN amenities"))
+
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(links)
+
+
+def migrate_place_reviews(drop_json_column=False):
+    """
+    Create the index on `reviews.place_id` that replaces the former JSON
+    `places.reviews` column of review ids.
+
+    Args:
+        drop_json_column (bool): Drop the JSON column.
+
+    Returns:
+        bool: Whether the schema was changed.
+    """
+    connection = db.session.connection()
+    inspector = sa.inspect(connection)
+    index = next(index for index in Review.__table__.indexes if index.name == 'ix_reviews_place_id')
+
+    create_index = index.name not in {existing['name'] for existing in inspector.get_indexes('reviews')}
+    drop_column = drop_json_column and 'reviews' in {column['name'] for column in inspector.get_columns('places')}
+
+    try:
+        if create_index:
+            index.create(connection)
+
+        if drop_column:
+            db.session.execute(sa.text("ALTER TABLE places DROP COLUMN reviews"))
+
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return create_index or drop_column
+
+
+def rebuild_place_ratings():
+    """
+    Recompute the rating aggregates of every place with one aggregate
+    query over the reviews and one batched UPDATE of the places whose
+    aggregates are off. The aggregate columns are added first to a places
+    table that predates them.
+
+    Returns:
+        int: Number of places updated.
+    """
+    connection = db.session.connection()
+    columns = {column['name'] for column in sa.inspect(connection).get_columns('places')}
+
+    try:
+        for name in ('review_count', 'rating_sum', 'rating_histogram', 'average_rating'):
+            if name not in columns:
+                column_type = Place.__table__.c[name].type.compile(dialect=connection.dialect)
+                db.session.execute(sa.text(f"ALTER TABLE places ADD COLUMN {name} {column_type}"))
+
+        histograms = {}
+        counts = sa.select(Review.place_id, Review.rating, sa.func.count()).group_by(Review.place_id, Review.rating)
+
+        for place_id, rating, count in db.session.execute(counts):
+            histograms.setdefault(place_id, [0] * 5)[rating - 1] = count
+
+        now = datetime.utcnow()
+        changes = []
+        current = sa.select(Place.id, Place.review_count, Place.rating_sum, Place.rating_histogram, Place.average_rating)
+
+        for place_id, *values in db.session.execute(current).all():
+            aggregates = Place.rating_aggregates(histograms.get(place_id, [0] * 5))
+
+            if tuple(values) != tuple(aggregates.values()):
+                changes.append(dict(aggregates, id=place_id, updated_at=now))
+
+        if changes:
+            db.session.execute(sa.update(Place), changes)
+
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return len(changes)
+
+
+def create_missing_indexes():
+    """
+    Create the indexes declared on the models that the existing tables of
+    the database lack, since creating the tables skips the tables already
+    there.
+
+    Returns:
+        list: Names of the indexes created.
+
+    Raises:
+        IntegrityError: If a unique index is violated by existing rows.
+    """
+    connection = db.session.connection()
+    inspector = sa.inspect(connection)
+    created = []
+
+    try:
+        for model in (User, Place, PlaceAmenity, Amenity, Review):
+            table = model.__table__
+
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name not in existing:
+                    index.create(connection)
+                    created.append(index.name)
+
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return created
+
+
+def create_search_tables(rebuild=False):
+    """
+    Create the FTS5 full-text tables that the existing tables of a SQLite
+    database lack, with their triggers, and index the rows already there.
+
+    Args:
+        rebuild (bool): Index the rows of the existing FTS5 tables again,
+        needed after a VACUUM renumbered the rowids of the tables.
+
+    Returns:
+        list: Names of the FTS5 tables created or rebuilt, None if the
+        database does not support FTS5.
+    """
+    connection = db.session.connection()
+
+    if not supports_full_text(connection):
+        return None
+
+    inspector = sa.inspect(connection)
+    indexed = []
+
+    try:
+        for table_name, (fts_name, _) in sorted(FULL_TEXT_TABLES.items()):
+            if not inspector.has_table(table_name):
+                continue
+
+            missing = not inspector.has_table(fts_name)
+
+            if missing or rebuild:
+                create_full_text_table(connection, table_name, rebuild=True)
+                indexed.append(fts_name)
+
+        db.session.commit()
+
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return indexed
@@ -0,0 +1,222 @@
+"""
+Keyset pagination helpers.
+
+Pages are ordered by the (created_at, id) key of the objects. A page
+request gives the key of the last object already seen, and the next page
+starts right after it, so no offset has to be skipped over. Clients only
+see keys as opaque cursors.
+"""
+
+import json
+import base64
+import binascii
+from bisect import bisect_left, bisect_right
+
+from app.persistence.timestamps import to_datetime
+
+
+def page_key(created_at, obj_id):
+    """
+    Build the pagination key of an object.
+
+    Args:
+        created_at (datetime, str or int): Creation time, in any of the
+        forms read by timestamps.to_datetime.
+        obj_id (str): ID of the object.
+
+    Returns:
+        tuple: The (created_at, id) key.
+    """
+    return (to_datetime(created_at), obj_id)
+
+
+def encode_cursor(key):
+    """
+    Turn a pagination key into an opaque cursor.
+
+    Args:
+        key (tuple): (created_at, id) key of the last object of a page.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    created_at, obj_id = key
+    payload = json.dumps([created_at.isoformat(), obj_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Turn a cursor back into a pagination key.
+
+    Args:
+        cursor (str): Cursor returned with a previous page.
+
+    Returns:
+        tuple: The (created_at, id) key.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return page_key(created_at, str(obj_id))
+
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def encode_sort_cursor(sort, key):
+    """
+    Turn the key of a listing sorted by a numeric attribute into an
+    opaque cursor, tagged with the sort so it is not reused for another.
+
+    Args:
+        sort (str): Name of the sort of the listing.
+        key (tuple): (value, id) key of the last object of a page, the
+        value being None for an object without one.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    value, obj_id = key
+    payload = json.dumps([sort, value, obj_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_sort_cursor(sort, cursor):
+    """
+    Turn a cursor of a sorted listing back into a key.
+
+    Args:
+        sort (str): Name of the sort of the listing.
+        cursor (str): Cursor returned with a previous page.
+
+    Returns:
+        tuple: The (value, id) key.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tag, value, obj_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    if tag != sort or isinstance(value, bool) or not (value is None or isinstance(value, (int, float))):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    return value, str(obj_id)
+
+
+class OrderedKeyIndex:
+    """
+    Sorted list of the (created_at, id) keys of the objects of a
+    repository, used to serve pages without sorting the whole storage.
+
+    Keys are appended as objects are added, which keeps the list sorted
+    since new objects are the most recent ones. Out of order keys, such as
+    the ones of a snapshot being loaded, mark the list for a single sort
+    before the next lookup.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._keys = []
+        self._key_of = {}
+        self._sorted = True
+
+    def add(self, obj_id, key):
+        """
+        Index the key of an object, replacing its previous key if any.
+
+        Args:
+            obj_id (str): ID of the object.
+            key (tuple): Its (created_at, id) key.
+        """
+        previous = self._key_of.get(obj_id)
+
+        if previous == key:
+            return
+
+        if previous is not None:
+            self.remove(obj_id)
+
+        if self._keys and key < self._keys[-1]:
+            self._sorted = False
+
+        self._keys.append(key)
+        self._key_of[obj_id] = key
+
+    def remove(self, obj_id):
+        """
+        Drop the key of an object, if any.
+
+        Args:
+            obj_id (str): ID of the object.
+        """
+        key = self._key_of.pop(obj_id, None)
+
+        if key is None:
+            return
+
+        self._ensure_sorted()
+        position = bisect_left(self._keys, key)
+        del self._keys[position]
+
+    def after(self, key, limit):
+        """
+        Return the keys following `key`.
+
+        Args:
+            key (tuple, optional): Key to start after, None for the start.
+            limit (int): Maximum number of keys.
+
+        Returns:
+            list: The keys, in order.
+        """
+        self._ensure_sorted()
+        start = 0 if key is None else bisect_right(self._keys, key)
+        return self._keys[start:start + limit]
+
+    def walk(self, after=None, descending=False):
+        """
+        Iterate over the keys in order, starting after a given key.
+
+        Args:
+            after (tuple, optional): Key to start after, None for the start.
+            descending (bool): Walk from the most recent key down.
+
+        Yields:
+            tuple: The (created_at, id) keys.
+        """
+        self._ensure_sorted()
+
+        if descending:
+            stop = len(self._keys) if after is None else bisect_left(self._keys, after)
+            positions = range(stop - 1, -1, -1)
+        else:
+            start = 0 if after is None else bisect_right(self._keys, after)
+            positions = range(start, len(self._keys))
+
+        for position in positions:
+            yield self._keys[position]
+
+    def key_of(self, obj_id):
+        """Return the key of an object, None if it is not indexed."""
+        return self._key_of.get(obj_id)
+
+    def clear(self):
+        """Remove every key."""
+        self._keys = []
+        self._key_of = {}
+        self._sorted = True
+
+    def _ensure_sorted(self):
+        """Sort the keys if some were added out of order."""
+        if not self._sorted:
+            self._keys.sort()
+            self._sorted = True
@@ -0,0 +1,155 @@
+"""
+Query plan check of the database backend: run the lookups the facades rely
+on through SQLAlchemyRepository, record the statements they send and ask
+SQLite how it executes each of them, to catch lookups left without an
+index.
+"""
+
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.pagination import page_key
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+
+# Attributes looked up with get_by_attribute, per model
+LOOKUP_KEYS = {
+    User: ("email",),
+    Place: ("title", "owner_id"),
+    Amenity: ("name",),
+    Review: ("place_id", "user_id"),
+}
+
+# List attributes looked up with get_containing, per model
+CONTAINMENT_KEYS = {
+    Place: ("amenities",),
+}
+
+# Attribute combinations probed with exists, per model
+EXISTENCE_KEYS = {
+    Review: (("user_id", "place_id"),),
+}
+
+# Attributes listed with get_sorted_page, per model
+SORT_KEYS = {
+    Place: ("price", "average_rating"),
+}
+
+# Latitude and longitude attributes searched with get_in_box, per model
+SPATIAL_KEYS = {
+    Place: (("latitude", "longitude"),),
+}
+
+
+def repository_queries():
+    """
+    List the repository lookups to check.
+
+    Returns:
+        list: (description, callable) pairs, each callable running one
+        lookup with a placeholder value.
+    """
+    queries = []
+
+    for model in (User, Place, Amenity, Review):
+        repo = SQLAlchemyRepository(model)
+        name = model.__name__
+
+        queries.append((f"{name}.get", lambda repo=repo: repo.get("id")))
+        queries.append((f"{name}.get_many", lambda repo=repo: repo.get_many(["id", "other-id"])))
+        queries.append((f"{name}.get_page", lambda repo=repo: repo.get_page(page_key(datetime.utcnow(), "id"), 10)))
+
+        for attr_name in LOOKUP_KEYS.get(model, ()):
+            queries.append((f"{name}.get_by_attribute({attr_name})",
+                            lambda repo=repo, attr_name=attr_name: repo.get_by_attribute(attr_name, "value")))
+
+        for attr_name in CONTAINMENT_KEYS.get(model, ()):
+            queries.append((f"{name}.get_containing({attr_name})",
+                            lambda repo=repo, attr_name=attr_name: repo.get_containing(attr_name, "value")))
+
+        for attr_names in EXISTENCE_KEYS.get(model, ()):
+            criteria = dict.fromkeys(attr_names, "value")
+            queries.append((f"{name}.exists({', '.join(attr_names)})",
+                            lambda repo=repo, criteria=criteria: repo.exists(**criteria)))
+
+        for attr_name in SORT_KEYS.get(model, ()):
+            queries.append((f"{name}.get_sorted_page({attr_name})",
+                            lambda repo=repo, attr_name=attr_name: repo.get_sorted_page(attr_name, (1.0, "id"), 10)))
+            queries.append((f"{name}.get_sorted_page({attr_name}, descending)",
+                            lambda repo=repo, attr_name=attr_name: repo.get_sorted_page(attr_name, (1.0, "id"), 10, True)))
+
+        for attr_names in SPATIAL_KEYS.get(model, ()):
+            queries.append((f"{name}.get_in_box({', '.join(attr_names)})",
+                            lambda repo=repo, attr_names=attr_names: repo.get_in_box(attr_names, (48.8, 2.2, 48.9, 2.5))))
+
+    return queries
+
+
+def capture_statements(lookup):
+    """
+    Run a lookup and record the statements it sends to the database.
+
+    Args:
+        lookup (callable): Lookup to run.
+
+    Returns:
+        list: (statement, parameters) pairs, in execution order.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    sa.event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        lookup()
+    finally:
+        sa.event.remove(db.engine, "before_cursor_execute", record)
+
+    return statements
+
+
+def is_full_scan(detail):
+    """
+    Whether a step of a SQLite query plan reads a whole table.
+
+    Args:
+        detail (str): Detail column of an EXPLAIN QUERY PLAN row.
+
+    Returns:
+        bool: True for a table scan that uses no index.
+    """
+    return detail.startswith("SCAN ") and " USING " not in detail and detail != "SCAN CONSTANT ROW"
+
+
+def full_scans():
+    """
+    Explain every repository lookup and collect the ones that scan a whole
+    table.
+
+    Returns:
+        list: (description, statement, detail) of each full scan found.
+
+    Raises:
+        ValueError: If the database is not SQLite, the only dialect
+        supporting EXPLAIN QUERY PLAN.
+    """
+    if db.engine.dialect.name != "sqlite":
+        raise ValueError(f"EXPLAIN QUERY PLAN is not supported by {db.engine.dialect.name}.")
+
+    scans = []
+
+    for description, lookup in repository_queries():
+        for statement, parameters in capture_statements(lookup):
+            plan = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+
+            for row in plan:
+                if is_full_scan(row[-1]):
+                    scans.append((description, statement, row[-1]))
+
+    return scans
@@ -3,6 +3,8 @@ RepoSelector module to select and initialize the appropriate repository type.
 """
 
 from app.persistence.repository import InMemoryRepository, InFileRepository, SQLAlchemyRepository
+from app.persistence.caching import CachingRepository
+from app.models.records import RECORD_CLASSES
 
 
 class RepoSelector:
@@ -15,9 +17,16 @@ class RepoSelector:
         'in_file', or 'in_DB').
         file_name (str): The file name for in-file storage,
         defaulting to 'data.json'.
+        indexes (dict): Secondary indexes for the in-memory and in-file
+        repositories, mapping an attribute name to its uniqueness.
+        file_options (dict): Extra keyword arguments for the in-file
+        repository, such as 'storage_mode' and 'compact_threshold'.
+        cache_options (dict): Keyword arguments of the CachingRepository
+        wrapping the repository ('max_size', 'ttl'), None for no cache.
     """
 
-    def __init__(self, repo_type="in_memory", file_name="data.json"):
+    def __init__(self, repo_type="in_memory", file_name="data.json", indexes=None, file_options=None,
+                 cache_options=None):
         """
         Initialize the RepoSelector with a specified repository type
         and optional file name.
@@ -27,9 +36,18 @@ class RepoSelector:
             Defaults to 'in_memory'.
             file_name (str): The file name for in-file storage.
             Defaults to 'data.json'.
+            indexes (dict, optional): Secondary indexes to declare,
+            e.g. {"email": True}. Ignored by the database repository.
+            file_options (dict, optional): Extra keyword arguments passed
+            to InFileRepository.
+            cache_options (dict, optional): Wrap the repository in a
+            read-through cache with these options, e.g. {"ttl": 300}.
         """
         self.repo_type = repo_type
         self.file_name = file_name
+        self.indexes = indexes
+        self.file_options = file_options or {}
+        self.cache_options = cache_options
 
     def select_repo(self, model=None):
         """
@@ -38,20 +56,33 @@ class RepoSelector:
 
         Args:
             model (db.Model, optional): SQLAlchemy model,
-            required for SQLAlchemyRepository.
+            required for SQLAlchemyRepository. The in-memory and in-file
+            repositories store its lightweight record counterpart.
 
         Returns:
-            Repository: An instance of the selected repository.
+            Repository: An instance of the selected repository, wrapped
+            in a CachingRepository when cache options are set.
 
         Raises:
             ValueError: If the repository type is unknown
             or model is not provided for SQLAlchemyRepository.
         """
+        repo = self._select_backend(model)
+
+        if self.cache_options is not None:
+            return CachingRepository(repo, **self.cache_options)
+
+        return repo
+
+    def _select_backend(self, model):
+        """Create the storage backend of the repository."""
+        record_class = RECORD_CLASSES.get(model)
+
         if self.repo_type == "in_file":
-            return InFileRepository(self.file_name)
+            return InFileRepository(self.file_name, self.indexes, record_class=record_class, **self.file_options)
         
         elif self.repo_type == "in_memory":
-            return InMemoryRepository()
+            return InMemoryRepository(self.indexes, record_class)
         
         elif self.repo_type == "in_DB":
             
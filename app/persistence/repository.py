@@ -5,6 +5,14 @@ file-based, and database repositories.
 
 import os
 import json
+import pickle
+import atexit
+import struct
+import heapq
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from collections import OrderedDict
 from datetime import datetime
 from abc import ABC, abstractmethod
 
@@ -12,7 +20,23 @@ from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
+import sqlalchemy as sa
+from sqlalchemy.ext.associationproxy import AssociationProxyInstance
+from sqlalchemy.orm import ONETOMANY, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from app.extensions import db
+from app.persistence.indexes import (
+    AttributeIndex, MultiValueIndex, GeoGridIndex, SortedIndex, FullTextIndex, in_range
+)
+from app.persistence.full_text import full_text_table_of, match_expression
+from app.persistence.geo import in_box
+from app.persistence.unit_of_work import commit, rollback
+from app.persistence.pagination import OrderedKeyIndex, page_key
+from app.persistence.file_log import AppendOnlyLog
+from app.persistence.snapshot import (
+    SNAPSHOT_FORMATS, write_atomic, read_checked, encode_payload, decode_payload, gc_paused
+)
+from app.persistence.timestamps import to_datetime
 
 
 class Repository(ABC):
@@ -47,18 +71,407 @@ class Repository(ABC):
         """Retrieve objects by a specific attribute."""
         pass
 
+    def get_containing(self, attr_name, value):
+        """
+        Retrieve the objects whose list attribute contains a value. Backends
+        override this to avoid scanning every object.
+
+        Args:
+            attr_name (str): List attribute, e.g. 'amenities'.
+            value: Element to look for.
+
+        Returns:
+            list: The matching objects.
+        """
+        return [obj for obj in self.get_all() if value in (getattr(obj, attr_name, None) or ())]
+
+    def get_in_box(self, attr_names, box):
+        """
+        Retrieve the objects located inside a latitude/longitude box.
+        Backends override this to use a spatial index.
+
+        Args:
+            attr_names (tuple): Latitude and longitude attributes, e.g.
+            ("latitude", "longitude").
+            box (tuple): (min_lat, min_lon, max_lat, max_lon), bounds
+            included.
+
+        Returns:
+            list: The objects inside the box.
+        """
+        lat_attr, lon_attr = attr_names
+
+        return [obj for obj in self.get_all()
+                if in_box(getattr(obj, lat_attr, None), getattr(obj, lon_attr, None), box)]
+
+    def search_text(self, attr_names, query, limit=20):
+        """
+        Rank the objects whose text attributes contain words of a query,
+        with BM25. Backends override this to use a full-text index instead
+        of indexing every object for each search.
+
+        Args:
+            attr_names (tuple): Text attributes searched together, e.g.
+            ("title", "description").
+            query (str): Search query.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: (object, score) pairs, best score first.
+        """
+        index = FullTextIndex(tuple(attr_names))
+        objs = {}
+
+        for obj in self.get_all():
+            objs[obj.id] = obj
+            index.add(obj.id, tuple(getattr(obj, attr_name, None) for attr_name in attr_names))
+
+        return [(objs[obj_id], score) for obj_id, score in index.search(query, limit)]
+
+    def exists(self, **criteria):
+        """
+        Tell whether an object holds every given attribute value. Backends
+        override this to probe an index instead of scanning every object.
+
+        Args:
+            **criteria: Attribute values to match, e.g. user_id=..., place_id=...
+
+        Returns:
+            bool: True if at least one object matches.
+        """
+        return any(all(getattr(obj, attr_name, None) == value for attr_name, value in criteria.items())
+                   for obj in self.get_all())
+
+    def get_version(self, obj_id):
+        """
+        Return a token that changes whenever an object is updated, used as
+        its ETag. Backends override this to read the version without
+        loading the whole object.
+
+        Args:
+            obj_id (str): ID of the object.
+
+        Returns:
+            str: The version of the object, None if it does not exist.
+        """
+        obj = self.get(obj_id)
+
+        return obj.updated_at.isoformat() if obj is not None else None
+
+    def get_many(self, obj_ids):
+        """
+        Retrieve several objects by their IDs.
+
+        Returns:
+            list: The objects found, in the order of `obj_ids`. Unknown
+            IDs are skipped.
+        """
+        objs = (self.get(obj_id) for obj_id in obj_ids)
+        return [obj for obj in objs if obj is not None]
+
+    def get_page(self, after_key=None, limit=50):
+        """
+        Retrieve a page of objects ordered by (created_at, id). Backends
+        override this to avoid sorting every object.
+
+        Args:
+            after_key (tuple, optional): (created_at, id) key of the last
+            object of the previous page.
+            limit (int): Maximum number of objects.
+
+        Returns:
+            tuple: The objects of the page and the key to pass to get the
+            next page, None on the last page.
+        """
+        objs = sorted(self.get_all(), key=lambda obj: page_key(obj.created_at, obj.id))
+
+        if after_key is not None:
+            objs = [obj for obj in objs if page_key(obj.created_at, obj.id) > after_key]
+
+        if len(objs) > limit:
+            return objs[:limit], page_key(objs[limit - 1].created_at, objs[limit - 1].id)
+
+        return objs, None
+
+    def get_sorted_page(self, attr_name, after_key=None, limit=50, descending=False, bounds=None):
+        """
+        Retrieve a page of objects ordered by an attribute, then by id.
+        Objects without a value for the attribute come last, by id, unless
+        the attribute is bounded. Backends override this to walk an index
+        instead of sorting every object.
+
+        Args:
+            attr_name (str): Attribute to sort on, e.g. 'price'.
+            after_key (tuple, optional): (value, id) key of the last object
+            of the previous page, (None, id) among the objects without a
+            value.
+            limit (int): Maximum number of objects.
+            descending (bool): Largest values first.
+            bounds (dict, optional): (low, high) bounds, included, of
+            attributes to filter on, None for no bound, e.g.
+            {"price": (50, 150)}.
+
+        Returns:
+            tuple: The objects of the page and the key to pass to get the
+            next page, None on the last page.
+        """
+        bounds = bounds or {}
+        objs = [obj for obj in self.get_all()
+                if all(in_range(getattr(obj, name, None), low, high) for name, (low, high) in bounds.items())]
+        valued = sorted((obj for obj in objs if getattr(obj, attr_name, None) is not None),
+                        key=lambda obj: (getattr(obj, attr_name), obj.id), reverse=descending)
+        missing = sorted((obj for obj in objs if getattr(obj, attr_name, None) is None), key=lambda obj: obj.id)
+        objs = [obj for obj in valued + missing
+                if SortedIndex.follows((getattr(obj, attr_name, None), obj.id), after_key, descending)]
+
+        if len(objs) > limit:
+            last = objs[limit - 1]
+            return objs[:limit], (getattr(last, attr_name, None), last.id)
+
+        return objs, None
+
+    def iter_all(self, batch_size=500):
+        """
+        Iterate over all objects. Backends override this to avoid loading
+        every object at once.
+
+        Args:
+            batch_size (int): Number of objects fetched at a time, for the
+            backends reading in batches.
+
+        Yields:
+            The objects of the repository.
+        """
+        yield from self.get_all()
+
+    def add_many(self, objs):
+        """
+        Add several objects. Backends override this to save them in one go.
+
+        Returns:
+            list: The stored objects.
+        """
+        objs = list(objs)
+        for obj in objs:
+            self.add(obj)
+        return objs
+
+    def update_with(self, obj_id, change):
+        """
+        Update an object with values computed from its current state, such
+        as counters, without another update slipping in between. Backends
+        override this to lock the object while it is read and updated.
+
+        Args:
+            obj_id (str): ID of the object to update.
+            change (callable): Called with the object, returns the data to
+            update it with.
+
+        Returns:
+            The object, None if it does not exist.
+        """
+        obj = self.get(obj_id)
+
+        if obj is not None:
+            self.update(obj_id, change(obj))
+
+        return obj
+
+    def update_many(self, obj_ids, data):
+        """Apply the same data to several objects."""
+        for obj_id in obj_ids:
+            self.update(obj_id, data)
+
+    def delete_many(self, obj_ids):
+        """Delete several objects by their IDs."""
+        for obj_id in obj_ids:
+            self.delete(obj_id)
+
+    def delete_by_attribute(self, attr_name, attr_values):
+        """
+        Delete every object whose attribute holds one of the given values.
+        Backends override this to avoid loading the objects.
+
+        Args:
+            attr_name (str): Attribute to match, e.g. 'place_id'.
+            attr_values (iterable): Values to delete the objects of.
+        """
+        obj_ids = [obj.id for value in attr_values for obj in self.get_by_attribute(attr_name, value)]
+        self.delete_many(obj_ids)
+
+    def flush(self):
+        """Persist pending writes. Backends writing through do nothing."""
+        pass
+
+    def to_cache(self, obj):
+        """
+        Return the entry a CachingRepository keeps for an object, or None
+        if it must not be cached. Stored objects are cached as they are.
+        """
+        return obj
+
+    def from_cache(self, entry):
+        """Return the object of an entry made by `to_cache`."""
+        return entry
+
+    def watch_changes(self, on_change, on_reset):
+        """
+        Report the changes made to the stored objects without going through
+        the repository methods. Stored objects are only changed through
+        them, so this does nothing.
+
+        Args:
+            on_change (callable): Called with the id of a changed object
+            and a dict of the attribute values it held or now holds.
+            on_reset (callable): Called when changes are discarded.
+
+        Returns:
+            callable: Stops reporting the changes.
+        """
+        return lambda: None
+
 # <--------------------------------------------------------->
 
 
+# Index kind of list attributes, see InMemoryRepository.create_index
+MULTI_VALUED = 'multi'
+GEO = 'geo'
+SORTED = 'sorted'
+TEXT = 'text'
+
+
 class InMemoryRepository(Repository):
     """In-memory repository for storing data without persistence."""
 
-    def __init__(self):
+    PROTECTED_ATTRIBUTES = ('id', 'created_at', 'updated_at')
+
+    def __init__(self, indexes=None, record_class=None):
+        """
+        Initialize the in-memory storage and its secondary indexes.
+
+        Args:
+            indexes (dict, optional): Attributes to index, mapped to a
+            boolean telling if the index is unique, or to MULTI_VALUED for
+            list attributes whose elements are indexed. A tuple of
+            attributes declares a composite index on their combined values,
+            or a spatial index of a (latitude, longitude) pair mapped to GEO.
+            SORTED keeps the values in order for ranges and sorted pages,
+            TEXT indexes the words of a tuple of text attributes, e.g.
+            {"email": True, "owner_id": False, "amenities": MULTI_VALUED,
+            ("user_id", "place_id"): True, ("latitude", "longitude"): GEO,
+            "price": SORTED, ("title", "description"): TEXT}.
+            record_class (type, optional): Lightweight record class from
+            app.models.records. Model instances are stored as records of
+            this class when it is given.
+        """
+        self.record_class = record_class
         self._storage = {}
+        self._indexes = {}
+        self._page_index = OrderedKeyIndex()
+        self._lock = threading.RLock()
+
+        for attr_name, unique in (indexes or {}).items():
+            self.create_index(attr_name, unique)
+
+    def create_index(self, attr_name, unique=False):
+        """
+        Declare a secondary index on an attribute and fill it with the
+        objects already stored.
+
+        Args:
+            attr_name (str or tuple): Attribute to index, or tuple of
+            attributes for a composite index.
+            unique (bool or str): Reject two objects sharing the same value
+            when True. MULTI_VALUED indexes each element of a list
+            attribute instead, GEO indexes a (latitude, longitude) pair in
+            a grid, SORTED keeps the values in order, TEXT indexes the
+            words of text attributes for full-text search.
+        """
+        if unique == MULTI_VALUED:
+            index = MultiValueIndex(attr_name)
+        elif unique == GEO:
+            index = GeoGridIndex(attr_name)
+        elif unique == SORTED:
+            index = SortedIndex(attr_name)
+        elif unique == TEXT:
+            index = FullTextIndex(attr_name)
+        else:
+            index = AttributeIndex(attr_name, unique)
+
+        for obj_id, obj in self._storage.items():
+            index.add(obj_id, self._index_value(obj, attr_name), check_unique=False)
+
+        self._indexes[attr_name] = index
+
+    def _value_of(self, obj, attr_name):
+        """Return the value of an attribute of a stored object."""
+        return getattr(obj, attr_name, None)
+
+    @staticmethod
+    def _index_attributes(key):
+        """Return the attributes covered by an index key, a name or a tuple of names."""
+        return key if isinstance(key, tuple) else (key,)
+
+    def _index_value(self, obj, key, data=None):
+        """
+        Return the value of an object for an index key, a tuple of values
+        for a composite index. Attributes present in `data` override the
+        ones of the object.
+        """
+        data = data or {}
+
+        if not isinstance(key, tuple):
+            return data[key] if key in data else self._value_of(obj, key)
+
+        return tuple(data[attr_name] if attr_name in data else self._value_of(obj, attr_name)
+                     for attr_name in key)
+
+    def _new_index_values(self, obj, data):
+        """Return the values `data` would give to the indexes it touches."""
+        data = {attr_name: value for attr_name, value in data.items() if attr_name not in self.PROTECTED_ATTRIBUTES}
+
+        return {key: self._index_value(obj, key, data) for key in self._indexes
+                if any(attr_name in data for attr_name in self._index_attributes(key))}
+
+    def _check_indexes(self, obj_id, values):
+        """Raise ValueError if `values` would break a unique index."""
+        for attr_name, value in values.items():
+            self._indexes[attr_name].check(obj_id, value)
+
+    def _index_object(self, obj, check_unique=True):
+        """Add an object to every declared index."""
+        obj_id = self._value_of(obj, 'id')
+        values = {key: self._index_value(obj, key) for key in self._indexes}
+
+        if check_unique:
+            self._check_indexes(obj_id, values)
+
+        for attr_name, value in values.items():
+            self._indexes[attr_name].add(obj_id, value, check_unique=False)
+
+        self._page_index.add(obj_id, page_key(self._value_of(obj, 'created_at'), obj_id))
+
+    def _unindex_object(self, obj_id):
+        """Remove an object from every declared index."""
+        for index in self._indexes.values():
+            index.remove(obj_id)
+
+        self._page_index.remove(obj_id)
 
     def add(self, obj):
-        """Add an object to the in-memory storage."""
+        """
+        Add an object to the in-memory storage.
+
+        Returns:
+            The stored object, which is a record of `record_class` when
+            the repository has one.
+        """
+        if self.record_class is not None and not isinstance(obj, self.record_class):
+            obj = self.record_class.from_model(obj)
+
+        self._index_object(obj)
         self._storage[obj.id] = obj
+        return obj
 
     def get(self, obj_id):
         """Retrieve an object by its ID from in-memory storage."""
@@ -68,64 +481,612 @@ class InMemoryRepository(Repository):
         """Retrieve all objects stored in-memory."""
         return list(self._storage.values())
 
+    def get_many(self, obj_ids):
+        """Retrieve several objects by their IDs, skipping unknown ones."""
+        return [self.get(obj_id) for obj_id in obj_ids if obj_id in self._storage]
+
+    def get_page(self, after_key=None, limit=50):
+        """Retrieve a page of objects through the ordered key index."""
+        keys = self._page_index.after(after_key, limit + 1)
+        objs = [self.get(obj_id) for _, obj_id in keys[:limit]]
+
+        return objs, keys[limit - 1] if len(keys) > limit else None
+
+    def get_sorted_page(self, attr_name, after_key=None, limit=50, descending=False, bounds=None):
+        """
+        Retrieve a page of objects by walking the sorted index of the
+        attribute, the page index for created_at, from the key the page
+        starts after. Bounds on the sort attribute narrow the walk, bounds
+        on other attributes are checked on the raw values. When a bounded
+        attribute has its own sorted index selecting fewer objects than the
+        walk would visit, the page is picked among those objects instead.
+        """
+        bounds = dict(bounds or {})
+        sort_index = self._page_index if attr_name == 'created_at' else self._indexes.get(attr_name)
+
+        if not (isinstance(sort_index, SortedIndex) or (sort_index is self._page_index and attr_name not in bounds)):
+            return super().get_sorted_page(attr_name, after_key, limit, descending, bounds)
+
+        own_bounds = bounds.pop(attr_name, (None, None))
+
+        def matches(key):
+            obj = self._storage.get(key[1])
+            return obj is not None and (own_bounds == (None, None) or in_range(key[0], *own_bounds)) and all(
+                in_range(self._value_of(obj, name), low, high) for name, (low, high) in bounds.items())
+
+        keys = None
+
+        for name, (low, high) in bounds.items():
+            index = self._indexes.get(name)
+
+            if isinstance(index, SortedIndex):
+                selected = index.count(low, high)
+
+                # Picking among the selected objects costs about `selected`,
+                # the walk visits about limit * total / selected keys
+                if selected * selected < (limit + 1) * len(self._storage):
+                    candidates = (sort_index.key_of(obj_id) for obj_id in index.lookup_range(low, high))
+                    candidates = [key for key in candidates if key is not None and matches(key)
+                                  and SortedIndex.follows(key, after_key, descending)]
+                    pick = heapq.nlargest if descending else heapq.nsmallest
+                    keys = pick(limit + 1, [key for key in candidates if key[0] is not None])
+                    keys += sorted(key for key in candidates if key[0] is None)[:limit + 1 - len(keys)]
+                break
+
+        if keys is None:
+            walk = (sort_index.walk(after_key, descending, *own_bounds) if isinstance(sort_index, SortedIndex)
+                    else sort_index.walk(after_key, descending))
+            keys = list(islice((key for key in walk if matches(key)), limit + 1))
+
+        objs = [self.get(obj_id) for _, obj_id in keys[:limit]]
+
+        return objs, keys[limit - 1] if len(keys) > limit else None
+
+    def iter_all(self, batch_size=500):
+        """Iterate over the objects stored when the iteration starts."""
+        for obj_id in list(self._storage):
+            obj = self.get(obj_id)
+
+            if obj is not None:
+                yield obj
+
     def update(self, obj_id, data):
         """Update an object with the given ID using provided data."""
         obj = self.get(obj_id)
         if obj:
+            self._check_indexes(obj_id, self._new_index_values(obj, data))
+
             obj.update(data)
+            self._index_object(obj, check_unique=False)
+
+    def update_with(self, obj_id, change):
+        """Read and update an object while holding the repository lock."""
+        with self._lock:
+            return super().update_with(obj_id, change)
 
     def delete(self, obj_id):
         """Delete an object by its ID from in-memory storage."""
         if obj_id in self._storage:
+            self._unindex_object(obj_id)
             del self._storage[obj_id]
 
+    def add_many(self, objs):
+        """
+        Add several objects, all or none of them.
+
+        Raises:
+            ValueError: If one of the objects breaks a unique index, in
+            which case the ones already added are removed again.
+        """
+        stored = []
+
+        try:
+            for obj in objs:
+                stored.append(self.add(obj))
+
+        except ValueError:
+            for obj in stored:
+                self.delete(obj.id)
+            raise
+
+        return stored
+
+    def update_many(self, obj_ids, data):
+        """
+        Apply the same data to several objects, all or none of them.
+
+        Raises:
+            ValueError: If the data would break a unique index.
+        """
+        obj_ids = [obj_id for obj_id in obj_ids if obj_id in self._storage]
+
+        for key in self._indexes:
+            attr_names = self._index_attributes(key)
+
+            # Every object would end up with the same value
+            if self._indexes[key].unique and len(obj_ids) > 1 and all(
+                    attr_name in data and attr_name not in self.PROTECTED_ATTRIBUTES for attr_name in attr_names):
+                value = self._index_value(None, key, data)
+
+                if value is not None:
+                    raise ValueError(f"An object with {key}: {value} already exists.")
+
+        for obj_id in obj_ids:
+            self._check_indexes(obj_id, self._new_index_values(self._storage[obj_id], data))
+
+        for obj_id in obj_ids:
+            self.update(obj_id, data)
+
     def get_by_attribute(self, attr_name, attr_value):
-        """Retrieve objects by a specific attribute value."""
-        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
+        """
+        Retrieve objects by a specific attribute value.
+
+        Uses the secondary index declared on the attribute when there is one,
+        and falls back to a full scan otherwise.
+        """
+        if attr_name == 'id':
+            obj = self.get(attr_value)
+            return [obj] if obj else []
+
+        index = self._indexes.get(attr_name)
+
+        if index is not None:
+            return [self.get(obj_id) for obj_id in index.lookup(attr_value)]
+
+        return [self.get(obj_id) for obj_id, obj in list(self._storage.items())
+                if self._value_of(obj, attr_name) == attr_value]
+
+    def get_containing(self, attr_name, value):
+        """
+        Retrieve the objects whose list attribute contains a value, through
+        the multi-valued index on the attribute when there is one.
+        """
+        index = self._indexes.get(attr_name)
+
+        if isinstance(index, MultiValueIndex):
+            return [self.get(obj_id) for obj_id in index.lookup(value)]
+
+        return [self.get(obj_id) for obj_id, obj in list(self._storage.items())
+                if value in (self._value_of(obj, attr_name) or ())]
+
+    def get_in_box(self, attr_names, box):
+        """
+        Retrieve the objects located inside a box, from the cells of the
+        spatial index on the attributes when there is one. Otherwise the
+        coordinates of every object are checked without hydrating it.
+        """
+        index = self._indexes.get(tuple(attr_names))
+
+        if isinstance(index, GeoGridIndex):
+            return [self.get(obj_id) for obj_id in index.within(*box)]
+
+        lat_attr, lon_attr = attr_names
+
+        return [self.get(obj_id) for obj_id, obj in list(self._storage.items())
+                if in_box(self._value_of(obj, lat_attr), self._value_of(obj, lon_attr), box)]
+
+    def search_text(self, attr_names, query, limit=20):
+        """
+        Rank the objects matching a query through the full-text index on
+        the attributes, kept up to date on every write. Without one, the
+        texts are indexed for this search only, read without hydrating the
+        objects.
+        """
+        index = self._indexes.get(tuple(attr_names))
+
+        if not isinstance(index, FullTextIndex):
+            index = FullTextIndex(tuple(attr_names))
+
+            for obj_id, obj in list(self._storage.items()):
+                index.add(obj_id, tuple(self._value_of(obj, attr_name) for attr_name in attr_names))
+
+        return [(self.get(obj_id), score) for obj_id, score in index.search(query, limit)]
+
+    def exists(self, **criteria):
+        """
+        Tell whether an object holds every given attribute value, with one
+        probe of the index covering exactly these attributes when there is
+        one. Otherwise the candidates of an index on one of the attributes,
+        or all the objects, are checked without being hydrated.
+        """
+        for key, index in self._indexes.items():
+            if not isinstance(index, MultiValueIndex) and set(self._index_attributes(key)) == set(criteria):
+                return bool(index.lookup(self._index_value(None, key, criteria)))
+
+        candidates = None
+
+        for attr_name, value in criteria.items():
+            index = self._indexes.get(attr_name)
+
+            if index is not None and not isinstance(index, MultiValueIndex):
+                candidates = index.lookup(value)
+                break
+
+        if candidates is None:
+            candidates = list(self._storage)
+
+        return any(
+            all(self._value_of(self._storage[obj_id], attr_name) == value for attr_name, value in criteria.items())
+            for obj_id in candidates if obj_id in self._storage
+        )
+
+    def get_version(self, obj_id):
+        """Return the update timestamp of an object, read without hydrating it."""
+        obj = self._storage.get(obj_id)
+
+        if obj is None:
+            return None
+
+        updated_at = self._value_of(obj, 'updated_at')
+
+        return updated_at if isinstance(updated_at, str) else to_datetime(updated_at).isoformat()
+
+    def delete_by_attribute(self, attr_name, attr_values):
+        """
+        Delete every object whose attribute holds one of the given values,
+        found through the index on the attribute when there is one.
+        """
+        index = self._indexes.get(attr_name)
+
+        if index is None:
+            attr_values = set(attr_values)
+            obj_ids = [obj_id for obj_id, obj in list(self._storage.items())
+                       if self._value_of(obj, attr_name) in attr_values]
+        else:
+            obj_ids = [obj_id for value in attr_values for obj_id in index.lookup(value)]
+
+        self.delete_many(obj_ids)
 
 # <--------------------------------------------------------->
 
 
 class InFileRepository(InMemoryRepository):
-    """File-based repository for persisting data in JSON format."""
+    """
+    File-based repository for persisting data in JSON format.
+
+    In 'snapshot' mode the whole JSON file is rewritten on every mutation.
+    In 'log' mode each mutation is appended to a write-ahead log next to the
+    snapshot, deletes being written as tombstones. The log is replayed over
+    the snapshot on startup and compacted into a new snapshot once it grows
+    past `compact_threshold` bytes.
+
+    Snapshots are pretty-printed JSON by default, or a compact binary
+    format (stored with a '.bin' extension) when `snapshot_format` is
+    'binary'. A binary repository starts from the JSON file the first time
+    if no binary snapshot exists yet.
+
+    Setting `flush_interval` or `flush_max_changes` turns on write-behind:
+    mutated ids go into a dirty set and are written in one go, by a
+    background thread every `flush_interval` seconds or as soon as
+    `flush_max_changes` ids are dirty. `flush()` forces the write and is
+    also called on interpreter shutdown.
+
+    Records are kept as the dictionaries read from disk and only turned
+    into model objects the first time they are requested. When
+    `max_resident` is set, the least recently used objects beyond that
+    number are turned back into dictionaries.
+    """
+
+    DATA_DIR = "/root/Holbertonschool_New_HBnB_Part2_Database/app/data"
+    STORAGE_MODES = ("snapshot", "log")
+    OBJECT_TYPES = ("user", "place", "review", "amenity")
+
+    def __init__(self, file_name, indexes=None, storage_mode="snapshot",
+                 compact_threshold=4 * 1024 * 1024, data_dir=None,
+                 flush_interval=None, flush_max_changes=None, snapshot_format="json",
+                 max_resident=None, record_class=None):
+        """
+        Load the JSON file into memory, creating it if needed.
+
+        Args:
+            file_name (str): Name of the JSON file inside the data directory.
+            indexes (dict, optional): Secondary indexes to maintain,
+            see InMemoryRepository.
+            storage_mode (str): 'snapshot' or 'log'.
+            compact_threshold (int): Log size in bytes triggering a
+            compaction, in 'log' mode.
+            data_dir (str, optional): Directory holding the data files.
+            flush_interval (float, optional): Maximum number of seconds a
+            mutation may wait before being written.
+            flush_max_changes (int, optional): Number of dirty objects
+            triggering an immediate write.
+            snapshot_format (str): 'json' or 'binary'.
+            max_resident (int, optional): Maximum number of hydrated
+            objects kept in memory.
+            record_class (type, optional): Record class objects are
+            loaded as, see InMemoryRepository.
+
+        Raises:
+            ValueError: If the storage mode or snapshot format is unknown.
+        """
+        super().__init__(indexes, record_class)
+
+        if storage_mode not in self.STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode: {storage_mode}")
+
+        if snapshot_format not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
 
-    def __init__(self, file_name):
+        self.storage_mode = storage_mode
+        self.snapshot_format = snapshot_format
+        self.compact_threshold = compact_threshold
+        self.flush_interval = flush_interval
+        self.flush_max_changes = flush_max_changes
+        self.max_resident = max_resident
 
-        data_dir = "/root/Holbertonschool_New_HBnB_Part2_Database/app/data"
+        self._resident = OrderedDict()
+        self._batch_depth = 0
+        self._dirty = {}
+        self._flusher = None
+        self._stop_flusher = threading.Event()
+
+        data_dir = data_dir or self.DATA_DIR
         os.makedirs(data_dir, exist_ok=True)
 
-        self.path = os.path.join(data_dir, file_name)
+        json_path = os.path.join(data_dir, file_name)
+
+        if snapshot_format == "binary":
+            self.path = os.path.splitext(json_path)[0] + ".bin"
+        else:
+            self.path = json_path
+
+        self._log = AppendOnlyLog(self.path + ".log")
+
+        source_path = self.path
+        if not os.path.exists(self.path) and os.path.exists(json_path):
+            source_path = json_path
+
+        if not os.path.exists(source_path):
+            write_atomic(self.path, encode_payload({}, snapshot_format))
+
+        else:
+            try:
+                with gc_paused():
+                    data = decode_payload(read_checked(source_path))
+
+                    for obj_data in data.values():
+                        self._load_record(obj_data)
+
+            except (json.JSONDecodeError, ValueError, struct.error) as e:
+                self._set_aside_corrupted_file(source_path, e)
+
+        if self.storage_mode == "log":
+            self.replay_log()
+            self._compact_if_needed()
+
+        if self.write_behind:
+            atexit.register(self.close)
+
+    @property
+    def write_behind(self):
+        """Whether mutations are buffered instead of written immediately."""
+        return self.flush_interval is not None or self.flush_max_changes is not None
+
+    def _set_aside_corrupted_file(self, path, error):
+        """
+        Move an unreadable snapshot out of the way so that the next save
+        does not overwrite it, and start from an empty storage.
+        """
+        corrupted_path = f"{path}.corrupted-{datetime.now():%Y%m%d%H%M%S}"
+        os.replace(path, corrupted_path)
+        write_atomic(self.path, encode_payload({}, self.snapshot_format))
 
         self._storage = {}
+        self._resident.clear()
+        self._page_index.clear()
+        for index in self._indexes.values():
+            index.clear()
+
+        print(f"The file is empty or corrupted ({str(error)}), it has been moved to {corrupted_path}")
+
+    def _load_record(self, obj_data):
+        """
+        Place a record read from disk in storage without hydrating or
+        persisting it.
+
+        Raises:
+            ValueError: If the record has an unknown type.
+        """
+        if obj_data.get('type') not in self.OBJECT_TYPES:
+            raise ValueError(f"Unknown object type: {obj_data.get('type')}")
+
+        if obj_data['id'] in self._storage:
+            self._unindex_object(obj_data['id'])
+
+        self._index_object(obj_data, check_unique=False)
+        self._storage[obj_data['id']] = obj_data
+        self._resident.pop(obj_data['id'], None)
+
+    def _value_of(self, obj, attr_name):
+        """Return the value of an attribute of a stored object or record."""
+        if isinstance(obj, dict):
+            return obj.get(attr_name)
+
+        return getattr(obj, attr_name, None)
+
+    def _record_of(self, obj):
+        """Return the dictionary written to disk for a stored entry."""
+        if isinstance(obj, dict):
+            return obj
+
+        return obj.to_dict()
+
+    def _make_resident(self, obj_id):
+        """
+        Mark an object as the most recently used one and dehydrate the
+        least recently used ones past `max_resident`.
+        """
+        self._resident[obj_id] = None
+        self._resident.move_to_end(obj_id)
+
+        if self.max_resident is None:
+            return
+
+        while len(self._resident) > self.max_resident:
+            evicted_id, _ = self._resident.popitem(last=False)
+            self._storage[evicted_id] = self._storage[evicted_id].to_dict()
+
+    def get(self, obj_id):
+        """Retrieve an object by its ID, hydrating it on first access."""
+        with self._lock:
+            obj = self._storage.get(obj_id)
+
+            if obj is None:
+                return None
 
-        if not os.path.exists(self.path):
-            with open(self.path, "w") as data_file:
-                json.dump(self._storage, data_file)
+            if isinstance(obj, dict):
+                obj = self.dict_to_obj(dict(obj))
+                self._storage[obj_id] = obj
+
+            self._make_resident(obj_id)
+            return obj
+
+    def get_all(self):
+        """Retrieve all objects, hydrating the ones not in memory."""
+        with self._lock:
+            return [self.get(obj_id) for obj_id in list(self._storage)]
+
+    def iter_all(self, batch_size=500):
+        """
+        Iterate over the objects stored when the iteration starts. Records
+        not in memory are hydrated for the caller only, so a full scan does
+        not make every object resident.
+        """
+        for obj_id in list(self._storage):
+            with self._lock:
+                obj = self._storage.get(obj_id)
+
+                if isinstance(obj, dict):
+                    obj = self.dict_to_obj(dict(obj))
+
+            if obj is not None:
+                yield obj
+
+    def replay_log(self):
+        """Apply the records of the write-ahead log over the snapshot."""
+        for record in self._log.replay():
+            if record["op"] == "put":
+                self._load_record(record["data"])
+
+            elif record["op"] == "delete" and record["id"] in self._storage:
+                self._unindex_object(record["id"])
+                del self._storage[record["id"]]
+                self._resident.pop(record["id"], None)
+
+    def compact(self):
+        """Write a fresh snapshot and empty the write-ahead log."""
+        with self._lock:
+            self.save_to_file()
+            self._log.truncate()
+            self._dirty.clear()
+
+    def _compact_if_needed(self):
+        """Compact the log once it is bigger than the threshold."""
+        if self._log.size() > self.compact_threshold:
+            self.compact()
+
+    def _mark_dirty(self, obj_id):
+        """
+        Record that an object changed, and write it now unless a bulk
+        operation is running or write-behind is on and the batch is not
+        full yet.
+        """
+        self._dirty[obj_id] = None
+
+        if self._batch_depth == 0:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Write the dirty objects now or leave them to write-behind."""
+        if not self.write_behind:
+            self.flush()
+
+        elif self.flush_max_changes is not None and len(self._dirty) >= self.flush_max_changes:
+            self.flush()
 
         else:
+            self._start_flusher()
+
+    def flush(self):
+        """Write every pending mutation to disk."""
+        with self._lock:
+            if not self._dirty:
+                return
+
+            if self.storage_mode == "log":
+                for obj_id in self._dirty:
+                    obj = self._storage.get(obj_id)
+
+                    if obj is None:
+                        self._log.append({"op": "delete", "id": obj_id})
+                    else:
+                        self._log.append({"op": "put", "data": self._record_of(obj)})
+
+                self._dirty.clear()
+                self._compact_if_needed()
+
+            else:
+                self.save_to_file()
+                self._dirty.clear()
+
+    @contextmanager
+    def _bulk(self):
+        """Group the mutations made inside the block into a single write."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+
+                if self._batch_depth == 0 and self._dirty:
+                    self._schedule_flush()
+
+    def _start_flusher(self):
+        """Start the background flusher thread if it is not running."""
+        if self.flush_interval is None or self._flusher is not None:
+            return
+
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(target=self._flush_periodically,
+                                         name=f"flusher-{os.path.basename(self.path)}",
+                                         daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        """Body of the flusher thread."""
+        while not self._stop_flusher.wait(self.flush_interval):
             try:
-                with open(self.path, "r") as data_file:
-                    data = json.load(data_file)
-                    self._storage = {
-                        obj_id: self.dict_to_obj(obj_data)
-                        for obj_id, obj_data in data.items()
-                    }
+                self.flush()
+            except OSError as e:
+                print(f"Background flush of {self.path} failed: {str(e)}")
 
-            except (json.JSONDecodeError, ValueError):
-                print("The file is empty or corrupted")
+    def close(self):
+        """Stop the flusher thread and write the pending mutations."""
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+
+        self.flush()
+        self._log.close()
 
     def dict_to_obj(self, obj_data):
         """
         Convert a dictionary to an object, handling different model types and
         date fields.
         """
-        if 'created_at' in obj_data:
-            obj_data['created_at'] = datetime.fromisoformat(obj_data['created_at'])
-        if 'updated_at' in obj_data:
-            obj_data['updated_at'] = datetime.fromisoformat(obj_data['updated_at'])
+        obj_data['created_at'] = to_datetime(obj_data.get('created_at'))
+        obj_data['updated_at'] = to_datetime(obj_data.get('updated_at'))
 
         obj_type = obj_data.get('type')
 
+        if self.record_class is not None:
+            if obj_type != self.record_class.TYPE:
+                raise ValueError(f"Unknown object type: {obj_type}")
+
+            return self.record_class.from_dict(obj_data)
+
         if obj_type == 'user':
 
             user = User(
@@ -158,6 +1119,11 @@ class InFileRepository(InMemoryRepository):
             place.id = obj_data['id']
             place.created_at = obj_data['created_at']
             place.updated_at = obj_data['updated_at']
+
+            for field in ('review_count', 'rating_sum', 'rating_histogram', 'average_rating'):
+                if field in obj_data:
+                    setattr(place, field, obj_data[field])
+
             return place
 
         elif obj_type == 'review':
@@ -188,42 +1154,77 @@ class InFileRepository(InMemoryRepository):
             raise ValueError(f"Unknown object type: {obj_type}")
 
     def save_to_file(self):
-        """Persist data in storage to the JSON file."""
-        with open(self.path, "w") as data_file:
-            json.dump({obj_id: obj.to_dict() for obj_id, obj in self._storage.items()}, data_file, indent=4)
+        """
+        Persist data in storage to the snapshot file, in the configured
+        format. The snapshot is written to a temporary file, fsynced and
+        renamed over the previous one.
+        """
+        data = {obj_id: self._record_of(obj) for obj_id, obj in self._storage.items()}
+        write_atomic(self.path, encode_payload(data, self.snapshot_format))
         print("Data has been saved")
 
     def add(self, obj):
-        """Add an object to the file storage and save to file."""
-        self._storage[obj.id] = obj
-        self.save_to_file()
+        """Add an object to the file storage and persist it."""
+        with self._lock:
+            obj = super().add(obj)
+            self._make_resident(obj.id)
+            self._mark_dirty(obj.id)
+            return obj
 
     def update(self, obj_id, data):
-        """Update an object in file storage and save to file."""
-        obj = self.get(obj_id)
-        if obj:
-            obj.update(data)
-            self.save_to_file()
+        """Update an object in file storage and persist it."""
+        with self._lock:
+            if obj_id in self._storage:
+                super().update(obj_id, data)
+                self._mark_dirty(obj_id)
 
     def delete(self, obj_id):
-        """Delete an object from file storage and save to file."""
-        if obj_id in self._storage:
-            del self._storage[obj_id]
-            self.save_to_file()
+        """Delete an object from file storage and persist the deletion."""
+        with self._lock:
+            if obj_id in self._storage:
+                super().delete(obj_id)
+                self._resident.pop(obj_id, None)
+                self._mark_dirty(obj_id)
+
+    def add_many(self, objs):
+        """Add several objects and persist them with a single write."""
+        with self._bulk():
+            return super().add_many(objs)
+
+    def update_many(self, obj_ids, data):
+        """Update several objects and persist them with a single write."""
+        with self._bulk():
+            super().update_many(obj_ids, data)
+
+    def delete_many(self, obj_ids):
+        """Delete several objects and persist them with a single write."""
+        with self._bulk():
+            super().delete_many(obj_ids)
 
 # <--------------------------------------------------------->
 
 
 class SQLAlchemyRepository(Repository):
-    """Database repository for persisting data in DB using SQLAlchemy ORM."""
+    """
+    Database repository for persisting data in DB using SQLAlchemy ORM.
+    Writes are committed right away, or with the rest of the unit of work
+    they run in (see app/persistence/unit_of_work.py).
+    """
+
+    # Number of ids per IN clause, below the SQLite bound parameter limit
+    BULK_CHUNK_SIZE = 500
 
     def __init__(self, model):
         self.model = model
 
     def add(self, obj):
-        """Add an object to the database."""
-        db.session.add(obj)
-        db.session.commit()
+        """Add an object to the database, undoing it if a constraint fails."""
+        try:
+            db.session.add(obj)
+            commit()
+        except Exception:
+            rollback()
+            raise
 
     def get(self, obj_id):
         """Retrieve an object by its ID from the database."""
@@ -233,6 +1234,103 @@ class SQLAlchemyRepository(Repository):
         """Retrieve all objects of this model from the database."""
         return self.model.query.all()
 
+    def get_many(self, obj_ids):
+        """
+        Retrieve several objects with one SELECT ... WHERE id IN (...) per
+        chunk of ids.
+
+        Returns:
+            list: The objects found, in the order of `obj_ids`.
+        """
+        obj_ids = list(obj_ids)
+        found = {}
+
+        for chunk in self._chunks(obj_ids):
+            for obj in self.model.query.filter(self.model.id.in_(chunk)).all():
+                found[obj.id] = obj
+
+        return [found[obj_id] for obj_id in obj_ids if obj_id in found]
+
+    def iter_all(self, batch_size=500):
+        """
+        Iterate over all objects, fetching `batch_size` rows at a time
+        instead of loading the whole table.
+        """
+        query = self.model.query.order_by(self.model.created_at, self.model.id)
+
+        yield from query.yield_per(batch_size)
+
+    def get_page(self, after_key=None, limit=50):
+        """
+        Retrieve a page of objects with a range scan on the
+        (created_at, id) index.
+        """
+        query = self.model.query.order_by(self.model.created_at, self.model.id)
+
+        if after_key is not None:
+            created_at, obj_id = after_key
+            query = query.filter(sa.or_(
+                self.model.created_at > created_at,
+                sa.and_(self.model.created_at == created_at, self.model.id > obj_id)
+            ))
+
+        objs = query.limit(limit + 1).all()
+
+        if len(objs) > limit:
+            last = objs[limit - 1]
+            return objs[:limit], page_key(last.created_at, last.id)
+
+        return objs, None
+
+    def get_sorted_page(self, attr_name, after_key=None, limit=50, descending=False, bounds=None):
+        """
+        Retrieve a page of objects with a range scan on the (attribute, id)
+        index, walked backwards for a descending page. Rows without a
+        value follow, read with a second scan of the index by id.
+        """
+        column = getattr(self.model, attr_name)
+        bounds = bounds or {}
+        query = self.model.query
+
+        for name, (low, high) in bounds.items():
+            bounded = getattr(self.model, name)
+
+            if low is not None:
+                query = query.filter(bounded >= low)
+            if high is not None:
+                query = query.filter(bounded <= high)
+
+        objs = []
+
+        if after_key is None or after_key[0] is not None:
+            valued = query.filter(column.isnot(None))
+
+            if after_key is not None:
+                value, obj_id = after_key
+
+                # The inclusive bound on the column alone lets the scan seek to the key
+                if descending:
+                    valued = valued.filter(column <= value, sa.or_(column < value, self.model.id < obj_id))
+                else:
+                    valued = valued.filter(column >= value, sa.or_(column > value, self.model.id > obj_id))
+
+            order = (column.desc(), self.model.id.desc()) if descending else (column, self.model.id)
+            objs = valued.order_by(*order).limit(limit + 1).all()
+
+        if len(objs) <= limit and attr_name not in bounds:
+            missing = query.filter(column.is_(None))
+
+            if after_key is not None and after_key[0] is None:
+                missing = missing.filter(self.model.id > after_key[1])
+
+            objs += missing.order_by(self.model.id).limit(limit + 1 - len(objs)).all()
+
+        if len(objs) > limit:
+            last = objs[limit - 1]
+            return objs[:limit], (getattr(last, attr_name), last.id)
+
+        return objs, None
+
     def update(self, obj_id, data):
         """Update an object in the database with the given data."""
         obj = self.get(obj_id)
@@ -240,15 +1338,232 @@ class SQLAlchemyRepository(Repository):
             for key, value in data.items():
                 setattr(obj, key, value)
             obj.save()
-            db.session.commit()
+            commit()
+
+    def update_with(self, obj_id, change):
+        """
+        Lock the row of an object until the end of the transaction, read it
+        again and update it. Run it in a unit of work along with the writes
+        the change depends on.
+        """
+        connection = db.session.connection()
+
+        # SQLite has no row locks: a first write, changing nothing, takes
+        # the database write lock
+        if connection.dialect.name == "sqlite":
+            table = self.model.__table__
+            db.session.execute(sa.update(table).where(table.c.id == obj_id).values(updated_at=table.c.updated_at))
+
+        obj = db.session.get(self.model, obj_id, with_for_update=True, populate_existing=True)
+
+        if obj is not None:
+            self.update(obj_id, change(obj))
+
+        return obj
 
     def delete(self, obj_id):
         """Delete an object by its ID from the database."""
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit()
 
     def get_by_attribute(self, attr_name, attr_value):
         """Retrieve objects by a specific attribute from the database."""
         return self.model.query.filter_by(**{attr_name: attr_value}).all()
+
+    def exists(self, **criteria):
+        """Tell whether a row holds every given column value with one SELECT EXISTS."""
+        return db.session.query(self.model.query.filter_by(**criteria).exists()).scalar()
+
+    def get_version(self, obj_id):
+        """Return the version of a row, selecting only the version columns of the model."""
+        row = db.session.query(*self.model.version_columns()).filter(self.model.id == obj_id).first()
+
+        return ':'.join(str(value) for value in row) if row is not None else None
+
+    def to_cache(self, obj):
+        """
+        Return the pickled column values of an object, along with its
+        cached state (see BaseModel.cached_state), or None if it has
+        changes that are not flushed yet or columns that are not loaded.
+        Relationships are left out, so the rows they loaded are never
+        served from the cache: they are loaded again when accessed.
+        """
+        state = sa.inspect(obj)
+        keys = state.mapper.column_attrs.keys()
+
+        if not state.persistent or state.modified or not state.unloaded.isdisjoint(keys):
+            return None
+
+        return pickle.dumps(({key: state.dict[key] for key in keys}, obj.cached_state()))
+
+    def from_cache(self, entry):
+        """
+        Return the object of cached column values, attached to the session
+        without querying it: the instance the session holds, if any, or a
+        new one.
+        """
+        obj = self.model.__mapper__.class_manager.new_instance()
+        values, cached_state = pickle.loads(entry)
+
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+
+        make_transient_to_detached(obj)
+        obj = db.session.merge(obj, load=False)
+        obj.restore_cached_state(cached_state)
+
+        return obj
+
+    def watch_changes(self, on_change, on_reset):
+        """
+        Report every flushed change to the objects of the model, including
+        the ones made on the objects directly, and the rollbacks, until the
+        returned callable is called.
+        """
+        model = self.model
+
+        def after_flush(session, flush_context):
+            for obj in (*session.new, *session.dirty, *session.deleted):
+                if isinstance(obj, model):
+                    state = sa.inspect(obj)
+                    on_change(obj.id, {attr.key: list(attr.history.sum()) for attr in state.attrs
+                                       if attr.key in state.mapper.column_attrs})
+
+        def after_soft_rollback(session, previous_transaction):
+            on_reset()
+
+        # The session is shared by every application: the listeners are
+        # removed once the watcher is done, e.g. when its cache is closed
+        listeners = (("after_flush", after_flush), ("after_soft_rollback", after_soft_rollback))
+
+        for event_name, listener in listeners:
+            sa.event.listen(db.session, event_name, listener)
+
+        def unwatch():
+            for event_name, listener in listeners:
+                if sa.event.contains(db.session, event_name, listener):
+                    sa.event.remove(db.session, event_name, listener)
+
+        return unwatch
+
+    def get_containing(self, attr_name, value):
+        """
+        Retrieve the objects whose list attribute contains a value. List
+        attributes stored in an association table are matched with a join
+        on it, other ones are scanned.
+        """
+        attr = getattr(self.model, attr_name)
+
+        if not isinstance(attr, AssociationProxyInstance):
+            return super().get_containing(attr_name, value)
+
+        return self.model.query.join(attr.local_attr).filter(attr.remote_attr == value).all()
+
+    def get_in_box(self, attr_names, box):
+        """
+        Retrieve the rows located inside a box, with range conditions that
+        an index on the (latitude, longitude) columns answers.
+        """
+        lat_column, lon_column = (getattr(self.model, attr_name) for attr_name in attr_names)
+        min_lat, min_lon, max_lat, max_lon = box
+
+        return self.model.query.filter(lat_column.between(min_lat, max_lat),
+                                       lon_column.between(min_lon, max_lon)).all()
+
+    def search_text(self, attr_names, query, limit=20):
+        """
+        Rank the rows matching a query with the bm25() function of the FTS5
+        table declared on the columns (see app/persistence/full_text.py),
+        one search of its inverted index. Databases without that table fall
+        back to indexing the rows for this search only.
+        """
+        table_name = self.model.__tablename__
+        fts_name = full_text_table_of(table_name, attr_names)
+        connection = db.session.connection()
+
+        if fts_name is None or not sa.inspect(connection).has_table(fts_name):
+            return super().search_text(attr_names, query, limit)
+
+        expression = match_expression(query)
+
+        if expression is None:
+            return []
+
+        rows = connection.execute(sa.text(
+            f"SELECT {table_name}.id, bm25({fts_name}) FROM {fts_name} "
+            f"JOIN {table_name} ON {table_name}.rowid = {fts_name}.rowid "
+            f"WHERE {fts_name} MATCH :expression ORDER BY 2 LIMIT :limit"
+        ), {"expression": expression, "limit": limit}).all()
+        objs = {obj.id: obj for obj in self.get_many(obj_id for obj_id, _ in rows)}
+
+        # bm25() is negative, the best matches having the lowest values
+        return [(objs[obj_id], -score) for obj_id, score in rows if obj_id in objs]
+
+    def _delete_dependents(self, condition):
+        """
+        Delete the child rows that session.delete would cascade to, for the
+        rows matching `condition`, with one statement per relationship.
+        """
+        for relationship in sa.inspect(self.model).relationships:
+            if relationship.cascade.delete and relationship.direction is ONETOMANY:
+                (local, remote), = relationship.local_remote_pairs
+                parent_ids = sa.select(local).where(condition)
+                db.session.execute(sa.delete(relationship.mapper.class_).where(remote.in_(parent_ids)))
+
+    def _chunks(self, obj_ids):
+        """Split a list of ids into IN clause sized chunks."""
+        obj_ids = list(obj_ids)
+        for start in range(0, len(obj_ids), self.BULK_CHUNK_SIZE):
+            yield obj_ids[start:start + self.BULK_CHUNK_SIZE]
+
+    def add_many(self, objs):
+        """
+        Add several objects in a single transaction. The session groups
+        the rows of a model in batched multi-row INSERT statements.
+        """
+        objs = list(objs)
+
+        try:
+            db.session.add_all(objs)
+            commit()
+        except Exception:
+            rollback()
+            raise
+
+        return objs
+
+    def update_many(self, obj_ids, data):
+        """Apply the same data to several rows with UPDATE statements in one transaction."""
+        values = {key: value for key, value in data.items()
+                  if key not in InMemoryRepository.PROTECTED_ATTRIBUTES and key != 'type'}
+        values['updated_at'] = datetime.utcnow()
+
+        try:
+            for chunk in self._chunks(obj_ids):
+                db.session.execute(sa.update(self.model).where(self.model.id.in_(chunk)).values(**values))
+            commit()
+        except Exception:
+            rollback()
+            raise
+
+    def delete_many(self, obj_ids):
+        """Delete several rows with DELETE statements in one transaction."""
+        self.delete_by_attribute('id', obj_ids)
+
+    def delete_by_attribute(self, attr_name, attr_values):
+        """
+        Delete the matching rows with DELETE ... WHERE attr IN (...)
+        statements, one per chunk of values, in one transaction.
+        """
+        column = getattr(self.model, attr_name)
+
+        try:
+            for chunk in self._chunks(attr_values):
+                self._delete_dependents(column.in_(chunk))
+                db.session.execute(sa.delete(self.model).where(column.in_(chunk)))
+            commit()
+        except Exception:
+            rollback()
+            raise
@@ -0,0 +1,52 @@
+"""
+Conversions of the timestamps stored by the repositories.
+
+The created_at and updated_at fields are datetimes on hydrated objects,
+ISO strings in JSON snapshots and integer microseconds since the Unix
+epoch in binary snapshots.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+
+def to_datetime(value):
+    """
+    Return a stored timestamp as a datetime.
+
+    Args:
+        value (datetime, str or int): A datetime, an ISO string or epoch
+        microseconds.
+
+    Returns:
+        datetime: The timestamp, None if `value` is None.
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if isinstance(value, int):
+        return EPOCH + timedelta(microseconds=value)
+    return value
+
+
+def to_micros(value):
+    """
+    Return a stored timestamp as epoch microseconds.
+
+    Args:
+        value (datetime, str or int): A datetime, naive or aware, an ISO
+        string or epoch microseconds.
+
+    Returns:
+        int: Microseconds since the Unix epoch, in UTC.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // ONE_MICROSECOND
@@ -0,0 +1,79 @@
+"""
+Unit of work for the database backend.
+
+Inside a unit of work the SQLAlchemy repositories flush their changes
+instead of committing them, and the whole unit is committed once when the
+outermost unit of work ends, or rolled back if it raises. Units of work
+can be nested; the inner ones join the outermost transaction.
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+
+from app.extensions import db
+
+# Key of the nesting depth in the session info dictionary
+DEPTH_KEY = 'unit_of_work_depth'
+
+
+def in_unit_of_work():
+    """Tell whether a unit of work is open on the current session."""
+    return db.session.info.get(DEPTH_KEY, 0) > 0
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Group the database writes of the block in a single transaction.
+
+    Yields:
+        Session: The current session.
+
+    Raises:
+        Exception: Any exception of the block, after the transaction is
+        rolled back.
+    """
+    session = db.session
+    depth = session.info.get(DEPTH_KEY, 0)
+    session.info[DEPTH_KEY] = depth + 1
+
+    try:
+        yield session
+
+        if depth == 0:
+            session.commit()
+
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+
+    finally:
+        session.info[DEPTH_KEY] = depth
+
+
+def transactional(method):
+    """Decorator running a method inside a unit of work."""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with unit_of_work():
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+def commit():
+    """
+    Commit the session, or only flush it inside a unit of work so that the
+    changes are committed with the rest of the unit.
+    """
+    if in_unit_of_work():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def rollback():
+    """Roll the session back, unless a unit of work will do it."""
+    if not in_unit_of_work():
+        db.session.rollback()
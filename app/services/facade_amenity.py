@@ -5,6 +5,7 @@ amenity repository.
 """
 
 from app.models.amenity import Amenity
+from app.persistence.pagination import encode_cursor, decode_cursor
 
 
 class AmenityFacade():
@@ -84,6 +85,21 @@ class AmenityFacade():
 
     #   <-------------------------------------------------------------------->
 
+    def get_amenity_version(self, amenity_id):
+        """
+        Retrieves the version of a amenity, without loading it, to answer
+        conditional requests.
+
+        Args:
+            amenity_id (str): The unique identifier of the amenity.
+
+        Returns:
+            str: The version of the amenity, None if it does not exist.
+        """
+        return self.amenity_repo.get_version(amenity_id)
+
+    #   <-------------------------------------------------------------------->
+
     def get_amenity_by_attribute(self, attr):
         pass
 
@@ -102,6 +118,40 @@ class AmenityFacade():
 
     #   <-------------------------------------------------------------------->
 
+    def get_amenities_page(self, cursor=None, limit=50):
+        """
+        Retrieves one page of amenities, oldest first.
+
+        Args:
+            cursor (str, optional): Cursor returned with the previous page.
+            limit (int): Maximum number of amenities in the page.
+
+        Returns:
+            tuple: The amenities of the page in dictionary form, and the cursor
+            of the next page (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        after_key = decode_cursor(cursor) if cursor else None
+        amenities, next_key = self.amenity_repo.get_page(after_key, limit)
+
+        return [amenity.to_dict() for amenity in amenities], encode_cursor(next_key) if next_key else None
+
+    #   <-------------------------------------------------------------------->
+
+    def iter_amenities(self):
+        """
+        Iterates over all amenities without building the whole list.
+
+        Yields:
+            dict: Each amenity in dictionary form.
+        """
+        for amenity in self.amenity_repo.iter_all():
+            yield amenity.to_dict()
+
+    #   <-------------------------------------------------------------------->
+
     def update_amenity(self, amenity_id, new_data):
         """
         Updates an amenity's data.
@@ -5,6 +5,26 @@ place repository.
 """
 
 from app.models.place import Place
+from app.persistence.pagination import encode_cursor, decode_cursor, encode_sort_cursor, decode_sort_cursor
+from app.persistence.geo import haversine_km, radius_boxes, split_box
+from app.persistence.full_text import tokenize
+
+# Orders of the place listings: sorted attribute, and whether the largest
+# values come first
+PLACE_SORTS = {
+    "created_at": ("created_at", False),
+    "price": ("price", False),
+    "rating": ("average_rating", True),
+}
+
+# Text attributes of the place and review searches
+PLACE_TEXT = ("title", "description")
+REVIEW_TEXT = ("text",)
+
+# Weight of the best matching review in the score of a place, and number of
+# candidates ranked per result by each full-text index
+REVIEW_WEIGHT = 0.5
+SEARCH_CANDIDATES = 5
 
 
 class PlaceFacade():
@@ -13,14 +33,17 @@ class PlaceFacade():
     updating, and deletion of places.
     """
 
-    def __init__(self, selected_repo):
+    def __init__(self, selected_repo, review_repo=None):
         """
         Initializes the PlaceFacade with a repository.
 
         Args:
             selected_repo: The repository instance to manage place persistence.
+            review_repo (optional): The review repository, whose texts are
+            searched along with the places.
         """
         self.place_repo = selected_repo
+        self.review_repo = review_repo
 
     # <------------------------------------------------------------------------>
 
@@ -95,6 +118,21 @@ class PlaceFacade():
 
     #   <------------------------------------------------------------------------>
 
+    def get_place_version(self, place_id):
+        """
+        Retrieves the version of a place, without loading it, to answer
+        conditional requests.
+
+        Args:
+            place_id (str): The unique identifier of the place.
+
+        Returns:
+            str: The version of the place, None if it does not exist.
+        """
+        return self.place_repo.get_version(place_id)
+
+    #   <------------------------------------------------------------------------>
+
     def get_place_by_attribute(self, attr):
         pass
 
@@ -113,6 +151,237 @@ class PlaceFacade():
 
     #   <------------------------------------------------------------------------>
 
+    def get_places_with_amenity(self, amenity_name):
+        """
+        Retrieves the places offering an amenity.
+
+        Args:
+            amenity_name (str): Name of the amenity.
+
+        Returns:
+            list: The matching places in dictionary form.
+        """
+        places = self.place_repo.get_containing("amenities", amenity_name)
+
+        return [place.to_dict() for place in places]
+
+    #   <------------------------------------------------------------------------>
+
+    def get_places_in_box(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Retrieves the places inside a map view, through the spatial index
+        of the repository.
+
+        Args:
+            min_lat, min_lon, max_lat, max_lon (float): Bounds of the view,
+            in degrees. A view crossing the antimeridian has min_lon
+            greater than max_lon.
+
+        Returns:
+            list: The places inside the view in dictionary form.
+
+        Raises:
+            ValueError: If the bounds are out of range.
+        """
+        if not (-90 <= min_lat <= max_lat <= 90):
+            raise ValueError("Latitudes must be ordered and between -90 and 90.")
+
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise ValueError("Longitudes must be between -180 and 180.")
+
+        if min_lon > max_lon:
+            max_lon += 360
+
+        places = self._places_in_boxes(split_box(min_lat, min_lon, max_lat, max_lon))
+
+        return [place.to_dict() for place in places]
+
+    #   <------------------------------------------------------------------------>
+
+    def get_places_nearby(self, latitude, longitude, radius_km):
+        """
+        Retrieves the places within a distance of a point, nearest first.
+        The candidates inside the boxes enclosing the circle are fetched
+        through the spatial index, and only their exact distance is
+        computed.
+
+        Args:
+            latitude, longitude (float): The point, in degrees.
+            radius_km (float): Maximum distance, in kilometers.
+
+        Returns:
+            list: The places in dictionary form, each with its
+            `distance_km` from the point.
+
+        Raises:
+            ValueError: If the point or the radius is out of range.
+        """
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("Latitude must be between -90 and 90, longitude between -180 and 180.")
+
+        if not radius_km > 0:
+            raise ValueError("The radius must be positive.")
+
+        nearby = []
+
+        for place in self._places_in_boxes(radius_boxes(latitude, longitude, radius_km)):
+            distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+
+            if distance <= radius_km:
+                nearby.append((distance, place))
+
+        nearby.sort(key=lambda item: item[0])
+
+        return [dict(place.to_dict(), distance_km=round(distance, 3)) for distance, place in nearby]
+
+    #   <------------------------------------------------------------------------>
+
+    def _places_in_boxes(self, boxes):
+        """Return the places inside any of the boxes, each once."""
+        places = {}
+
+        for box in boxes:
+            for place in self.place_repo.get_in_box(("latitude", "longitude"), box):
+                places[place.id] = place
+
+        return list(places.values())
+
+    #   <------------------------------------------------------------------------>
+
+    def search_places(self, query, limit=20):
+        """
+        Retrieves the places matching the words of a query, best match
+        first. A place scores the BM25 relevance of its title and
+        description, plus a share of the relevance of its best matching
+        review.
+
+        Args:
+            query (str): Search query.
+            limit (int): Maximum number of places.
+
+        Returns:
+            list: The places in dictionary form, each with its `score`.
+
+        Raises:
+            ValueError: If the query has no word to search.
+        """
+        if not tokenize(query):
+            raise ValueError("The search query must contain at least one word.")
+
+        candidates = limit * SEARCH_CANDIDATES
+        places = {}
+        scores = {}
+
+        for place, score in self.place_repo.search_text(PLACE_TEXT, query, candidates):
+            places[place.id] = place
+            scores[place.id] = score
+
+        if self.review_repo is not None:
+            review_scores = {}
+
+            for review, score in self.review_repo.search_text(REVIEW_TEXT, query, candidates):
+                review_scores[review.place_id] = max(score, review_scores.get(review.place_id, 0.0))
+
+            for place_id, score in review_scores.items():
+                scores[place_id] = scores.get(place_id, 0.0) + REVIEW_WEIGHT * score
+
+        ranked = sorted(scores, key=lambda place_id: (-scores[place_id], place_id))[:limit]
+        missing = [place_id for place_id in ranked if place_id not in places]
+        places.update((place.id, place) for place in self.place_repo.get_many(missing))
+
+        return [dict(places[place_id].to_dict(), score=round(scores[place_id], 4))
+                for place_id in ranked if place_id in places]
+
+    #   <------------------------------------------------------------------------>
+
+    def get_places_page(self, cursor=None, limit=50, sort="created_at", min_price=None, max_price=None):
+        """
+        Retrieves one page of places, oldest first, cheapest first or best
+        rated first, optionally within a price range. Places without
+        reviews come last in the listing by rating.
+
+        Args:
+            cursor (str, optional): Cursor returned with the previous page.
+            limit (int): Maximum number of places in the page.
+            sort (str): 'created_at', 'price' or 'rating'.
+            min_price, max_price (float, optional): Price range, bounds
+            included.
+
+        Returns:
+            tuple: The places of the page in dictionary form, and the cursor
+            of the next page (None on the last page).
+
+        Raises:
+            ValueError: If the sort, the price range or the cursor is
+            invalid.
+        """
+        if sort not in PLACE_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(PLACE_SORTS)}.")
+
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price must not be greater than max_price.")
+
+        attr_name, descending = PLACE_SORTS[sort]
+        bounds = {"price": (min_price, max_price)} if min_price is not None or max_price is not None else None
+
+        if sort != "created_at":
+            after_key = decode_sort_cursor(sort, cursor) if cursor else None
+            places, next_key = self.place_repo.get_sorted_page(attr_name, after_key, limit, descending, bounds)
+
+            return [place.to_dict() for place in places], encode_sort_cursor(sort, next_key) if next_key else None
+
+        after_key = decode_cursor(cursor) if cursor else None
+
+        if bounds is None:
+            places, next_key = self.place_repo.get_page(after_key, limit)
+        else:
+            places, next_key = self.place_repo.get_sorted_page(attr_name, after_key, limit, descending, bounds)
+
+        return [place.to_dict() for place in places], encode_cursor(next_key) if next_key else None
+
+    #   <------------------------------------------------------------------------>
+
+    def rebuild_ratings(self, reviews):
+        """
+        Recomputes the rating aggregates of every place from its reviews,
+        in one pass over the reviews and one over the places.
+
+        Args:
+            reviews (iterable): All the reviews.
+
+        Returns:
+            int: Number of places whose aggregates were corrected.
+        """
+        histograms = {}
+
+        for review in reviews:
+            histograms.setdefault(review.place_id, [0] * 5)[review.rating - 1] += 1
+
+        updated = 0
+
+        for place in list(self.place_repo.iter_all()):
+            aggregates = Place.rating_aggregates(histograms.get(place.id, [0] * 5))
+
+            if any(getattr(place, field) != value for field, value in aggregates.items()):
+                self.place_repo.update(place.id, aggregates)
+                updated += 1
+
+        return updated
+
+    #   <------------------------------------------------------------------------>
+
+    def iter_places(self):
+        """
+        Iterates over all places without building the whole list.
+
+        Yields:
+            dict: Each place in dictionary form.
+        """
+        for place in self.place_repo.iter_all():
+            yield place.to_dict()
+
+    #   <------------------------------------------------------------------------>
+
     def update_place(self, place_id, new_data):
         """
         Updates a place's data.
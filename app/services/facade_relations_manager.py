@@ -65,10 +65,13 @@ class FacadeRelationManager:
 
         place = self.place_facade.create_place(place_data)
 
-        if isinstance(self.user_facade.user_repo, SQLAlchemyRepository):
-            user.places.append(place)
+        # Look through a CachingRepository at the storage backend
+        user_repo = getattr(self.user_facade.user_repo, 'repository', self.user_facade.user_repo)
+
+        if isinstance(user_repo, SQLAlchemyRepository):
+            user.places = [*user.places, place]
         else:
-            user.places.append(place['id'])
+            user.places = [*user.places, place['id']]
 
         self.user_facade.user_repo.update(user_id, user.to_dict())
 
@@ -95,7 +98,7 @@ class FacadeRelationManager:
         places = user.places
 
         if place_id in places:
-            places.remove(place_id)
+            user.places = [user_place for user_place in places if user_place != place_id]
             self.user_facade.user_repo.update(user_id, user.to_dict())
 
         else:
@@ -108,13 +111,14 @@ class FacadeRelationManager:
 
     def delete_user_and_associated_instances(self, user_id):
         """
-        Deletes a user and their associated places.
+        Deletes a user and their associated places, with one batched
+        deletion of the reviews of those places and one of the places.
 
         Args:
             user_id (str): ID of the user to delete.
 
         Raises:
-            ValueError: If the user or any associated place is not found.
+            ValueError: If the user is not found.
         """
         try:
             user = self.user_facade.user_repo.get(user_id)
@@ -125,8 +129,8 @@ class FacadeRelationManager:
             places_ids_list = user.places
 
             if places_ids_list:
-                for place_id in places_ids_list:
-                    self.delete_place_and_associated_instances(place_id)
+                self.review_facade.review_repo.delete_by_attribute("place_id", places_ids_list)
+                self.place_facade.place_repo.delete_many(places_ids_list)
             
             self.user_facade.user_repo.delete(user_id)
 
@@ -163,7 +167,7 @@ class FacadeRelationManager:
             user_places = user.places
 
             if place_id in user_places:
-                user_places.remove(place_id)
+                user.places = [user_place for user_place in user_places if user_place != place_id]
                 self.user_facade.user_repo.update(user_id, user.to_dict())
 
             else:
@@ -172,8 +176,7 @@ class FacadeRelationManager:
             reviews_ids_list = place.reviews
 
             if reviews_ids_list:
-                for review_id in reviews_ids_list:
-                    self.review_facade.review_repo.delete(review_id)
+                self.review_facade.review_repo.delete_many(reviews_ids_list)
 
             else:
                 raise ValueError(f"No corresponding review found for this place.")
@@ -217,7 +220,7 @@ class FacadeRelationManager:
             raise ValueError(f"name must not be empty and less than 50 characters")
         
         else:
-            place.amenities.append(amenity_name)
+            place.amenities = [*place.amenities, amenity_name]
             self.place_facade.place_repo.update(place_id, place.to_dict())
             print(f"Amenity: {amenity_name} has been added to the place: {place_id}")
 
@@ -289,7 +292,7 @@ class FacadeRelationManager:
         amenities = place.amenities
 
         if amenity_name in amenities:
-            amenities.remove(amenity_name)
+            place.amenities = [name for name in amenities if name != amenity_name]
             self.place_facade.place_repo.update(place_id, place.to_dict())
 
         else:
@@ -312,16 +315,7 @@ class FacadeRelationManager:
         Raises:
             ValueError: If no places with the amenity are found.
         """
-        places = self.place_facade.get_all_places()
-
-        if not places:
-            raise ValueError("No place found in place_repo")
-
-        place_amenity_name_list = []
-
-        for place in places:
-            if amenity_name in place["amenities"]:
-                place_amenity_name_list.append(place)
+        place_amenity_name_list = self.place_facade.get_places_with_amenity(amenity_name)
 
         if not place_amenity_name_list:
             raise ValueError(f"No place found with the amenity: {amenity_name}")
@@ -361,32 +355,38 @@ class FacadeRelationManager:
         review_data["user_first_name"] = user.first_name
         review_data["user_id"] = user_id
 
+        # The facade also counts the rating in the place aggregates
         review = self.review_facade.create_review(review_data)
-        place.reviews.append(review['id'])
-        self.place_facade.place_repo.update(place_id, place.to_dict())
+        place.add_review(review['id'])
+        self.place_facade.place_repo.update(place_id, {"reviews": place.reviews})
 
         return review
 
 #         # <------------------------------------------>
 
     def get_all_reviews_dict_from_place_reviews_id_list(self, place_id):
-        place = self.place_facade.place_repo.get(place_id)
+        """
+        Retrieves the reviews of a place with one lookup on the indexed
+        place_id of the reviews.
 
-        if not place:
-            raise ValueError(f"User with id: {place_id} not found")
+        Args:
+            place_id (str): ID of the place.
 
-        reviews_id_list = place.reviews
+        Returns:
+            list: The reviews of the place.
 
-        reviews_dict_list = []
+        Raises:
+            ValueError: If the place does not exist or has no review.
+        """
+        reviews = self.review_facade.review_repo.get_by_attribute("place_id", place_id)
 
-        for review_id in reviews_id_list:
-            review = self.review_facade.review_repo.get(review_id)
-            reviews_dict_list.append(review)
+        if not reviews:
+            if not self.place_facade.place_repo.get(place_id):
+                raise ValueError(f"Place with id: {place_id} not found")
 
-        if not reviews_dict_list:
             raise ValueError(f"No reviews found for this place: {place_id}")
 
-        return reviews_dict_list
+        return reviews
 
 #         # <------------------------------------------>
 
@@ -421,13 +421,14 @@ class FacadeRelationManager:
         reviews = place.reviews
 
         if review_id in reviews:
-            reviews.remove(review_id)
+            place.reviews = [place_review for place_review in reviews if place_review != review_id]
             self.place_facade.place_repo.update(place_id, place.to_dict())
             
         else:
             raise ValueError(f"Review with id: {review_id} not found")
 
-        self.review_facade.review_repo.delete(review_id)
+        # The facade also takes the rating out of the place aggregates
+        self.review_facade.delete_review(review_id)
 
 
 # #  User - review relations
@@ -5,6 +5,7 @@ review repository.
 """
 
 from app.models.review import Review
+from app.persistence.pagination import encode_cursor, decode_cursor
 
 
 class ReviewFacade():
@@ -13,15 +14,36 @@ class ReviewFacade():
     retrieval, updating, and deletion of reviews.
     """
 
-    def __init__(self, selected_repo):
+    def __init__(self, selected_repo, place_repo=None):
         """
         Initializes the ReviewFacade with a repository.
 
         Args:
             selected_repo: The repository instance
             to manage review persistence.
+            place_repo (optional): The place repository, whose rating
+            aggregates are kept up to date with the reviews.
         """
         self.review_repo = selected_repo
+        self.place_repo = place_repo
+
+    # <---------------------------------------------------------------------->
+
+    def _rate_place(self, place_id, added=None, removed=None):
+        """
+        Updates the rating aggregates of the reviewed place in O(1), the
+        place being locked from the read of its counters to their update.
+
+        Args:
+            place_id (str): The unique identifier of the place.
+            added (int, optional): Rating of the new or updated review.
+            removed (int, optional): Rating of the deleted review, or the
+            former rating of the updated one.
+        """
+        if self.place_repo is None or added == removed:
+            return
+
+        self.place_repo.update_with(place_id, lambda place: place.rating_update(added, removed))
 
     # <---------------------------------------------------------------------->
 
@@ -62,6 +84,7 @@ class ReviewFacade():
         if review.is_valid():
             print(f"Review: {review.id} passed validation.")
             self.review_repo.add(review)
+            self._rate_place(review.place_id, added=review.rating)
             return review.to_dict()
         
         else:
@@ -70,6 +93,21 @@ class ReviewFacade():
 
     #   <-------------------------------------------------------------------->
 
+    def has_reviewed(self, user_id, place_id):
+        """
+        Checks whether a user already reviewed a place.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+            place_id (str): The unique identifier of the place.
+
+        Returns:
+            bool: True if the user has a review for this place.
+        """
+        return self.review_repo.exists(user_id=user_id, place_id=place_id)
+
+    #   <-------------------------------------------------------------------->
+
     def get_all_reviews(self):
         """
         Retrieves all reviews.
@@ -83,6 +121,40 @@ class ReviewFacade():
 
     #   <-------------------------------------------------------------------->
 
+    def get_reviews_page(self, cursor=None, limit=50):
+        """
+        Retrieves one page of reviews, oldest first.
+
+        Args:
+            cursor (str, optional): Cursor returned with the previous page.
+            limit (int): Maximum number of reviews in the page.
+
+        Returns:
+            tuple: The reviews of the page in dictionary form, and the cursor
+            of the next page (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        after_key = decode_cursor(cursor) if cursor else None
+        reviews, next_key = self.review_repo.get_page(after_key, limit)
+
+        return [review.to_dict() for review in reviews], encode_cursor(next_key) if next_key else None
+
+    #   <-------------------------------------------------------------------->
+
+    def iter_reviews(self):
+        """
+        Iterates over all reviews without building the whole list.
+
+        Yields:
+            dict: Each review in dictionary form.
+        """
+        for review in self.review_repo.iter_all():
+            yield review.to_dict()
+
+    #   <-------------------------------------------------------------------->
+
     def get_review(self, review_id):
         """
         Retrieves a review by ID.
@@ -106,6 +178,21 @@ class ReviewFacade():
 
     #   <-------------------------------------------------------------------->
 
+    def get_review_version(self, review_id):
+        """
+        Retrieves the version of a review, without loading it, to answer
+        conditional requests.
+
+        Args:
+            review_id (str): The unique identifier of the review.
+
+        Returns:
+            str: The version of the review, None if it does not exist.
+        """
+        return self.review_repo.get_version(review_id)
+
+    #   <-------------------------------------------------------------------->
+
     def update_review(self, review_id, new_data):
         """
         Updates a review's data.
@@ -138,7 +225,9 @@ class ReviewFacade():
             raise ValueError("Review validation failed. Please check the email and other attributes.")
 
         if review:
+            place_id, former_rating = review.place_id, review.rating
             self.review_repo.update(review_id, new_data)
+            self._rate_place(place_id, added=new_data["rating"], removed=former_rating)
 
             return review.to_dict()
         else:
@@ -161,7 +250,9 @@ class ReviewFacade():
 
         if review:
             print(f"Review: {review} has been deleted")
+            place_id, rating = review.place_id, review.rating
             self.review_repo.delete(review_id)
+            self._rate_place(place_id, removed=rating)
             
         else:
             raise ValueError(f"Review: {review_id} not found !")
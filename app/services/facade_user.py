@@ -5,6 +5,7 @@ with the user repository.
 """
 
 from app.models.user import User
+from app.persistence.pagination import encode_cursor, decode_cursor
 from email_validator import EmailNotValidError
 
 
@@ -90,6 +91,21 @@ class UserFacade():
 
     #   <------------------------------------------------------------------------>
 
+    def get_user_version(self, user_id):
+        """
+        Retrieves the version of a user, without loading it, to answer
+        conditional requests.
+
+        Args:
+            user_id (str): The unique identifier of the user.
+
+        Returns:
+            str: The version of the user, None if it does not exist.
+        """
+        return self.user_repo.get_version(user_id)
+
+    #   <------------------------------------------------------------------------>
+
     def get_user_by_email(self, email):
         """
         Retrieves a user by email.
@@ -125,6 +141,40 @@ class UserFacade():
 
     #   <------------------------------------------------------------------------>
 
+    def get_users_page(self, cursor=None, limit=50):
+        """
+        Retrieves one page of users, oldest first.
+
+        Args:
+            cursor (str, optional): Cursor returned with the previous page.
+            limit (int): Maximum number of users in the page.
+
+        Returns:
+            tuple: The users of the page in dictionary form, and the cursor
+            of the next page (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        after_key = decode_cursor(cursor) if cursor else None
+        users, next_key = self.user_repo.get_page(after_key, limit)
+
+        return [user.to_dict() for user in users], encode_cursor(next_key) if next_key else None
+
+    #   <------------------------------------------------------------------------>
+
+    def iter_users(self):
+        """
+        Iterates over all users without building the whole list.
+
+        Yields:
+            dict: Each user in dictionary form.
+        """
+        for user in self.user_repo.iter_all():
+            yield user.to_dict()
+
+    #   <------------------------------------------------------------------------>
+
     def update_user(self, user_id, new_data):
         """
         Updates a user's data.
@@ -17,8 +17,11 @@ Dependencies:
       to enable modular and reusable operations on these entities.
 """
 
+from datetime import datetime
+
 from app.extensions import db
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import transactional
 from app.models.user import User
 
 
@@ -28,6 +31,9 @@ class SQLAlchemyFacadeRelationManager:
     `Amenity` and `Review` entities. This class allows managing relationships
     and associated data modifications in the database.
 
+    Each operation runs in a unit of work: its changes are committed
+    together at the end, or rolled back if it fails.
+
     Attributes:
         user_facade (UserFacade): Facade for user-related operations.
         place_facade (PlaceFacade): Facade for place-related operations.
@@ -53,6 +59,7 @@ class SQLAlchemyFacadeRelationManager:
 # User - place relations
 # <------------------------------------------------------------------------>
 
+    @transactional
     def create_place_for_user(self, user_id, place_data):
         """
         Create a place associated with a specific user.
@@ -87,15 +94,13 @@ class SQLAlchemyFacadeRelationManager:
         if place_id not in user.places:
             user.places = user.places + [place_id]
 
-        print(f"user.places before commit: {user.places}")
         db.session.add(user)
-        db.session.commit()
-        print(f"user.places after commit: {user.places}")
 
         return place
 
 #       <---------------------------------------------------------->
 
+    @transactional
     def delete_place_from_owner_place_list(self, place_id, user_id):
         """
         Delete a place from the owner's list and database.
@@ -121,7 +126,6 @@ class SQLAlchemyFacadeRelationManager:
                 user.places = [pid for pid in user.places if pid != place_id]
 
                 db.session.add(user)
-                db.session.commit()
 
             else:
                 raise ValueError(f"Place ID {place_id} not found in user's places list.")
@@ -133,9 +137,12 @@ class SQLAlchemyFacadeRelationManager:
 
 #       <---------------------------------------------------------->
 
+    @transactional
     def delete_user_and_associated_instances(self, user_id):
         """
-        Delete a user along with all associated places and related reviews.
+        Delete a user along with all associated places and related reviews,
+        with set-based DELETE statements: the reviews of the places, then
+        the places, then the user.
 
         Args:
             user_id (str): ID of the user to delete.
@@ -152,8 +159,8 @@ class SQLAlchemyFacadeRelationManager:
             places_ids_list = user.places
 
             if places_ids_list:
-                for place_id in places_ids_list:
-                    self.delete_place_and_associated_instances(place_id)
+                self.review_facade.review_repo.delete_by_attribute("place_id", places_ids_list)
+                self.place_facade.place_repo.delete_many(places_ids_list)
             
             self.user_facade.user_repo.delete(user_id)
 
@@ -164,6 +171,7 @@ class SQLAlchemyFacadeRelationManager:
 
         # <------------------------------------------>
 
+    @transactional
     def delete_place_and_associated_instances(self, place_id):
         """
         Delete a place along with all associated reviews.
@@ -190,18 +198,12 @@ class SQLAlchemyFacadeRelationManager:
                 user.places = [pid for pid in user.places if pid != place_id]
 
                 db.session.add(user)
-                db.session.commit()
 
             else:
                 raise ValueError(
                     f"Place ID {place_id} not found in user's places list.")
 
-            reviews_ids_list = place.reviews
-
-            if reviews_ids_list:
-                for review_id in reviews_ids_list:
-                    self.review_facade.review_repo.delete(review_id)
-            
+            self.review_facade.review_repo.delete_by_attribute("place_id", [place_id])
             self.place_facade.place_repo.delete(place_id)
 
         except ValueError as e:
@@ -212,6 +214,7 @@ class SQLAlchemyFacadeRelationManager:
 #  Place - Amenity relations
 # <------------------------------------------------------------------------>
 
+    @transactional
     def add_amenity_to_a_place(self, place_id, amenity_data):
         """
         Add an amenity to a place.
@@ -237,9 +240,10 @@ class SQLAlchemyFacadeRelationManager:
 
         if not amenity_data["name"] in place.amenities:
             place.amenities = place.amenities + [amenity_data["name"]]
+            # The amenity links are other rows, the place version moves with updated_at
+            place.updated_at = datetime.utcnow()
 
             db.session.add(place)
-            db.session.commit()
 
             print(f"Amenity: {amenity_data['name']} has been added to the place: {place_id}")
 
@@ -253,6 +257,7 @@ class SQLAlchemyFacadeRelationManager:
 
         # <------------------------------------------>
 
+    @transactional
     def delete_amenity_from_place_list(self, amenity_name, place_id):
         """
         Delete an amenity from a place's amenities list.
@@ -271,9 +276,9 @@ class SQLAlchemyFacadeRelationManager:
 
         if amenity_name in place.amenities:
             place.amenities = [amty_name for amty_name in place.amenities if amty_name != amenity_name]
+            place.updated_at = datetime.utcnow()
 
             db.session.add(place)
-            db.session.commit()
 
         else:
             raise ValueError(f"Amenity {amenity_name} not found in places_amenities list.")
@@ -282,6 +287,7 @@ class SQLAlchemyFacadeRelationManager:
 # #  Place - review relations
 # # <------------------------------------------------------------------------>
 
+    @transactional
     def create_review_for_place(self, place_id, user_id, review_data):
         """
         Create a review for a specific place and associate it with a user.
@@ -311,25 +317,16 @@ class SQLAlchemyFacadeRelationManager:
         review_data["user_first_name"] = user.first_name
         review_data["user_id"] = user_id
 
-        review = self.review_facade.create_review(review_data)
-        review_id = review['id']
-
-        if place.reviews is None:
-            place.reviews = []
-
-        if review_id not in place.reviews:
-            place.reviews = place.reviews + [review_id]
-
-        db.session.add(place)
-        db.session.commit()
-
-        return review
+        # The review joins place.reviews through its place_id, and the
+        # facade counts its rating in the place aggregates
+        return self.review_facade.create_review(review_data)
 
         # <------------------------------------------>
 
+    @transactional
     def delete_review_from_place_list(self, review_id, place_id):
         """
-        Delete a review from a place's reviews list.
+        Delete a review of a place.
 
         Args:
             review_id (str): ID of the review to delete.
@@ -343,15 +340,10 @@ class SQLAlchemyFacadeRelationManager:
         if not place:
             raise ValueError(f"Place with id: {place_id} not found")
 
-        reviews = place.reviews
-
-        if review_id in reviews:
-            place.reviews = [rev_id for rev_id in reviews if rev_id != review_id]
+        review = self.review_facade.review_repo.get(review_id)
 
-            db.session.add(place)
-            db.session.commit()
-
-        else:
+        if not review or review.place_id != place_id:
             raise ValueError(f"Review with id: {review_id} not found")
 
-        self.review_facade.review_repo.delete(review_id)
+        # The facade also takes the rating out of the place aggregates
+        self.review_facade.delete_review(review_id)
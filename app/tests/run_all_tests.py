@@ -4,6 +4,8 @@ from app.tests.tests_models.test_user_model import TestUserModel
 from app.tests.tests_models.test_place_model import TestPlaceModel
 from app.tests.tests_models.test_amenity_model import TestAmenityModel
 from app.tests.tests_models.test_review_model import TestReviewModel
+from app.tests.tests_models.test_records import TestRecords
+from app.tests.tests_models.test_serialization_cache import TestSerializationCache, TestSQLAlchemySerializationCache
 
 from app.tests.tests_facades.test_user_facade import TestUserFacade
 from app.tests.tests_facades.test_place_facade import TestPlaceFacade
@@ -11,6 +13,31 @@ from app.tests.tests_facades.test_amenity_facade import TestAmenityFacade
 from app.tests.tests_facades.test_review_facade import TestReviewFacade
 from app.tests.tests_facades.test_relations_manager_facade import TestFacadeRelationManager
 
+from app.tests.tests_persistence.test_in_memory_repository import (
+    TestInMemoryRepositoryIndexes, TestInMemoryRepositoryExists, TestInMemoryRepositoryUpdateWith
+)
+from app.tests.tests_persistence.test_in_file_repository import (
+    TestInFileRepositoryLog, TestInFileRepositoryWriteBehind, TestInFileRepositoryLazyHydration
+)
+from app.tests.tests_persistence.test_snapshot import TestSnapshot
+from app.tests.tests_persistence.test_binary_snapshot import TestBinarySnapshot
+from app.tests.tests_persistence.test_bulk_operations import (
+    TestInMemoryBulkOperations, TestInFileBulkOperations, TestSQLAlchemyBulkOperations
+)
+from app.tests.tests_persistence.test_pagination import TestCursor, TestMemoryPagination, TestSQLAlchemyPagination
+from app.tests.tests_persistence.test_db_engine import TestEngineOptions, TestMonitoredQueuePool
+from app.tests.tests_persistence.test_unit_of_work import TestUnitOfWork
+from app.tests.tests_persistence.test_place_amenities import TestMemoryPlaceAmenities, TestSQLAlchemyPlaceAmenities
+from app.tests.tests_persistence.test_place_reviews import TestSQLAlchemyPlaceReviews
+from app.tests.tests_persistence.test_query_plans import TestQueryPlans
+from app.tests.tests_persistence.test_caching import TestLRUCache, TestMemoryCachingRepository, TestSQLAlchemyCachingRepository
+from app.tests.tests_persistence.test_versions import TestMemoryVersions, TestSQLAlchemyVersions
+from app.tests.tests_persistence.test_geo_search import TestGeoHelpers, TestMemoryGeoSearch, TestSQLAlchemyGeoSearch
+from app.tests.tests_persistence.test_sorted_listing import (
+    TestSortedIndex, TestMemorySortedPages, TestSQLAlchemySortedPages
+)
+from app.tests.tests_persistence.test_full_text import TestFullTextIndex, TestMemoryFullText, TestSQLAlchemyFullText
+
 from app.tests.tests_endpoints.base_test import BaseTestCase
 from app.tests.tests_endpoints.test_user_endpoints import TestUserEndpoints
 from app.tests.tests_endpoints.test_place_endpoints import TestPlaceEndpoints
@@ -31,6 +31,54 @@ class TestPlaceEndpoints(BaseTestCase):
         data = response.get_json()
         self.assertIn("No place found", data['message'])
 
+    def test_get_places_page(self):
+        """Test retrieving one page of places with the next cursor in a header."""
+        self.app.extensions['HBNB_FACADE'].place_facade.get_places_page.return_value = ([self.mock_place], "next-cursor")
+
+        response = self.client.get('/places/?limit=1&cursor=abc')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]['id'], 'place-456')
+        self.assertEqual(response.headers['X-Next-Cursor'], "next-cursor")
+        self.app.extensions['HBNB_FACADE'].place_facade.get_places_page.assert_called_once_with("abc", 1)
+
+    def test_get_places_last_page(self):
+        """Test that the last page has no next cursor."""
+        self.app.extensions['HBNB_FACADE'].place_facade.get_places_page.return_value = ([], None)
+
+        response = self.client.get('/places/?limit=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_get_places_page_invalid_limit(self):
+        """Test that an out of range limit is refused."""
+        response = self.client.get('/places/?limit=0')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("limit must be between", response.get_json()['message'])
+
+    def test_get_places_sorted_in_price_range(self):
+        """Test that the sort and price range parameters give a first page of the listing."""
+        place_facade = self.app.extensions['HBNB_FACADE'].place_facade
+        place_facade.get_places_page.return_value = ([self.mock_place], None)
+
+        response = self.client.get('/places/?sort=price&min_price=50&max_price=150')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]['id'], 'place-456')
+        place_facade.get_places_page.assert_called_once_with(None, 50, sort="price", min_price=50.0, max_price=150.0)
+
+        response = self.client.get('/places/?min_price=cheap')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("min_price must be a number", response.get_json()['message'])
+
+    def test_stream_places(self):
+        """Test streaming places with the stream query parameter."""
+        self.app.extensions['HBNB_FACADE'].place_facade.iter_places.return_value = iter([self.mock_place])
+
+        response = self.client.get('/places/?stream=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(json.loads(response.get_data(as_text=True))['id'], 'place-456')
+
     def test_get_place_by_id(self):
         """Test retrieving a place by ID."""
         # Mock the get_place method
@@ -52,6 +100,41 @@ class TestPlaceEndpoints(BaseTestCase):
         data = response.get_json()
         self.assertIn("Place not found", data['message'])
 
+    def test_get_place_not_modified(self):
+        """Test that a matching If-None-Match is answered before the place is loaded."""
+        facade = self.app.extensions['HBNB_FACADE']
+        facade.place_facade.get_place_version.return_value = "2022-01-01T00:00:00"
+        facade.place_facade.get_place.return_value = self.mock_place
+
+        etag = self.client.get('/places/place-456').headers['ETag']
+        facade.place_facade.get_place.reset_mock()
+
+        response = self.client.get('/places/place-456', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.data, b'')
+        facade.place_facade.get_place_version.assert_called_with('place-456')
+        facade.place_facade.get_place.assert_not_called()
+
+        facade.place_facade.get_place_version.return_value = "2022-01-02T00:00:00"
+        response = self.client.get('/places/place-456', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_get_all_places_not_modified(self):
+        """Test that the ETag of the list follows its content."""
+        facade = self.app.extensions['HBNB_FACADE']
+        facade.place_facade.get_all_places.return_value = [self.mock_place]
+
+        etag = self.client.get('/places/').headers['ETag']
+        response = self.client.get('/places/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        facade.place_facade.get_all_places.return_value = [dict(self.mock_place, price=90.0)]
+        response = self.client.get('/places/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]['price'], 90.0)
+
     def test_update_place(self):
         """Test updating a place."""
         updated_data = {
@@ -267,5 +350,53 @@ class TestPlaceEndpoints(BaseTestCase):
         data = response.get_json()
         self.assertIn(f"No place found with the amenity: {amenity_name}", data['message'])
 
+    def test_get_places_nearby(self):
+        """Test searching the places around a point."""
+        place_facade = self.app.extensions['HBNB_FACADE'].place_facade
+        place_facade.get_places_nearby.return_value = [dict(self.mock_place, distance_km=1.5)]
+
+        response = self.client.get('/places/nearby?lat=48.85&lon=2.35&radius_km=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]['distance_km'], 1.5)
+        place_facade.get_places_nearby.assert_called_once_with(48.85, 2.35, 5.0)
+
+    def test_get_places_in_bbox(self):
+        """Test searching the places of a map view, given as min_lon,min_lat,max_lon,max_lat."""
+        place_facade = self.app.extensions['HBNB_FACADE'].place_facade
+        place_facade.get_places_in_box.return_value = [self.mock_place]
+
+        response = self.client.get('/places/nearby?bbox=2.2,48.8,2.5,48.9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]['id'], 'place-456')
+        place_facade.get_places_in_box.assert_called_once_with(48.8, 2.2, 48.9, 2.5)
+
+    def test_get_places_nearby_invalid(self):
+        """Test that missing or malformed search parameters are refused."""
+        response = self.client.get('/places/nearby?lat=48.85&lon=2.35')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("radius_km is required", response.get_json()['message'])
+
+        response = self.client.get('/places/nearby?bbox=2.2,48.8')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("bbox must be", response.get_json()['message'])
+
+    def test_search_places(self):
+        """Test the full-text search of the places and its parameters."""
+        place_facade = self.app.extensions['HBNB_FACADE'].place_facade
+        place_facade.search_places.return_value = [dict(self.mock_place, score=2.5)]
+
+        response = self.client.get('/places/search?q=cozy+loft&limit=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()[0]['score'], 2.5)
+        place_facade.search_places.assert_called_once_with("cozy loft", 5)
+
+        response = self.client.get('/places/search')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("q is required", response.get_json()['message'])
+
+        response = self.client.get('/places/search?q=loft&limit=500')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("limit must be between 1 and 100", response.get_json()['message'])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
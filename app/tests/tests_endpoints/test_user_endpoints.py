@@ -76,6 +76,18 @@ class TestUserEndpoints(BaseTestCase):
         data = response.get_json()
         self.assertIn("No user found", data['message'])
 
+    def test_stream_users(self):
+        """Test streaming users as NDJSON with masked passwords."""
+        self.app.extensions['HBNB_FACADE'].user_facade.iter_users.return_value = iter([self.mock_user, self.mock_user])
+
+        response = self.client.get('/users/', headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([user['id'] for user in lines], ['user-123', 'user-123'])
+        self.assertEqual(lines[0]['password'], '****')
+        self.app.extensions['HBNB_FACADE'].user_facade.get_all_users.assert_not_called()
+
     def test_get_user_by_id(self):
         """Test retrieving a user by ID."""
         # Mock the get_user method
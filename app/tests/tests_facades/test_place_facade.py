@@ -100,6 +100,17 @@ class TestPlaceFacade(unittest.TestCase):
         self.mock_place_repo.get_all.assert_called_once()
         self.assertEqual(result, [self.valid_place_data])
 
+    def test_rebuild_ratings(self):
+        """Test recomputing the rating aggregates of the places from their reviews."""
+        reviewed = Place(**self.valid_place_data)
+        self.mock_place_repo.iter_all.return_value = [self.existing_place, reviewed]
+        reviews = [MagicMock(place_id=reviewed.id, rating=rating) for rating in (5, 4, 5)]
+
+        self.assertEqual(self.place_facade.rebuild_ratings(reviews), 1)
+        self.mock_place_repo.update.assert_called_once_with(reviewed.id, {
+            "review_count": 3, "rating_sum": 14, "rating_histogram": [0, 0, 0, 1, 2], "average_rating": 14 / 3
+        })
+
     def test_update_place_success(self):
         """Test updating a place successfully."""
         updated_data = {
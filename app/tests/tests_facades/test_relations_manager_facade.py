@@ -234,8 +234,8 @@ class TestFacadeRelationManager(unittest.TestCase):
     def test_get_all_places_with_specifique_amenity_success(self):
         """Test getting all places with a specific amenity successfully."""
         amenity_name = "WiFi"
-        # Mock the place_facade.get_all_places to return a list of places
-        self.mock_place_facade.get_all_places.return_value = [
+        # Mock the indexed lookup of the places offering the amenity
+        self.mock_place_facade.get_places_with_amenity.return_value = [
             {"id": "place-456", "title": "Cozy Cottage", "amenities": ["WiFi", "Pool"]},
             {"id": "place-789", "title": "Modern Apartment", "amenities": ["Gym", "WiFi"]}
         ]
@@ -244,36 +244,22 @@ class TestFacadeRelationManager(unittest.TestCase):
         result = self.relation_manager.get_all_places_with_specifique_amenity(amenity_name)
 
         # Assertions
-        self.mock_place_facade.get_all_places.assert_called_once()
+        self.mock_place_facade.get_places_with_amenity.assert_called_once_with(amenity_name)
+        self.mock_place_facade.get_all_places.assert_not_called()
         self.assertEqual(len(result), 2)
         self.assertEqual(result[0]["id"], "place-456")
         self.assertEqual(result[1]["id"], "place-789")
 
-    def test_get_all_places_with_specifique_amenity_no_places_found(self):
-        """Test getting all places with a specific amenity when none are found."""
-        amenity_name = "WiFi"
-        # Mock the place_facade.get_all_places to return an empty list
-        self.mock_place_facade.get_all_places.return_value = []
-
-        with self.assertRaises(ValueError) as context:
-            self.relation_manager.get_all_places_with_specifique_amenity(amenity_name)
-
-        self.mock_place_facade.get_all_places.assert_called_once()
-        self.assertIn("No place found in place_repo", str(context.exception))
-
     def test_get_all_places_with_specifique_amenity_no_matching_amenity(self):
         """Test getting all places with a specific amenity when no matching amenity is found."""
         amenity_name = "Sauna"
-        # Mock the place_facade.get_all_places to return a list of places without the specified amenity
-        self.mock_place_facade.get_all_places.return_value = [
-            {"id": "place-456", "title": "Cozy Cottage", "amenities": ["WiFi", "Pool"]},
-            {"id": "place-789", "title": "Modern Apartment", "amenities": ["Gym"]}
-        ]
+        # Mock the indexed lookup to find no place
+        self.mock_place_facade.get_places_with_amenity.return_value = []
 
         with self.assertRaises(ValueError) as context:
             self.relation_manager.get_all_places_with_specifique_amenity(amenity_name)
 
-        self.mock_place_facade.get_all_places.assert_called_once()
+        self.mock_place_facade.get_places_with_amenity.assert_called_once_with(amenity_name)
         self.assertIn(f"No place found with the amenity: {amenity_name}", str(context.exception))
 
     def test_get_all_reviews_from_user_success(self):
@@ -332,5 +318,51 @@ class TestFacadeRelationManager(unittest.TestCase):
         self.mock_review_facade.review_repo.get_all.assert_called_once()
         self.assertIn(f"No review found for this user: {user_id}", str(context.exception))
 
+    def test_get_all_reviews_dict_from_place_reviews_id_list_success(self):
+        """Test that the reviews of a place are fetched by their place_id."""
+        self.mock_review_facade.review_repo.get_by_attribute.return_value = [self.sample_review]
+
+        result = self.relation_manager.get_all_reviews_dict_from_place_reviews_id_list("place-456")
+
+        self.mock_review_facade.review_repo.get_by_attribute.assert_called_once_with("place_id", "place-456")
+        self.mock_review_facade.review_repo.get.assert_not_called()
+        self.mock_place_facade.place_repo.get.assert_not_called()
+        self.assertEqual(result, [self.sample_review])
+
+    def test_get_all_reviews_dict_from_place_reviews_id_list_place_not_found(self):
+        """Test that a missing place is reported when it has no review."""
+        self.mock_review_facade.review_repo.get_by_attribute.return_value = []
+        self.mock_place_facade.place_repo.get.return_value = None
+
+        with self.assertRaises(ValueError) as context:
+            self.relation_manager.get_all_reviews_dict_from_place_reviews_id_list("place-456")
+
+        self.assertIn("Place with id: place-456 not found", str(context.exception))
+
+    def test_delete_place_and_associated_instances_deletes_reviews_at_once(self):
+        """Test that the reviews of a deleted place are removed in one call."""
+        self.sample_place.reviews = ["review-789", "review-790"]
+        self.sample_user.places = ["place-456"]
+        self.mock_place_facade.place_repo.get.return_value = self.sample_place
+        self.mock_user_facade.user_repo.get.return_value = self.sample_user
+
+        self.relation_manager.delete_place_and_associated_instances("place-456")
+
+        self.mock_review_facade.review_repo.delete_many.assert_called_once_with(["review-789", "review-790"])
+        self.mock_review_facade.review_repo.delete.assert_not_called()
+        self.mock_place_facade.place_repo.delete.assert_called_once_with("place-456")
+
+    def test_delete_user_and_associated_instances_is_batched(self):
+        """Test that a user's places and their reviews are deleted in batches."""
+        self.sample_user.places = ["place-456", "place-457"]
+        self.mock_user_facade.user_repo.get.return_value = self.sample_user
+
+        self.relation_manager.delete_user_and_associated_instances("user-123")
+
+        self.mock_review_facade.review_repo.delete_by_attribute.assert_called_once_with("place_id", ["place-456", "place-457"])
+        self.mock_place_facade.place_repo.delete_many.assert_called_once_with(["place-456", "place-457"])
+        self.mock_place_facade.place_repo.delete.assert_not_called()
+        self.mock_user_facade.user_repo.delete.assert_called_once_with("user-123")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -128,6 +128,20 @@ class TestReviewFacade(unittest.TestCase):
         self.assertEqual(result["text"], "Updated review text")
         self.assertEqual(result["rating"], 4)
 
+    def test_update_review_updates_place_ratings(self):
+        """Test that changing a rating moves it in the place aggregates."""
+        place_repo, place = MagicMock(), MagicMock()
+        self.review_facade = ReviewFacade(self.mock_review_repo, place_repo)
+        self.mock_review_repo.get.return_value = self.existing_review
+
+        self.review_facade.update_review("review-999", {"text": "Updated review text", "rating": 4})
+
+        # The aggregates are computed from the place read by the repository
+        (place_id, change), _ = place_repo.update_with.call_args
+        self.assertEqual(place_id, "place-456")
+        self.assertIs(change(place), place.rating_update.return_value)
+        place.rating_update.assert_called_once_with(4, 5)
+
     def test_update_review_not_found(self):
         """Test updating a review that does not exist."""
         updated_data = {
@@ -155,6 +169,20 @@ class TestReviewFacade(unittest.TestCase):
 
         self.mock_review_repo.delete.assert_called_once_with("review-999")
 
+    def test_delete_review_updates_place_ratings(self):
+        """Test that deleting a review takes its rating out of the place aggregates."""
+        place_repo = MagicMock()
+        self.review_facade = ReviewFacade(self.mock_review_repo, place_repo)
+        self.mock_review_repo.get.return_value = self.existing_review
+
+        self.review_facade.delete_review("review-999")
+
+        (place_id, change), _ = place_repo.update_with.call_args
+        place = MagicMock()
+        change(place)
+        self.assertEqual(place_id, "place-456")
+        place.rating_update.assert_called_once_with(None, 5)
+
     def test_delete_review_not_found(self):
         """Test deleting a review that does not exist."""
         # Mock get to return None (review not found)
@@ -0,0 +1,79 @@
+import unittest
+from app.models.place import Place
+from app.models.user import User
+from app.models.records import PlaceRecord, UserRecord, AmenityRecord, ReviewRecord
+from app.persistence.repository import InMemoryRepository
+
+
+class TestRecords(unittest.TestCase):
+
+    def make_place(self, cls=PlaceRecord):
+        """Build a valid place, as a record or a model."""
+        return cls(title='Cozy Cottage', description='A lovely place.', price=100.0,
+                   latitude=45.0, longitude=5.0, owner_id='user-123', owner_first_name='Alice')
+
+    def test_records_have_no_instance_dict(self):
+        """Test that records only store their slots."""
+        for record in (self.make_place(), AmenityRecord(name='Gym'),
+                       ReviewRecord('Great', 5, 'place-1', 'Cottage', 'user-1', 'Alice')):
+            self.assertFalse(hasattr(record, '__dict__'))
+            with self.assertRaises(AttributeError):
+                record.unknown = 1
+
+    def test_type_is_not_stored(self):
+        """Test that the type of a record comes from its class and cannot be changed."""
+        review = ReviewRecord('Great', 5, 'place-1', 'Cottage', 'user-1', 'Alice')
+
+        review.type = 'review'
+
+        self.assertNotIn('type', ReviewRecord.__slots__)
+        self.assertEqual(review.type, 'review')
+        with self.assertRaises(ValueError):
+            review.type = 'place'
+
+    def test_same_contract_as_model(self):
+        """Test that a record validates and serializes like its model."""
+        record = self.make_place()
+        model = self.make_place(Place)
+        model.id, model.created_at, model.updated_at = record.id, record.created_at, record.updated_at
+
+        self.assertTrue(record.is_valid())
+        self.assertEqual(record.to_dict(), model.to_dict())
+
+        record.price = -1.0
+        with self.assertRaises(ValueError):
+            record.is_valid()
+
+    def test_update_skips_protected_fields(self):
+        """Test that update changes fields but keeps the id."""
+        record = AmenityRecord(name='Gym')
+        record_id = record.id
+
+        record.update({'id': 'other', 'name': 'Pool', 'type': 'amenity'})
+
+        self.assertEqual(record.id, record_id)
+        self.assertEqual(record.name, 'Pool')
+
+    def test_from_dict_round_trip(self):
+        """Test rebuilding a record from its dictionary form."""
+        user = UserRecord('John', 'Doe', 'john@example.com', 'pwd', places=['place-1'])
+
+        copy = UserRecord.from_dict(user.to_dict())
+
+        self.assertEqual(copy.to_dict(), user.to_dict())
+        self.assertEqual(copy.created_at, user.created_at)
+
+    def test_repository_stores_records(self):
+        """Test that a repository with a record class converts added models."""
+        repo = InMemoryRepository({'email': True}, UserRecord)
+        user = User(first_name='John', last_name='Doe', email='john@example.com', password='pwd')
+
+        stored = repo.add(user)
+
+        self.assertIsInstance(stored, UserRecord)
+        self.assertIs(repo.get(user.id), stored)
+        self.assertEqual(repo.get_by_attribute('email', 'john@example.com'), [stored])
+
+
+if __name__ == '__main__':
+    unittest.main()
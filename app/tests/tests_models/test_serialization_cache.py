@@ -0,0 +1,133 @@
+import json
+import unittest
+from unittest.mock import PropertyMock, patch
+
+from app.extensions import db
+from app.models.base_model import BaseModel
+from app.models.place import Place
+from app.models.user import User
+from app.models.records import PlaceRecord, UserRecord
+from app.persistence.repository import SQLAlchemyRepository
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+class TestSerializationCache(unittest.TestCase):
+
+    def make_place(self, cls=PlaceRecord):
+        """Build a valid place, as a record or a model."""
+        return cls(title='Cozy Cottage', description='A lovely place.', price=100.0,
+                   latitude=45.0, longitude=5.0, owner_id='user-123', owner_first_name='Alice')
+
+    def test_dictionary_is_built_once(self):
+        """Test that unchanged instances reuse their dictionary form."""
+        for place in (self.make_place(), self.make_place(Place)):
+            with patch.object(type(place), '_serialize', wraps=place._serialize) as serialize:
+                first, second = place.to_dict(), place.to_dict()
+
+            serialize.assert_called_once_with()
+            self.assertEqual(first, second)
+            self.assertIsNot(first, second)
+
+    def test_models_must_define_serialize(self):
+        """Test that a model without a dictionary form is refused when declared."""
+        with self.assertRaises(TypeError):
+            class Unserializable(BaseModel):
+                __tablename__ = 'unserializable'
+
+        self.assertNotIn('unserializable', db.metadata.tables)
+
+    def test_returned_dictionary_is_a_copy(self):
+        """Test that callers editing the dictionary do not alter the cache."""
+        user = UserRecord('John', 'Doe', 'john@example.com', 'pwd')
+
+        user.to_dict()['password'] = '****'
+
+        self.assertEqual(user.to_dict()['password'], 'pwd')
+
+    def test_setting_a_field_invalidates(self):
+        """Test that attribute setters, update and save rebuild the dictionary."""
+        place = self.make_place()
+        place.to_dict()
+
+        place.price = 80.0
+        self.assertEqual(place.to_dict()['price'], 80.0)
+
+        place.update({'title': 'Big Cottage'})
+        self.assertEqual(place.to_dict()['title'], 'Big Cottage')
+        self.assertEqual(place.to_dict()['updated_at'], place.updated_at.isoformat())
+
+    def test_list_mutators_invalidate(self):
+        """Test that the list setters and mutators rebuild the dictionary, which holds copies of the lists."""
+        for place in (self.make_place(), self.make_place(Place)):
+            cached = place.to_dict()['amenities']
+
+            place.add_amenity('WiFi')
+            cached.append('Pool')
+            self.assertEqual(place.to_dict()['amenities'], ['WiFi'])
+
+            place.add_review('review-1')
+            self.assertEqual(place.to_dict()['reviews'], ['review-1'])
+
+            place.amenities = []
+            self.assertEqual(place.to_dict()['amenities'], [])
+
+    def test_list_fields_are_not_read_again(self):
+        """Test that an unchanged instance reuses its dictionary without reading its lists."""
+        place = self.make_place(Place)
+        place.to_dict()
+
+        with patch.object(Place, 'reviews', new_callable=PropertyMock) as reviews:
+            place.to_dict()
+
+        reviews.assert_not_called()
+
+    def test_json_is_encoded_once(self):
+        """Test that the JSON bytes follow the dictionary form."""
+        user = UserRecord('John', 'Doe', 'john@example.com', 'pwd', places=['place-1'])
+
+        encoded = user.to_json()
+
+        self.assertIs(user.to_json(), encoded)
+        self.assertEqual(json.loads(encoded), user.to_dict())
+
+        user.places = [*user.places, 'place-2']
+        self.assertEqual(json.loads(user.to_json())['places'], ['place-1', 'place-2'])
+
+
+class TestSQLAlchemySerializationCache(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.repo = SQLAlchemyRepository(User)
+
+    def test_reloaded_instances_are_serialized_again(self):
+        """Test that values written by the database drop the cached dictionary."""
+        user = User(first_name='John', last_name='Doe', email='john@example.com', password='secret')
+        self.repo.add(user)
+        user.to_dict()
+
+        db.session.execute(db.update(User).values(first_name='Johnny'))
+        db.session.commit()
+
+        self.assertEqual(user.to_dict()['first_name'], 'Johnny')
+
+        self.repo.update(user.id, {'last_name': 'Smith'})
+        self.assertEqual(user.to_dict()['updated_at'], user.updated_at.isoformat())
+        self.assertEqual(user.to_dict()['last_name'], 'Smith')
+
+    def test_association_lists_changed_in_place_invalidate(self):
+        """Test that changing the amenity links of a stored place rebuilds its dictionary."""
+        place = Place(title='Cozy Cottage', description='A lovely place.', price=100.0, latitude=45.0,
+                      longitude=5.0, owner_id='user-123', owner_first_name='Alice', amenities=['WiFi'])
+        SQLAlchemyRepository(Place).add(place)
+        place.to_dict()
+
+        place.amenities.append('Pool')
+        self.assertEqual(place.to_dict()['amenities'], ['WiFi', 'Pool'])
+
+        place.amenities.remove('WiFi')
+        self.assertEqual(place.to_dict()['amenities'], ['Pool'])
+
+
+if __name__ == '__main__':
+    unittest.main()
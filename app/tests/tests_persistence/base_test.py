@@ -0,0 +1,24 @@
+import unittest
+
+from flask import Flask
+
+from app.extensions import db
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """Test case running on a bare application with an in-memory SQLite database."""
+
+    def setUp(self):
+        """Create the application and the tables of every model."""
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Drop the tables and the application context."""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
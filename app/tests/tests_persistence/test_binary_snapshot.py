@@ -0,0 +1,120 @@
+# test_binary_snapshot.py
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from app.persistence.binary_snapshot import encode_snapshot, decode_snapshot, is_binary_snapshot
+from app.persistence.snapshot import write_atomic, read_checked, convert_snapshot
+from app.persistence.timestamps import to_datetime
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    def setUp(self):
+        # Two places sharing their owner and amenities, and a user
+        self.data = {
+            "place-1": {
+                "type": "place",
+                "id": "place-1",
+                "title": "Cozy Cottage",
+                "price": 150.0,
+                "latitude": None,
+                "owner_first_name": "Alice",
+                "amenities": ["WiFi", "Pool"],
+                "reviews": [],
+                "created_at": "2024-01-01T10:00:00.123456",
+                "updated_at": "2024-01-02T10:00:00",
+            },
+            "place-2": {
+                "type": "place",
+                "id": "place-2",
+                "title": "Seaside Villa",
+                "price": 250.5,
+                "latitude": 43.2,
+                "owner_first_name": "Alice",
+                "amenities": ["WiFi"],
+                "reviews": ["review-1"],
+                "rating_histogram": [0, 0, 1, 0, 2],
+                "created_at": "2024-01-03T10:00:00",
+                "updated_at": "2024-01-03T10:00:00",
+            },
+            "user-1": {
+                "type": "user",
+                "id": "user-1",
+                "is_admin": False,
+                "rating": 4,
+                "extra": {"nested": [1, 2]},
+                "created_at": datetime(2024, 1, 4, 8, 30),
+                "updated_at": datetime(2024, 1, 4, 8, 30),
+            },
+        }
+
+    def test_round_trip(self):
+        """Test that every value comes back, timestamps as epoch microseconds."""
+        decoded = decode_snapshot(encode_snapshot(self.data))
+
+        self.assertEqual(list(decoded), ["place-1", "place-2", "user-1"])
+        self.assertEqual(to_datetime(decoded["place-1"]["created_at"]), datetime(2024, 1, 1, 10, 0, 0, 123456))
+        self.assertEqual(to_datetime(decoded["user-1"]["updated_at"]), datetime(2024, 1, 4, 8, 30))
+        self.assertEqual(decoded["place-2"]["rating_histogram"], [0, 0, 1, 0, 2])
+        self.assertIsNone(decoded["place-1"]["latitude"])
+        self.assertEqual(decoded["place-2"]["latitude"], 43.2)
+        self.assertEqual(decoded["place-2"]["amenities"], ["WiFi"])
+        self.assertIs(decoded["user-1"]["is_admin"], False)
+        self.assertEqual(decoded["user-1"]["rating"], 4)
+        self.assertEqual(decoded["user-1"]["extra"], {"nested": [1, 2]})
+        self.assertEqual(list(decoded["place-2"]), list(self.data["place-2"]))
+
+    def test_repeated_strings_are_stored_once(self):
+        """Test that the string table deduplicates values."""
+        payload = encode_snapshot(self.data)
+
+        self.assertTrue(is_binary_snapshot(payload))
+        self.assertEqual(payload.count(b"Alice"), 1)
+        self.assertEqual(payload.count(b"WiFi"), 1)
+
+    def test_smaller_than_json(self):
+        """Test that the binary snapshot is smaller than the JSON one."""
+        data = {}
+        for i in range(100):
+            place = dict(self.data["place-1"], id=f"place-{i}", title=f"Place {i}")
+            data[place["id"]] = place
+
+        self.assertLess(len(encode_snapshot(data)), len(json.dumps(data, indent=4)) / 2)
+
+    def test_records_keep_their_order_across_schemas(self):
+        """Test that records of interleaved schemas come back in storage order."""
+        data = {}
+        for i in range(10):
+            place = dict(self.data["place-1"], id=f"place-{i}", latitude=None if i % 3 else 1.5)
+            data[place["id"]] = place
+
+        decoded = decode_snapshot(encode_snapshot(data))
+
+        self.assertEqual(list(decoded), list(data))
+        self.assertEqual([place["latitude"] for place in decoded.values()],
+                         [place["latitude"] for place in data.values()])
+
+    def test_converted_json_has_iso_timestamps(self):
+        """Test that converting a binary snapshot to JSON writes ISO timestamps."""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        binary_path, json_path = os.path.join(data_dir, "data.bin"), os.path.join(data_dir, "data.json")
+        write_atomic(binary_path, encode_snapshot(self.data))
+
+        convert_snapshot(binary_path, json_path, "json")
+
+        converted = json.loads(read_checked(json_path))
+        self.assertEqual(converted["place-1"]["created_at"], "2024-01-01T10:00:00.123456")
+
+    def test_not_a_binary_snapshot(self):
+        """Test that decoding JSON content is refused."""
+        with self.assertRaises(ValueError):
+            decode_snapshot(b"{}")
+
+
+if __name__ == '__main__':
+    unittest.main()
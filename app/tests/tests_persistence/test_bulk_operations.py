@@ -0,0 +1,186 @@
+# test_bulk_operations.py
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.repository import InMemoryRepository, InFileRepository, SQLAlchemyRepository
+from app.models.amenity import Amenity
+from app.models.user import User
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+class TestInMemoryBulkOperations(unittest.TestCase):
+    def setUp(self):
+        # Repository with a unique index on name
+        self.repo = InMemoryRepository({"name": True})
+
+    def test_add_many(self):
+        """Test adding several objects at once."""
+        amenities = [Amenity(name="WiFi"), Amenity(name="Sauna")]
+
+        self.assertEqual(self.repo.add_many(amenities), amenities)
+        self.assertEqual(self.repo.get_all(), amenities)
+
+    def test_add_many_is_all_or_nothing(self):
+        """Test that a duplicate in the batch leaves the repository unchanged."""
+        with self.assertRaises(ValueError):
+            self.repo.add_many([Amenity(name="WiFi"), Amenity(name="Sauna"), Amenity(name="WiFi")])
+
+        self.assertEqual(self.repo.get_all(), [])
+        self.assertEqual(self.repo.get_by_attribute("name", "WiFi"), [])
+
+    def test_update_many(self):
+        """Test applying the same data to several objects."""
+        repo = InMemoryRepository({"name": False})
+        amenities = repo.add_many([Amenity(name="WiFi"), Amenity(name="Sauna")])
+
+        repo.update_many([amenity.id for amenity in amenities] + ["missing"], {"name": "Comfort"})
+
+        self.assertEqual(repo.get_by_attribute("name", "Comfort"), amenities)
+        self.assertEqual(repo.get_by_attribute("name", "WiFi"), [])
+
+    def test_update_many_cannot_share_unique_value(self):
+        """Test that several objects cannot get the same unique value."""
+        amenities = self.repo.add_many([Amenity(name="WiFi"), Amenity(name="Sauna")])
+
+        with self.assertRaises(ValueError):
+            self.repo.update_many([amenity.id for amenity in amenities], {"name": "Pool"})
+
+        self.assertEqual([amenity.name for amenity in amenities], ["WiFi", "Sauna"])
+
+    def test_get_many(self):
+        """Test fetching several objects in the requested order."""
+        wifi, sauna = self.repo.add_many([Amenity(name="WiFi"), Amenity(name="Sauna")])
+
+        self.assertEqual(self.repo.get_many([sauna.id, "missing", wifi.id]), [sauna, wifi])
+        self.assertEqual(self.repo.get_many([]), [])
+
+    def test_delete_many(self):
+        """Test deleting several objects at once."""
+        wifi, sauna, pool = self.repo.add_many([Amenity(name="WiFi"), Amenity(name="Sauna"), Amenity(name="Pool")])
+
+        self.repo.delete_many([wifi.id, pool.id, "missing"])
+
+        self.assertEqual(self.repo.get_all(), [sauna])
+
+    def test_delete_by_attribute(self):
+        """Test deleting by attribute values, with and without an index."""
+        wifi, sauna, pool = self.repo.add_many([Amenity(name="WiFi"), Amenity(name="Sauna"), Amenity(name="Pool")])
+        unindexed = InMemoryRepository()
+        unindexed.add_many([wifi, sauna, pool])
+
+        for repo in (self.repo, unindexed):
+            repo.delete_by_attribute("name", ["WiFi", "Pool", "Spa"])
+
+            self.assertEqual(repo.get_all(), [sauna])
+
+
+class TestInFileBulkOperations(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_bulk_operations_write_once(self):
+        """Test that each bulk operation costs a single snapshot write."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+
+        with patch.object(repo, 'save_to_file', wraps=repo.save_to_file) as save_to_file:
+            amenities = repo.add_many([Amenity(name=f"Amenity {i}") for i in range(10)])
+            repo.update_many([amenity.id for amenity in amenities], {"name": "Renamed"})
+            repo.delete_many([amenity.id for amenity in amenities[:5]])
+            repo.delete_by_attribute("id", [amenity.id for amenity in amenities[5:7]])
+
+        self.assertEqual(save_to_file.call_count, 4)
+
+        reloaded = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+        self.assertEqual([amenity.name for amenity in reloaded.get_all()], ["Renamed"] * 3)
+
+    def test_failed_batch_is_persisted_consistently(self):
+        """Test that a rejected batch leaves nothing behind on disk."""
+        repo = InFileRepository("amenity_data.json", {"name": True}, data_dir=self.data_dir)
+
+        with self.assertRaises(ValueError):
+            repo.add_many([Amenity(name="WiFi"), Amenity(name="WiFi")])
+
+        reloaded = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+        self.assertEqual(reloaded.get_all(), [])
+
+
+class TestSQLAlchemyBulkOperations(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.repo = SQLAlchemyRepository(Amenity)
+
+    def test_add_many_commits_once(self):
+        """Test that a bulk insert is a single transaction."""
+        with patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+            self.repo.add_many([Amenity(name=f"Amenity {i}") for i in range(20)])
+
+        commit.assert_called_once()
+        self.assertEqual(len(self.repo.get_all()), 20)
+
+    def test_get_many_single_query_per_chunk(self):
+        """Test that a multi-get issues one SELECT per chunk of ids."""
+        amenities = self.repo.add_many([Amenity(name=f"Amenity {i}") for i in range(12)])
+        ids = [amenity.id for amenity in reversed(amenities)] + ["missing"]
+        statements = []
+        db.session.expire_all()
+
+        def count_selects(conn, cursor, statement, *args):
+            if statement.startswith("SELECT"):
+                statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", count_selects)
+        try:
+            with patch.object(SQLAlchemyRepository, 'BULK_CHUNK_SIZE', 5):
+                result = self.repo.get_many(ids)
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", count_selects)
+
+        self.assertEqual([amenity.name for amenity in result], [f"Amenity {i}" for i in reversed(range(12))])
+        self.assertEqual(len(statements), 3)
+
+    def test_update_and_delete_many(self):
+        """Test bulk updates and deletes, across several IN chunks."""
+        repo = SQLAlchemyRepository(User)
+        users = repo.add_many([User(first_name="John", last_name=f"Doe {i}", email=f"john{i}@example.com",
+                                    password="secret") for i in range(12)])
+        ids = [user.id for user in users]
+
+        with patch.object(SQLAlchemyRepository, 'BULK_CHUNK_SIZE', 5):
+            repo.update_many(ids[:8], {"id": "ignored", "last_name": "Renamed"})
+            repo.delete_many(ids[6:])
+
+        last_names = sorted(user.last_name for user in repo.get_all())
+        self.assertEqual(last_names, ["Renamed"] * 6)
+
+    def test_delete_by_attribute_single_statement(self):
+        """Test that deleting by attribute values is one DELETE ... IN statement."""
+        self.repo.add_many([Amenity(name=name) for name in ("WiFi", "Sauna", "Pool")])
+        statements = []
+
+        def count_deletes(conn, cursor, statement, *args):
+            if statement.startswith("DELETE"):
+                statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", count_deletes)
+        try:
+            self.repo.delete_by_attribute("name", ["WiFi", "Pool", "Spa"])
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", count_deletes)
+
+        self.assertEqual(len(statements), 1)
+        self.assertEqual([amenity.name for amenity in self.repo.get_all()], ["Sauna"])
+
+
+if __name__ == '__main__':
+    unittest.main()
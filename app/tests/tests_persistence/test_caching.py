@@ -0,0 +1,277 @@
+# test_caching.py
+
+import os
+import unittest
+from unittest.mock import patch
+
+import sqlalchemy as sa
+
+from config import repo_cache_from_env
+from app.extensions import db
+from app.persistence.caching import LRUCache, CachingRepository
+from app.persistence.repo_selector import RepoSelector
+from app.persistence.repository import InMemoryRepository, SQLAlchemyRepository
+from app.persistence.unit_of_work import unit_of_work
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.models.records import AmenityRecord
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        """Test that the entry unused for the longest time goes first."""
+        cache = LRUCache(max_size=2, ttl=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (3, 1, 1))
+
+    def test_entries_expire(self):
+        """Test that an entry is a miss once its TTL has passed."""
+        clock = FakeClock()
+        cache = LRUCache(max_size=10, ttl=30, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 29
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 30
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((len(cache), cache.evictions), (0, 1))
+
+    def test_options_from_environment(self):
+        """Test reading the cached entities and their TTL."""
+        env = {'REPO_CACHE': 'place:60, Amenity', 'REPO_CACHE_TTL': '120', 'REPO_CACHE_MAX_SIZE': '50'}
+        with patch.dict(os.environ, env, clear=True):
+            options = repo_cache_from_env()
+
+        self.assertEqual(options, {'place': {'max_size': 50, 'ttl': 60.0}, 'amenity': {'max_size': 50, 'ttl': 120.0}})
+
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(repo_cache_from_env(), {})
+
+
+class TestMemoryCachingRepository(unittest.TestCase):
+    def setUp(self):
+        # Cached amenity repository with a unique index on name
+        self.clock = FakeClock()
+        self.inner = InMemoryRepository({"name": True}, AmenityRecord)
+        self.repo = CachingRepository(self.inner, max_size=100, ttl=60, clock=self.clock)
+        self.wifi = self.repo.add(Amenity(name="WiFi"))
+
+    def test_reads_are_cached(self):
+        """Test that repeated lookups are answered by the cache."""
+        with patch.object(self.inner, 'get', wraps=self.inner.get) as get:
+            for _ in range(3):
+                self.assertIs(self.repo.get(self.wifi.id), self.wifi)
+
+        get.assert_called_once_with(self.wifi.id)
+        self.assertEqual(self.repo.stats()['hits'], 2)
+
+        with patch.object(self.inner, 'get_by_attribute', wraps=self.inner.get_by_attribute) as get_by_attribute:
+            for _ in range(3):
+                self.assertEqual(self.repo.get_by_attribute("name", "WiFi"), [self.wifi])
+
+        get_by_attribute.assert_called_once_with("name", "WiFi")
+
+    def test_empty_lookup_invalidated_by_add(self):
+        """Test that a cached empty result is dropped once a match is added."""
+        self.assertEqual(self.repo.get_by_attribute("name", "Pool"), [])
+
+        pool = self.repo.add(Amenity(name="Pool"))
+
+        self.assertEqual(self.repo.get_by_attribute("name", "Pool"), [pool])
+
+    def test_update_invalidates_former_and_new_values(self):
+        """Test that renaming an object moves it between cached lookups."""
+        self.assertEqual(self.repo.get_by_attribute("name", "WiFi"), [self.wifi])
+        self.assertEqual(self.repo.get_by_attribute("name", "Fast WiFi"), [])
+
+        self.repo.update(self.wifi.id, {"name": "Fast WiFi"})
+
+        self.assertEqual(self.repo.get_by_attribute("name", "WiFi"), [])
+        self.assertEqual(self.repo.get_by_attribute("name", "Fast WiFi"), [self.wifi])
+
+    def test_delete_invalidates(self):
+        """Test that deleted objects disappear from every cached lookup."""
+        self.repo.get(self.wifi.id)
+        self.repo.get_by_attribute("name", "WiFi")
+
+        self.repo.delete(self.wifi.id)
+
+        self.assertIsNone(self.repo.get(self.wifi.id))
+        self.assertEqual(self.repo.get_by_attribute("name", "WiFi"), [])
+
+    def test_bulk_writes_invalidate(self):
+        """Test the invalidation of the bulk operations."""
+        pool, sauna = self.repo.add_many([Amenity(name="Pool"), Amenity(name="Sauna")])
+        self.repo.get_by_attribute("name", "Pool")
+        self.repo.get(sauna.id)
+
+        self.repo.delete_many([pool.id])
+        self.repo.delete_by_attribute("name", ["Sauna"])
+
+        self.assertEqual(self.repo.get_by_attribute("name", "Pool"), [])
+        self.assertIsNone(self.repo.get(sauna.id))
+
+    def test_entries_expire(self):
+        """Test that a lookup goes to the repository again after the TTL."""
+        self.repo.get(self.wifi.id)
+        self.clock.now = 61
+
+        with patch.object(self.inner, 'get', wraps=self.inner.get) as get:
+            self.repo.get(self.wifi.id)
+
+        get.assert_called_once_with(self.wifi.id)
+        self.assertEqual(self.repo.stats()['evictions'], 1)
+
+    def test_selected_per_entity(self):
+        """Test that RepoSelector wraps the repository when caching is configured."""
+        cached = RepoSelector("in_memory", cache_options={"ttl": 10}).select_repo(Amenity)
+        plain = RepoSelector("in_memory").select_repo(Amenity)
+
+        self.assertIsInstance(cached, CachingRepository)
+        self.assertEqual(cached.stats()['ttl'], 10)
+        self.assertIs(cached.record_class, AmenityRecord)
+        self.assertIsInstance(plain, InMemoryRepository)
+
+
+class TestSQLAlchemyCachingRepository(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # Starting with one amenity
+        self.repo = self.cache(SQLAlchemyRepository(Amenity))
+        wifi = Amenity(name="WiFi")
+        self.repo.add(wifi)
+        self.wifi_id = wifi.id
+        self.statements = []
+
+    def cache(self, repository):
+        """Wrap a repository in a cache closed at the end of the test."""
+        cached = CachingRepository(repository)
+        self.addCleanup(cached.close)
+        return cached
+
+    def record(self, conn, cursor, statement, *args):
+        """Record the statements sent to the database."""
+        self.statements.append(statement)
+
+    def add_place(self, **kwargs):
+        """Add a place of a new owner, returning the place and the owner."""
+        owner = User(first_name="John", last_name="Doe", email="john@example.com", password="secret")
+        SQLAlchemyRepository(User).add(owner)
+        place = Place(title="Cottage", description="Nice", price=100.0, latitude=10.0, longitude=20.0,
+                      owner_id=owner.id, owner_first_name="John", **kwargs)
+        SQLAlchemyRepository(Place).add(place)
+        return place, owner
+
+    def test_hits_do_not_query(self):
+        """Test that cached objects are attached to a new session without a query."""
+        self.repo.get_by_attribute("name", "WiFi")
+        db.session.remove()
+
+        sa.event.listen(db.engine, "before_cursor_execute", self.record)
+        try:
+            wifi = self.repo.get(self.wifi_id)
+            by_name = self.repo.get_by_attribute("name", "WiFi")
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", self.record)
+
+        self.assertEqual(self.statements, [])
+        self.assertEqual(wifi.name, "WiFi")
+        self.assertEqual(by_name, [wifi])
+        self.assertIn(wifi, db.session)
+
+    def test_places_with_amenities(self):
+        """Test that places are cached with their review ids, and without their amenity list loaded again when accessed."""
+        places = self.cache(SQLAlchemyRepository(Place))
+        place, _ = self.add_place(amenities=["WiFi", "Pool"])
+        places.get(place.id)
+        db.session.remove()
+
+        sa.event.listen(db.engine, "before_cursor_execute", self.record)
+        try:
+            cached = places.get(place.id)
+            amenities = cached.to_dict()["amenities"]
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", self.record)
+
+        self.assertEqual(amenities, ["WiFi", "Pool"])
+        self.assertEqual([statement.split("FROM ")[1].split()[0] for statement in self.statements],
+                         ["place_amenities"])
+
+        cached.amenities.append("Gym")
+        db.session.commit()
+        db.session.remove()
+        self.assertEqual(places.get(place.id).amenities, ["WiFi", "Pool", "Gym"])
+
+    def test_places_are_cached_without_their_reviews(self):
+        """Test that a cached place does not bring back the reviews it had loaded."""
+        places, reviews = self.cache(SQLAlchemyRepository(Place)), SQLAlchemyRepository(Review)
+        place, owner = self.add_place()
+        review = Review(text="Nice stay", rating=5, place_id=place.id, place_name=place.title,
+                        user_id=owner.id, user_first_name=owner.first_name)
+        reviews.add(review)
+        place_id, review_id = place.id, review.id
+        db.session.remove()
+
+        # The place is cached with its reviews loaded
+        self.assertEqual([review.text for review in places.get(place_id).review_links], ["Nice stay"])
+        reviews.update(review_id, {"text": "Noisy street"})
+        db.session.remove()
+
+        cached = places.get(place_id)
+
+        self.assertEqual(places.stats()["hits"], 1)
+        self.assertEqual([review.text for review in cached.review_links], ["Noisy street"])
+        self.assertEqual(reviews.get(review_id).text, "Noisy street")
+
+    def test_close_stops_watching_the_session(self):
+        """Test that a closed cache no longer listens to the shared session."""
+        listeners = len(db.session().dispatch.after_flush)
+        self.repo.close()
+
+        self.assertEqual(len(db.session().dispatch.after_flush), listeners - 1)
+        self.assertEqual(self.repo.stats()["size"], 0)
+
+    def test_direct_changes_invalidate(self):
+        """Test that changes flushed outside the repository drop the cached lookups."""
+        self.assertEqual(self.repo.get_by_attribute("name", "WiFi")[0].id, self.wifi_id)
+
+        with unit_of_work():
+            self.repo.get(self.wifi_id).name = "Fast WiFi"
+
+        db.session.remove()
+        self.assertEqual(self.repo.get(self.wifi_id).name, "Fast WiFi")
+        self.assertEqual(self.repo.get_by_attribute("name", "WiFi"), [])
+
+    def test_rollback_clears(self):
+        """Test that states read inside a rolled back transaction are not kept."""
+        with self.assertRaises(ValueError):
+            with unit_of_work():
+                self.repo.update(self.wifi_id, {"name": "Fast WiFi"})
+                self.assertEqual(self.repo.get(self.wifi_id).name, "Fast WiFi")
+                raise ValueError("boom")
+
+        self.assertEqual(self.repo.get(self.wifi_id).name, "WiFi")
+
+
+if __name__ == '__main__':
+    unittest.main()
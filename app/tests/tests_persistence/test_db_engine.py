@@ -0,0 +1,90 @@
+# test_db_engine.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sqlalchemy as sa
+
+from config import engine_options_from_env
+from app.persistence.db_engine import MonitoredQueuePool, pool_status, set_statement_timeout
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_defaults(self):
+        """Test the production pool defaults."""
+        with patch.dict(os.environ, {}, clear=True):
+            options = engine_options_from_env()
+
+        self.assertEqual(options['pool_size'], 10)
+        self.assertEqual(options['max_overflow'], 20)
+        self.assertEqual(options['pool_recycle'], 1800)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertFalse(options['echo_pool'])
+        self.assertEqual(options['isolation_level'], 'READ COMMITTED')
+
+    def test_environment_overrides(self):
+        """Test that every option can be set from the environment."""
+        env = {
+            'DB_POOL_SIZE': '3', 'DB_MAX_OVERFLOW': '1', 'DB_POOL_TIMEOUT': '2.5',
+            'DB_POOL_RECYCLE': '60', 'DB_POOL_PRE_PING': 'false', 'DB_ECHO_POOL': 'debug',
+            'DB_ISOLATION_LEVEL': '',
+        }
+        with patch.dict(os.environ, env, clear=True):
+            options = engine_options_from_env()
+
+        self.assertEqual(options, {
+            'pool_size': 3, 'max_overflow': 1, 'pool_timeout': 2.5, 'pool_recycle': 60,
+            'pool_pre_ping': False, 'echo_pool': 'debug',
+        })
+
+
+class TestMonitoredQueuePool(unittest.TestCase):
+    def setUp(self):
+        # Pool of one connection plus one overflow, on a SQLite file
+        self.data_dir = tempfile.mkdtemp()
+        with patch.dict(os.environ, {'DB_POOL_SIZE': '1', 'DB_MAX_OVERFLOW': '1',
+                                     'DB_POOL_TIMEOUT': '0.1', 'DB_ISOLATION_LEVEL': 'SERIALIZABLE'}):
+            options = engine_options_from_env()
+
+        self.engine = sa.create_engine(f"sqlite:///{self.data_dir}/pool.db",
+                                       poolclass=MonitoredQueuePool, **options)
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.data_dir)
+
+    def test_checkouts_and_overflow_are_reported(self):
+        """Test the pool counters while connections are checked out."""
+        first = self.engine.connect()
+        second = self.engine.connect()
+        first.execute(sa.text("SELECT 1"))
+
+        status = pool_status(self.engine)
+        self.assertEqual(status['pool_class'], 'MonitoredQueuePool')
+        self.assertEqual(status['checked_out'], 2)
+        self.assertEqual(status['overflow'], 1)
+        self.assertEqual(status['peak_overflow'], 1)
+
+        with self.assertRaises(sa.exc.TimeoutError):
+            self.engine.connect()
+
+        first.close()
+        second.close()
+
+        status = pool_status(self.engine)
+        self.assertEqual(status['checked_out'], 0)
+        self.assertEqual(status['checkouts'], 2)
+        self.assertEqual(status['checkout_timeouts'], 1)
+        self.assertGreaterEqual(status['max_checkout_ms'], 100)
+
+    def test_statement_timeout_skipped_on_sqlite(self):
+        """Test that SQLite connections are left without a time limit."""
+        self.assertFalse(set_statement_timeout(self.engine, 1000))
+        self.assertEqual(self.engine.connect().execute(sa.text("SELECT 1")).scalar(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+# test_full_text.py
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.extensions import db
+from app.persistence.full_text import tokenize, match_expression
+from app.persistence.indexes import FullTextIndex
+from app.persistence.migrations import create_search_tables
+from app.persistence.repository import InMemoryRepository, InFileRepository, SQLAlchemyRepository, TEXT
+from app.models.place import Place
+from app.models.review import Review
+from app.models.records import PlaceRecord, ReviewRecord
+from app.services.facade_place import PlaceFacade
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+PLACE_TEXT = ("title", "description")
+REVIEW_TEXT = ("text",)
+
+# Titles and descriptions of the places of the tests
+TEXTS = {
+    "Cozy loft": "A cozy loft near the canal, quiet and bright.",
+    "Beach house": "Wide house on the beach, the sea at the door.",
+    "Café studio": "Small studio above a café in the old town.",
+    "Mountain chalet": "Wooden chalet with a view on the peaks.",
+}
+
+
+def add_places(repo):
+    """Add the places of TEXTS, by title."""
+    places = {}
+
+    for title, description in TEXTS.items():
+        place = Place(title=title, description=description, price=100.0, latitude=10.0, longitude=20.0,
+                      owner_id="user-123", owner_first_name="Alice")
+        places[title] = repo.add(place) or place
+
+    return places
+
+
+def add_review(repo, place, text):
+    """Add a review of a place."""
+    review = Review(text=text, rating=5, place_id=place.id, place_name=place.title,
+                    user_id="user-456", user_first_name="Bob")
+    return repo.add(review) or review
+
+
+def titles(results):
+    return [obj.title for obj, _ in results]
+
+
+class TestFullTextIndex(unittest.TestCase):
+    def test_tokenize(self):
+        """Test that words are split like the unicode61 tokenizer, without case and accents."""
+        self.assertEqual(tokenize("Café, CAFÉ-au-lait & naïve_words 42!"),
+                         ["cafe", "cafe", "au", "lait", "naive", "words", "42"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_match_expression(self):
+        """Test that query words are quoted, so FTS5 operators are searched as words."""
+        self.assertEqual(match_expression('loft OR "canal" NEAR'), '"loft" OR "or" OR "canal" OR "near"')
+        self.assertIsNone(match_expression("!?"))
+
+    def test_bm25_ranking(self):
+        """Test that rarer words and shorter texts rank higher."""
+        index = FullTextIndex(PLACE_TEXT)
+        index.add("a", ("Loft", "loft loft with a view"))
+        index.add("b", ("Studio", "studio with a view and a very long description of the loft"))
+        index.add("c", ("House", "house with a view"))
+
+        ranked = index.search("loft view")
+
+        self.assertEqual([obj_id for obj_id, _ in ranked], ["a", "b", "c"])
+        self.assertEqual(index.search("view", limit=1)[0][0], "c")
+        self.assertEqual(index.search("garden"), [])
+
+    def test_updates_and_removals(self):
+        """Test that replaced and removed texts leave the index and its lengths."""
+        index = FullTextIndex(REVIEW_TEXT)
+        index.add("a", ("great loft",))
+        index.add("b", ("great house",))
+
+        index.add("a", ("nice studio",))
+        index.remove("b")
+
+        self.assertEqual(index.search("great loft"), [])
+        self.assertEqual(index.lookup("studio"), ["a"])
+        self.assertEqual(index._total_length, 2)
+
+
+class TestMemoryFullText(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+        self.repo = InMemoryRepository({PLACE_TEXT: TEXT}, PlaceRecord)
+        self.places = add_places(self.repo)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_search(self):
+        """Test that the places matching the query come best first, accents ignored."""
+        self.assertEqual(titles(self.repo.search_text(PLACE_TEXT, "cozy canal")), ["Cozy loft"])
+        self.assertEqual(titles(self.repo.search_text(PLACE_TEXT, "CAFE")), ["Café studio"])
+        self.assertEqual(self.repo.search_text(PLACE_TEXT, "garden"), [])
+
+    def test_index_follows_writes(self):
+        """Test that updated and deleted places are searched by their new texts."""
+        loft, beach = self.places["Cozy loft"], self.places["Beach house"]
+
+        self.repo.update(loft.id, {"description": "Loft facing the sea."})
+        self.repo.delete(beach.id)
+
+        self.assertEqual(titles(self.repo.search_text(PLACE_TEXT, "sea")), ["Cozy loft"])
+        self.assertEqual(self.repo.search_text(PLACE_TEXT, "canal"), [])
+
+    def test_search_without_index(self):
+        """Test that a repository without a text index ranks the same way."""
+        repo = InMemoryRepository(record_class=PlaceRecord)
+        add_places(repo)
+
+        self.assertEqual(titles(repo.search_text(PLACE_TEXT, "studio town")),
+                         titles(self.repo.search_text(PLACE_TEXT, "studio town")))
+
+    def test_file_index_is_rebuilt_from_the_snapshot(self):
+        """Test that a reloaded in-file repository searches its records without hydrating them."""
+        repo = InFileRepository("place_data.json", {PLACE_TEXT: TEXT}, data_dir=self.data_dir)
+        add_places(repo)
+        repo.save_to_file()
+
+        reloaded = InFileRepository("place_data.json", {PLACE_TEXT: TEXT}, data_dir=self.data_dir)
+
+        with patch.object(reloaded, 'dict_to_obj', wraps=reloaded.dict_to_obj) as dict_to_obj:
+            results = reloaded.search_text(PLACE_TEXT, "chalet peaks")
+
+        self.assertEqual(titles(results), ["Mountain chalet"])
+        self.assertEqual(dict_to_obj.call_count, 1)
+
+    def test_facade_adds_the_reviews(self):
+        """Test that places are also found and boosted by the words of their reviews."""
+        review_repo = InMemoryRepository({REVIEW_TEXT: TEXT}, ReviewRecord)
+        add_review(review_repo, self.places["Mountain chalet"], "Perfect for skiing, cozy fireplace.")
+        facade = PlaceFacade(self.repo, review_repo)
+
+        self.assertEqual([place["title"] for place in facade.search_places("skiing")], ["Mountain chalet"])
+        self.assertEqual([place["title"] for place in facade.search_places("cozy")], ["Cozy loft", "Mountain chalet"])
+
+        with self.assertRaises(ValueError):
+            facade.search_places("?!")
+
+
+class TestSQLAlchemyFullText(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = SQLAlchemyRepository(Place)
+        self.review_repo = SQLAlchemyRepository(Review)
+        self.places = add_places(self.repo)
+
+    def test_search_uses_fts5(self):
+        """Test that the search queries the FTS5 table kept up to date by the triggers."""
+        loft = self.places["Cozy loft"]
+        self.repo.update(loft.id, {"description": "Loft facing the sea."})
+        self.repo.delete(self.places["Beach house"].id)
+
+        with patch.object(SQLAlchemyRepository, 'get_all') as get_all:
+            sea = self.repo.search_text(PLACE_TEXT, "sea")
+            canal = self.repo.search_text(PLACE_TEXT, "canal")
+            cafe = self.repo.search_text(PLACE_TEXT, "cafe")
+
+        get_all.assert_not_called()
+        self.assertEqual(titles(sea), ["Cozy loft"])
+        self.assertEqual(canal, [])
+        self.assertEqual(titles(cafe), ["Café studio"])
+        self.assertGreater(sea[0][1], 0)
+
+    def test_facade_searches_the_reviews(self):
+        """Test the place search with the reviews on the database backend."""
+        add_review(self.review_repo, self.places["Beach house"], "We went surfing every morning.")
+
+        places = PlaceFacade(self.repo, self.review_repo).search_places("surfing")
+
+        self.assertEqual([place["title"] for place in places], ["Beach house"])
+
+    def test_search_tables_are_created_and_rebuilt(self):
+        """Test that the migration indexes the rows of a database created without FTS5 tables."""
+        connection = db.session.connection()
+        connection.exec_driver_sql("DROP TABLE places_fts")
+        for suffix in ("insert", "update", "delete"):
+            connection.exec_driver_sql(f"DROP TRIGGER places_fts_{suffix}")
+        db.session.commit()
+
+        self.assertEqual(titles(self.repo.search_text(PLACE_TEXT, "chalet")), ["Mountain chalet"])
+        self.assertEqual(create_search_tables(), ["places_fts"])
+        self.assertEqual(create_search_tables(), [])
+        self.assertEqual(create_search_tables(rebuild=True), ["places_fts", "reviews_fts"])
+
+        with patch.object(SQLAlchemyRepository, 'get_all') as get_all:
+            self.assertEqual(titles(self.repo.search_text(PLACE_TEXT, "chalet")), ["Mountain chalet"])
+
+        get_all.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
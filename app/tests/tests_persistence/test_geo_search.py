@@ -0,0 +1,185 @@
+# test_geo_search.py
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.extensions import db
+from app.persistence.geo import haversine_km, radius_boxes
+from app.persistence.query_plans import capture_statements
+from app.persistence.indexes import GeoGridIndex
+from app.persistence.repository import InMemoryRepository, InFileRepository, SQLAlchemyRepository, GEO
+from app.models.place import Place
+from app.models.records import PlaceRecord
+from app.services.facade_place import PlaceFacade
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+COORDINATES = "latitude", "longitude"
+
+# Places of the tests, by title
+POINTS = {
+    "Louvre": (48.8606, 2.3376),
+    "Eiffel Tower": (48.8584, 2.2945),
+    "Versailles": (48.8049, 2.1204),
+    "London Eye": (51.5033, -0.1196),
+    "Fiji": (-17.7134, 178.0650),
+    "Samoa": (-13.7590, -172.1046),
+}
+
+
+def make_place(title):
+    """Build a valid place at the point of `title`."""
+    latitude, longitude = POINTS[title]
+    return Place(title=title, description="Nice", price=100.0, latitude=latitude, longitude=longitude,
+                 owner_id="user-123", owner_first_name="Alice")
+
+
+class TestGeoHelpers(unittest.TestCase):
+    def test_haversine(self):
+        """Test the great-circle distance between two known points."""
+        self.assertAlmostEqual(haversine_km(*POINTS["Louvre"], *POINTS["London Eye"]), 342.6, delta=1)
+        self.assertEqual(haversine_km(10.0, 20.0, 10.0, 20.0), 0)
+
+    def test_radius_boxes(self):
+        """Test that boxes split at the antimeridian and cover every longitude around a pole."""
+        self.assertEqual(len(radius_boxes(48.86, 2.34, 10)), 1)
+
+        west, east = radius_boxes(0.0, 179.9, 50)
+        self.assertEqual(west[3], 180.0)
+        self.assertEqual(east[1], -180.0)
+
+        (box,) = radius_boxes(89.9, 0.0, 50)
+        self.assertEqual((box[1], box[2], box[3]), (-180.0, 90.0, 180.0))
+
+
+class TestMemoryGeoSearch(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+        self.repo = InMemoryRepository({COORDINATES: GEO}, PlaceRecord)
+        self.places = {title: self.repo.add(make_place(title)) for title in POINTS}
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def titles(self, places):
+        return sorted(place.title for place in places)
+
+    def test_box_search(self):
+        """Test that a box search returns the places inside the box only."""
+        paris = self.repo.get_in_box(COORDINATES, (48.8, 2.2, 48.9, 2.5))
+
+        self.assertEqual(self.titles(paris), ["Eiffel Tower", "Louvre"])
+
+    def test_box_search_visits_the_overlapping_cells(self):
+        """Test that a box search only checks the points of the cells it overlaps."""
+        index = self.repo._indexes[COORDINATES]
+        checked = []
+
+        class CheckedPoints(dict):
+            def __getitem__(self, obj_id):
+                checked.append(obj_id)
+                return super().__getitem__(obj_id)
+
+        index._values = CheckedPoints(index._values)
+        self.repo.get_in_box(COORDINATES, (51.4, -0.2, 51.6, 0.0))
+
+        self.assertEqual(checked, [self.places["London Eye"].id])
+
+    def test_large_box_filters_the_occupied_cells(self):
+        """Test that a box over the whole world is answered from the occupied cells."""
+        self.assertEqual(len(self.repo.get_in_box(COORDINATES, (-90, -180, 90, 180))), len(POINTS))
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that moved and deleted places move in the index."""
+        louvre, eiffel = self.places["Louvre"], self.places["Eiffel Tower"]
+
+        self.repo.update(louvre.id, {"latitude": 51.5, "longitude": -0.12})
+        self.repo.delete(eiffel.id)
+
+        self.assertEqual(self.repo.get_in_box(COORDINATES, (48.8, 2.2, 48.9, 2.5)), [])
+        self.assertEqual(self.titles(self.repo.get_in_box(COORDINATES, (51.4, -0.2, 51.6, 0.0))),
+                         ["London Eye", "Louvre"])
+
+    def test_places_without_coordinates_are_not_indexed(self):
+        """Test that a place missing a coordinate is left out of the index."""
+        index = GeoGridIndex(COORDINATES)
+        index.add("place-1", (None, 2.0))
+
+        self.assertEqual(index.within(-90, -180, 90, 180), [])
+        self.assertEqual(index.lookup((None, 2.0)), [])
+
+    def test_nearby_search(self):
+        """Test that nearby places are refined by distance and sorted nearest first."""
+        facade = PlaceFacade(self.repo)
+
+        nearby = facade.get_places_nearby(48.8606, 2.3376, 5)
+
+        self.assertEqual([place["title"] for place in nearby], ["Louvre", "Eiffel Tower"])
+        self.assertEqual(nearby[0]["distance_km"], 0)
+        self.assertAlmostEqual(nearby[1]["distance_km"], 3.2, delta=0.1)
+
+    def test_search_across_the_antimeridian(self):
+        """Test that searches crossing the antimeridian find the places on both sides."""
+        facade = PlaceFacade(self.repo)
+
+        view = facade.get_places_in_box(-20, 175, -10, -170)
+        nearby = facade.get_places_nearby(-15.7, 179.9, 900)
+
+        self.assertEqual(sorted(place["title"] for place in view), ["Fiji", "Samoa"])
+        self.assertEqual(sorted(place["title"] for place in nearby), ["Fiji", "Samoa"])
+
+    def test_invalid_search(self):
+        """Test that out of range searches are refused."""
+        facade = PlaceFacade(self.repo)
+
+        with self.assertRaises(ValueError):
+            facade.get_places_nearby(91, 0, 5)
+        with self.assertRaises(ValueError):
+            facade.get_places_nearby(0, 0, 0)
+        with self.assertRaises(ValueError):
+            facade.get_places_in_box(50, 0, 40, 10)
+
+    def test_file_records_are_searched_without_hydration(self):
+        """Test that the in-file repository indexes the stored records as is."""
+        repo = InFileRepository("place_data.json", {COORDINATES: GEO}, data_dir=self.data_dir)
+        for title in POINTS:
+            repo.add(make_place(title))
+        repo.save_to_file()
+
+        reloaded = InFileRepository("place_data.json", {COORDINATES: GEO}, data_dir=self.data_dir)
+
+        with patch.object(reloaded, 'dict_to_obj', wraps=reloaded.dict_to_obj) as dict_to_obj:
+            paris = reloaded.get_in_box(COORDINATES, (48.8, 2.2, 48.9, 2.5))
+
+        self.assertEqual(self.titles(paris), ["Eiffel Tower", "Louvre"])
+        self.assertEqual(dict_to_obj.call_count, 2)
+
+
+class TestSQLAlchemyGeoSearch(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = SQLAlchemyRepository(Place)
+        for title in POINTS:
+            self.repo.add(make_place(title))
+
+    def test_box_search_uses_the_index(self):
+        """Test that a box search is a range search of the coordinates index."""
+        paris = self.repo.get_in_box(COORDINATES, (48.8, 2.2, 48.9, 2.5))
+        statement, parameters = capture_statements(
+            lambda: self.repo.get_in_box(COORDINATES, (48.8, 2.2, 48.9, 2.5)))[0]
+        plan = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+
+        self.assertEqual(sorted(place.title for place in paris), ["Eiffel Tower", "Louvre"])
+        self.assertIn("USING INDEX ix_places_latitude_longitude", plan[0][-1])
+
+    def test_nearby_search(self):
+        """Test the nearby search on the database backend."""
+        nearby = PlaceFacade(self.repo).get_places_nearby(51.5, -0.12, 10)
+
+        self.assertEqual([place["title"] for place in nearby], ["London Eye"])
+
+
+if __name__ == '__main__':
+    unittest.main()
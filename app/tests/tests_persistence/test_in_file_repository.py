@@ -0,0 +1,320 @@
+# test_in_file_repository.py
+
+import os
+import json
+import shutil
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.persistence.repository import InFileRepository
+from app.persistence.snapshot import read_checked
+from app.models.amenity import Amenity
+
+
+class TestInFileRepositoryLog(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def make_repo(self, **options):
+        """Open the amenity repository of the test data directory."""
+        return InFileRepository("amenity_data.json", {"name": True},
+                                storage_mode="log", data_dir=self.data_dir, **options)
+
+    def read_log(self):
+        """Return the records currently in the log."""
+        with open(os.path.join(self.data_dir, "amenity_data.json.log")) as log_file:
+            return [json.loads(line) for line in log_file]
+
+    def test_mutations_are_appended(self):
+        """Test that each mutation adds one record and leaves the snapshot alone."""
+        repo = self.make_repo()
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+        repo.update(wifi.id, {"name": "Fast WiFi"})
+        repo.delete(wifi.id)
+
+        records = self.read_log()
+        self.assertEqual([record["op"] for record in records], ["put", "put", "delete"])
+        self.assertEqual(records[1]["data"]["name"], "Fast WiFi")
+
+        self.assertEqual(json.loads(read_checked(os.path.join(self.data_dir, "amenity_data.json"))), {})
+
+    def test_replay_on_startup(self):
+        """Test that a new repository rebuilds its state from the log."""
+        repo = self.make_repo()
+        wifi = Amenity(name="WiFi")
+        sauna = Amenity(name="Sauna")
+        repo.add(wifi)
+        repo.add(sauna)
+        repo.update(wifi.id, {"name": "Fast WiFi"})
+        repo.delete(sauna.id)
+
+        reloaded = self.make_repo()
+
+        self.assertEqual([amenity.name for amenity in reloaded.get_all()], ["Fast WiFi"])
+        self.assertEqual(reloaded.get_by_attribute("name", "Fast WiFi")[0].id, wifi.id)
+        self.assertIsNone(reloaded.get(sauna.id))
+
+    def test_torn_last_record_is_ignored(self):
+        """Test that a partially written record does not prevent loading."""
+        repo = self.make_repo()
+        repo.add(Amenity(name="WiFi"))
+
+        with open(os.path.join(self.data_dir, "amenity_data.json.log"), "a") as log_file:
+            log_file.write('{"op": "put", "data": {"ty')
+
+        reloaded = self.make_repo()
+
+        self.assertEqual(len(reloaded.get_all()), 1)
+
+    def test_torn_last_record_is_cut_before_appending(self):
+        """Test that records appended after a torn one are replayed on the next start."""
+        repo = self.make_repo()
+        repo.add(Amenity(name="WiFi"))
+        repo.close()
+
+        with open(os.path.join(self.data_dir, "amenity_data.json.log"), "a") as log_file:
+            log_file.write('{"op": "put", "data": {"ty')
+
+        reloaded = self.make_repo()
+        reloaded.add(Amenity(name="Sauna"))
+        reloaded.close()
+
+        self.assertEqual([record["data"]["name"] for record in self.read_log()], ["WiFi", "Sauna"])
+        self.assertEqual(sorted(amenity.name for amenity in self.make_repo().get_all()), ["Sauna", "WiFi"])
+
+    def test_compaction_past_threshold(self):
+        """Test that the log is folded into the snapshot once too big."""
+        repo = self.make_repo(compact_threshold=1)
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+
+        self.assertEqual(self.read_log(), [])
+
+        self.assertIn(wifi.id, json.loads(read_checked(os.path.join(self.data_dir, "amenity_data.json"))))
+
+        reloaded = self.make_repo()
+        self.assertEqual(reloaded.get(wifi.id).name, "WiFi")
+
+    def test_corrupted_snapshot_is_set_aside(self):
+        """Test that a snapshot failing its checksum is kept for inspection."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+        repo.add(Amenity(name="WiFi"))
+        snapshot_path = os.path.join(self.data_dir, "amenity_data.json")
+
+        with open(snapshot_path, "rb") as data_file:
+            content = data_file.read()
+        with open(snapshot_path, "wb") as data_file:
+            data_file.write(content.replace(b"WiFi", b"WiFu"))
+
+        reloaded = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+
+        self.assertEqual(reloaded.get_all(), [])
+        corrupted = [name for name in os.listdir(self.data_dir) if ".corrupted-" in name]
+        self.assertEqual(len(corrupted), 1)
+
+    def test_binary_snapshot_format(self):
+        """Test that a binary repository writes and reloads a .bin snapshot."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir, snapshot_format="binary")
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "amenity_data.bin")))
+
+        reloaded = InFileRepository("amenity_data.json", data_dir=self.data_dir, snapshot_format="binary")
+
+        self.assertEqual(reloaded.get(wifi.id).name, "WiFi")
+        self.assertEqual(reloaded.get(wifi.id).created_at, wifi.created_at)
+
+    def test_binary_records_are_saved_again_unhydrated(self):
+        """Test that records loaded from a binary snapshot keep their timestamps when saved untouched."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir, snapshot_format="binary")
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+
+        reloaded = InFileRepository("amenity_data.json", data_dir=self.data_dir, snapshot_format="binary")
+        self.assertEqual(reloaded.get_version(wifi.id), wifi.updated_at.isoformat())
+        reloaded.save_to_file()
+
+        again = InFileRepository("amenity_data.json", data_dir=self.data_dir, snapshot_format="binary")
+        self.assertEqual(again.get(wifi.id).created_at, wifi.created_at)
+        self.assertEqual(again._page_index.key_of(wifi.id), (wifi.created_at, wifi.id))
+
+    def test_binary_repository_starts_from_json(self):
+        """Test switching an existing JSON repository to the binary format."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+
+        binary_repo = InFileRepository("amenity_data.json", data_dir=self.data_dir, snapshot_format="binary")
+
+        self.assertEqual(binary_repo.get(wifi.id).name, "WiFi")
+
+    def test_unknown_storage_mode(self):
+        """Test that an unknown storage mode is refused."""
+        with self.assertRaises(ValueError):
+            InFileRepository("amenity_data.json", storage_mode="zip", data_dir=self.data_dir)
+
+
+class TestInFileRepositoryWriteBehind(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.data_dir, "amenity_data.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def read_snapshot(self):
+        """Return the content of the snapshot file."""
+        return json.loads(read_checked(self.snapshot_path))
+
+    def test_writes_are_batched_by_count(self):
+        """Test that the snapshot is written once per full batch."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir, flush_max_changes=3)
+
+        with patch.object(repo, 'save_to_file', wraps=repo.save_to_file) as save_to_file:
+            repo.add(Amenity(name="WiFi"))
+            repo.add(Amenity(name="Sauna"))
+            self.assertEqual(self.read_snapshot(), {})
+
+            repo.add(Amenity(name="Pool"))
+
+        save_to_file.assert_called_once()
+        self.assertEqual(len(self.read_snapshot()), 3)
+        repo.close()
+
+    def test_flush_forces_pending_writes(self):
+        """Test the explicit flush API."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir, flush_max_changes=100)
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+        repo.update(wifi.id, {"name": "Fast WiFi"})
+
+        repo.flush()
+
+        self.assertEqual(self.read_snapshot()[wifi.id]["name"], "Fast WiFi")
+        repo.close()
+
+    def test_background_flusher_bounds_the_delay(self):
+        """Test that the flusher thread writes pending changes by itself."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir, flush_interval=0.05)
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+
+        deadline = time.time() + 2
+        while wifi.id not in self.read_snapshot() and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertIn(wifi.id, self.read_snapshot())
+        repo.close()
+
+    def test_close_flushes(self):
+        """Test that closing the repository writes pending changes."""
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir, flush_interval=60)
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+
+        repo.close()
+
+        self.assertIn(wifi.id, self.read_snapshot())
+
+    def test_log_mode_coalesces_changes(self):
+        """Test that several changes to one object give a single log record."""
+        repo = InFileRepository("amenity_data.json", storage_mode="log",
+                                data_dir=self.data_dir, flush_max_changes=100)
+        wifi = Amenity(name="WiFi")
+        sauna = Amenity(name="Sauna")
+        repo.add(wifi)
+        repo.update(wifi.id, {"name": "Fast WiFi"})
+        repo.add(sauna)
+        repo.delete(sauna.id)
+        repo.flush()
+
+        with open(self.snapshot_path + ".log") as log_file:
+            records = [json.loads(line) for line in log_file]
+
+        self.assertEqual(records, [
+            {"op": "put", "data": repo.get(wifi.id).to_dict()},
+            {"op": "delete", "id": sauna.id},
+        ])
+        repo.close()
+
+
+class TestInFileRepositoryLazyHydration(unittest.TestCase):
+    def setUp(self):
+        # Store three amenities, then reopen the repository
+        self.data_dir = tempfile.mkdtemp()
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+        self.amenities = [Amenity(name=name) for name in ("WiFi", "Sauna", "Pool")]
+        for amenity in self.amenities:
+            repo.add(amenity)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def make_repo(self, **options):
+        """Reopen the amenity repository of the test data directory."""
+        return InFileRepository("amenity_data.json", {"name": True}, data_dir=self.data_dir, **options)
+
+    def test_records_are_hydrated_on_first_get(self):
+        """Test that loading keeps raw records until they are requested."""
+        repo = self.make_repo()
+        wifi_id = self.amenities[0].id
+
+        self.assertTrue(all(isinstance(entry, dict) for entry in repo._storage.values()))
+
+        wifi = repo.get(wifi_id)
+
+        self.assertIsInstance(wifi, Amenity)
+        self.assertIs(repo.get(wifi_id), wifi)
+        self.assertIsInstance(repo._storage[self.amenities[1].id], dict)
+
+    def test_indexes_work_on_raw_records(self):
+        """Test indexed lookups and unique checks before hydration."""
+        repo = self.make_repo()
+
+        self.assertEqual(repo.get_by_attribute("name", "Sauna")[0].id, self.amenities[1].id)
+        with self.assertRaises(ValueError):
+            repo.add(Amenity(name="Pool"))
+
+    def test_least_recently_used_objects_are_dehydrated(self):
+        """Test that at most `max_resident` objects stay hydrated."""
+        repo = self.make_repo(max_resident=2)
+        wifi_id, sauna_id, pool_id = (amenity.id for amenity in self.amenities)
+
+        repo.get(wifi_id)
+        repo.get(sauna_id)
+        repo.get(wifi_id)
+        repo.get(pool_id)
+
+        self.assertIsInstance(repo._storage[sauna_id], dict)
+        self.assertIsInstance(repo._storage[wifi_id], Amenity)
+        self.assertEqual(repo.get(sauna_id).name, "Sauna")
+
+    def test_changes_survive_dehydration(self):
+        """Test that an evicted object keeps its changes on disk and in memory."""
+        repo = self.make_repo(max_resident=1)
+        wifi_id = self.amenities[0].id
+        repo.update(wifi_id, {"name": "Fast WiFi"})
+
+        self.assertEqual([amenity.name for amenity in repo.get_all()], ["Fast WiFi", "Sauna", "Pool"])
+        self.assertEqual(repo.get(wifi_id).name, "Fast WiFi")
+        self.assertEqual(self.make_repo().get(wifi_id).name, "Fast WiFi")
+
+    def test_iteration_does_not_hydrate_storage(self):
+        """Test that iterating over a repository leaves its records raw."""
+        repo = self.make_repo()
+
+        self.assertEqual([amenity.name for amenity in repo.iter_all()], ["WiFi", "Sauna", "Pool"])
+        self.assertTrue(all(isinstance(record, dict) for record in repo._storage.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+# test_in_memory_repository.py
+
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from app.persistence.repository import InMemoryRepository, InFileRepository
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.records import ReviewRecord
+
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+    def setUp(self):
+        # Repository with a unique index on title and a plain one on owner_id
+        self.repo = InMemoryRepository({"title": True, "owner_id": False})
+
+        self.place = self.make_place("Cozy Cottage", "user-123")
+        self.other_place = self.make_place("Seaside Villa", "user-123")
+        self.repo.add(self.place)
+        self.repo.add(self.other_place)
+
+    def make_place(self, title, owner_id):
+        """Build a valid place for the tests."""
+        return Place(
+            title=title,
+            description="A lovely place.",
+            price=100.0,
+            latitude=45.0,
+            longitude=5.0,
+            owner_id=owner_id,
+            owner_first_name="Alice"
+        )
+
+    def test_get_by_indexed_attribute(self):
+        """Test looking up objects through a non-unique index."""
+        result = self.repo.get_by_attribute("owner_id", "user-123")
+
+        self.assertEqual(result, [self.place, self.other_place])
+        self.assertEqual(self.repo.get_by_attribute("owner_id", "user-999"), [])
+
+    def test_unique_index_rejects_duplicate(self):
+        """Test that a unique index refuses a second object with the same value."""
+        duplicate = self.make_place("Cozy Cottage", "user-456")
+
+        with self.assertRaises(ValueError):
+            self.repo.add(duplicate)
+
+        self.assertIsNone(self.repo.get(duplicate.id))
+
+    def test_index_follows_update(self):
+        """Test that updating an indexed attribute moves the index entry."""
+        self.repo.update(self.place.id, {"title": "Mountain Lodge", "owner_id": "user-456"})
+
+        self.assertEqual(self.repo.get_by_attribute("title", "Cozy Cottage"), [])
+        self.assertEqual(self.repo.get_by_attribute("title", "Mountain Lodge"), [self.place])
+        self.assertEqual(self.repo.get_by_attribute("owner_id", "user-123"), [self.other_place])
+
+    def test_update_to_taken_unique_value(self):
+        """Test that an update cannot steal a unique value."""
+        with self.assertRaises(ValueError):
+            self.repo.update(self.place.id, {"title": "Seaside Villa"})
+
+        self.assertEqual(self.place.title, "Cozy Cottage")
+
+    def test_update_keeping_own_unique_value(self):
+        """Test that re-saving an object with its own unique value is allowed."""
+        self.repo.update(self.place.id, self.place.to_dict())
+
+        self.assertEqual(self.repo.get_by_attribute("title", "Cozy Cottage"), [self.place])
+
+    def test_index_follows_delete(self):
+        """Test that deleted objects disappear from the indexes."""
+        self.repo.delete(self.place.id)
+
+        self.assertEqual(self.repo.get_by_attribute("title", "Cozy Cottage"), [])
+        self.assertEqual(self.repo.get_by_attribute("owner_id", "user-123"), [self.other_place])
+
+        # The value is free again
+        self.repo.add(self.make_place("Cozy Cottage", "user-456"))
+
+    def test_create_index_on_existing_data(self):
+        """Test declaring an index after objects were stored."""
+        self.repo.create_index("price")
+
+        self.assertEqual(len(self.repo.get_by_attribute("price", 100.0)), 2)
+
+    def test_unindexed_attribute_falls_back_to_scan(self):
+        """Test lookups on attributes without index."""
+        repo = InMemoryRepository()
+        user = User(first_name="John", last_name="Doe", email="john@example.com", password="pwd")
+        repo.add(user)
+
+        self.assertEqual(repo.get_by_attribute("email", "john@example.com"), [user])
+        self.assertEqual(repo.get_by_attribute("id", user.id), [user])
+        self.assertEqual(repo.get_by_attribute("id", "missing"), [])
+
+
+class TestInMemoryRepositoryExists(unittest.TestCase):
+    def setUp(self):
+        # Review repository with a composite unique index on (user_id, place_id)
+        self.repo = InMemoryRepository({"place_id": False, ("user_id", "place_id"): True}, ReviewRecord)
+        self.review = self.repo.add(self.make_review("user-1", "place-1"))
+
+    def make_review(self, user_id, place_id):
+        """Build a valid review for the tests."""
+        return Review(text="Nice stay", rating=5, place_id=place_id, place_name="Cozy Cottage",
+                      user_id=user_id, user_first_name="Alice")
+
+    def test_composite_index_probe(self):
+        """Test that an existence check on the indexed pair reads no object."""
+        with patch.object(InMemoryRepository, '_value_of', side_effect=AssertionError("object read")):
+            self.assertTrue(self.repo.exists(place_id="place-1", user_id="user-1"))
+            self.assertFalse(self.repo.exists(user_id="user-1", place_id="place-2"))
+
+    def test_composite_unique_index(self):
+        """Test that a user can review a place once, and other places freely."""
+        with self.assertRaises(ValueError):
+            self.repo.add(self.make_review("user-1", "place-1"))
+
+        self.repo.add(self.make_review("user-1", "place-2"))
+        self.repo.add(self.make_review("user-2", "place-1"))
+
+        self.assertEqual(len(self.repo.get_all()), 3)
+
+    def test_composite_index_follows_update(self):
+        """Test that updating one attribute of the pair moves the index entry."""
+        self.repo.update(self.review.id, {"place_id": "place-2"})
+
+        self.assertFalse(self.repo.exists(user_id="user-1", place_id="place-1"))
+        self.assertTrue(self.repo.exists(user_id="user-1", place_id="place-2"))
+
+        other = self.repo.add(self.make_review("user-1", "place-1"))
+        with self.assertRaises(ValueError):
+            self.repo.update(other.id, {"place_id": "place-2"})
+
+    def test_exists_without_composite_index(self):
+        """Test the fallbacks on a single attribute index and on a scan."""
+        self.assertTrue(self.repo.exists(place_id="place-1", rating=5))
+        self.assertFalse(self.repo.exists(place_id="place-1", rating=4))
+        self.assertTrue(self.repo.exists(text="Nice stay"))
+        self.assertFalse(self.repo.exists(text="Awful"))
+
+    def test_exists_on_file_records(self):
+        """Test existence checks on file records that are not hydrated."""
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir)
+        InFileRepository("review_data.json", data_dir=data_dir, record_class=ReviewRecord).add(
+            self.make_review("user-1", "place-1"))
+
+        repo = InFileRepository("review_data.json", {("user_id", "place_id"): True},
+                                data_dir=data_dir, record_class=ReviewRecord)
+
+        self.assertTrue(repo.exists(user_id="user-1", place_id="place-1"))
+        self.assertFalse(repo.exists(user_id="user-2", place_id="place-1"))
+        self.assertTrue(repo.exists(text="Nice stay"))
+        self.assertTrue(all(isinstance(entry, dict) for entry in repo._storage.values()))
+
+
+class TestInMemoryRepositoryUpdateWith(unittest.TestCase):
+    def test_concurrent_read_modify_write(self):
+        """Test that concurrent changes computed from the stored object all apply."""
+        repo = InMemoryRepository()
+        review = repo.add(Review(text="Nice stay", rating=5, place_id="place-1", place_name="Cozy Cottage",
+                                 user_id="user-1", user_first_name="Alice"))
+
+        def lower_rating(current):
+            rating = current.rating
+            time.sleep(0.01)
+            return {"rating": rating - 1}
+
+        threads = [threading.Thread(target=repo.update_with, args=(review.id, lower_rating)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(repo.get(review.id).rating, 1)
+        self.assertIsNone(repo.update_with("missing", lower_rating))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# test_pagination.py
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from app.persistence.pagination import OrderedKeyIndex, encode_cursor, decode_cursor, page_key
+from app.persistence.repository import InMemoryRepository, InFileRepository, SQLAlchemyRepository
+from app.models.amenity import Amenity
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+def make_amenities(count):
+    """
+    Build amenities created one second apart, two of them at the same time,
+    in (created_at, id) order.
+    """
+    start = datetime(2024, 1, 1)
+    amenities = []
+
+    for i in range(count):
+        amenity = Amenity(name=f"Amenity {i}")
+        amenity.created_at = amenity.updated_at = start + timedelta(seconds=min(i, count - 2))
+        amenities.append(amenity)
+
+    return sorted(amenities, key=lambda amenity: page_key(amenity.created_at, amenity.id))
+
+
+def read_all_pages(repo, limit):
+    """Walk every page of a repository and return the names seen."""
+    names = []
+    objs, next_key = repo.get_page(None, limit)
+    names.extend(obj.name for obj in objs)
+
+    while next_key is not None:
+        objs, next_key = repo.get_page(decode_cursor(encode_cursor(next_key)), limit)
+        names.extend(obj.name for obj in objs)
+
+    return names
+
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        """Test that a cursor gives back its key."""
+        key = page_key("2024-01-01T10:00:00.123456", "amenity-1")
+
+        self.assertEqual(decode_cursor(encode_cursor(key)), key)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor raises ValueError."""
+        for cursor in ("garbage", "e30", encode_cursor(page_key(datetime.now(), "x"))[:-3]):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_ordered_key_index(self):
+        """Test out of order additions, replacements and removals."""
+        index = OrderedKeyIndex()
+        index.add("b", (2, "b"))
+        index.add("a", (1, "a"))
+        index.add("c", (3, "c"))
+        index.add("c", (3, "c"))
+        index.remove("b")
+
+        self.assertEqual(index.after(None, 10), [(1, "a"), (3, "c")])
+        self.assertEqual(index.after((1, "a"), 10), [(3, "c")])
+
+
+class TestMemoryPagination(unittest.TestCase):
+    def setUp(self):
+        # Amenities added in shuffled order
+        self.amenities = make_amenities(7)
+        self.expected = [amenity.name for amenity in self.amenities]
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_in_memory_pages(self):
+        """Test walking the pages of the in-memory repository."""
+        repo = InMemoryRepository()
+        repo.add_many(reversed(self.amenities))
+        repo.delete(self.amenities[3].id)
+        del self.expected[3]
+
+        self.assertEqual(read_all_pages(repo, 2), self.expected)
+        self.assertEqual(read_all_pages(repo, 100), self.expected)
+
+    def test_in_file_pages_from_raw_records(self):
+        """Test paging a reloaded file repository before hydration."""
+        InFileRepository("amenity_data.json", data_dir=self.data_dir).add_many(reversed(self.amenities))
+
+        repo = InFileRepository("amenity_data.json", data_dir=self.data_dir)
+
+        self.assertEqual(read_all_pages(repo, 3), self.expected)
+
+
+class TestSQLAlchemyPagination(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+    def test_sql_pages(self):
+        """Test walking the pages of the database repository."""
+        amenities = make_amenities(7)
+        repo = SQLAlchemyRepository(Amenity)
+        repo.add_many(reversed(amenities))
+
+        self.assertEqual(read_all_pages(repo, 2), [amenity.name for amenity in amenities])
+
+    def test_sql_iteration_in_batches(self):
+        """Test that iterating in batches yields every row in page order."""
+        amenities = make_amenities(7)
+        repo = SQLAlchemyRepository(Amenity)
+        repo.add_many(reversed(amenities))
+
+        self.assertEqual([amenity.name for amenity in repo.iter_all(batch_size=3)],
+                         [amenity.name for amenity in amenities])
+
+
+if __name__ == '__main__':
+    unittest.main()
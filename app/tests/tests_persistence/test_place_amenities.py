@@ -0,0 +1,139 @@
+# test_place_amenities.py
+
+import shutil
+import tempfile
+import unittest
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.indexes import MultiValueIndex
+from app.persistence.migrations import migrate_place_amenities
+from app.persistence.repository import InMemoryRepository, InFileRepository, SQLAlchemyRepository, MULTI_VALUED
+from app.models.user import User
+from app.models.place import Place, PlaceAmenity
+from app.models.records import PlaceRecord
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+def make_place(title, amenities, owner_id="user-1"):
+    """Build a place offering the given amenities."""
+    return Place(title=title, description="Nice", price=100.0, latitude=10.0, longitude=20.0,
+                 owner_id=owner_id, owner_first_name="John", amenities=amenities)
+
+
+class TestMemoryPlaceAmenities(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_multi_value_index(self):
+        """Test indexing each element of a list attribute."""
+        index = MultiValueIndex("amenities")
+        index.add("a", ["WiFi", "Pool"])
+        index.add("b", ["Pool", "Pool"])
+        index.add("a", ["WiFi"])
+
+        self.assertEqual(index.lookup("Pool"), ["b"])
+        self.assertEqual(index.lookup("WiFi"), ["a"])
+
+        index.remove("a")
+        self.assertEqual(index.lookup("WiFi"), [])
+
+    def test_indexed_lookup_follows_updates(self):
+        """Test finding places by amenity as their lists change."""
+        repo = InMemoryRepository({"amenities": MULTI_VALUED}, PlaceRecord)
+        cottage = repo.add(make_place("Cottage", ["WiFi", "Pool"]))
+        flat = repo.add(make_place("Flat", ["Gym"]))
+
+        flat.amenities.append("WiFi")
+        repo.update(flat.id, flat.to_dict())
+        repo.update(cottage.id, {"amenities": ["Pool"]})
+
+        self.assertEqual(repo.get_containing("amenities", "WiFi"), [flat])
+        self.assertEqual(repo.get_containing("amenities", "Pool"), [cottage])
+
+        repo.delete(cottage.id)
+        self.assertEqual(repo.get_containing("amenities", "Pool"), [])
+
+    def test_unindexed_lookup_on_raw_records(self):
+        """Test the scan fallback on file records that are not hydrated."""
+        InFileRepository("place_data.json", data_dir=self.data_dir, record_class=PlaceRecord).add_many(
+            [make_place("Cottage", ["WiFi"]), make_place("Flat", ["Gym"])])
+
+        repo = InFileRepository("place_data.json", data_dir=self.data_dir, record_class=PlaceRecord)
+
+        self.assertEqual([place.title for place in repo.get_containing("amenities", "Gym")], ["Flat"])
+
+
+class TestSQLAlchemyPlaceAmenities(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # Starting with one owner
+        self.owner = User(first_name="John", last_name="Doe", email="john@example.com", password="secret")
+        SQLAlchemyRepository(User).add(self.owner)
+        self.repo = SQLAlchemyRepository(Place)
+
+    def test_amenities_are_stored_in_order(self):
+        """Test that the amenity names survive a round trip in order."""
+        place = make_place("Cottage", ["WiFi", "Pool"], self.owner.id)
+        self.repo.add(place)
+
+        place.amenities = place.amenities + ["Sauna"]
+        place.amenities.remove("WiFi")
+        db.session.commit()
+        db.session.expire_all()
+
+        self.assertEqual(self.repo.get(place.id).to_dict()["amenities"], ["Pool", "Sauna"])
+
+    def test_lookup_is_a_single_join(self):
+        """Test that finding places by amenity is one joined SELECT."""
+        self.repo.add_many([make_place("Cottage", ["WiFi", "Pool"], self.owner.id),
+                            make_place("Flat", ["Gym", "WiFi"], self.owner.id),
+                            make_place("Loft", ["Gym"], self.owner.id)])
+        db.session.expire_all()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            places = self.repo.get_containing("amenities", "WiFi")
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", record)
+
+        self.assertEqual(sorted(place.title for place in places), ["Cottage", "Flat"])
+        self.assertIn("JOIN place_amenities", statements[0])
+
+    def test_deleting_places_removes_their_amenities(self):
+        """Test that single and bulk deletes leave no association behind."""
+        cottage, flat = self.repo.add_many([make_place("Cottage", ["WiFi"], self.owner.id),
+                                            make_place("Flat", ["Gym"], self.owner.id)])
+
+        self.repo.delete(cottage.id)
+        self.repo.delete_many([flat.id])
+
+        self.assertEqual(PlaceAmenity.query.count(), 0)
+
+    def test_migration_from_json_column(self):
+        """Test copying the former JSON column into the association table."""
+        db.session.execute(sa.text("ALTER TABLE places ADD COLUMN amenities JSON"))
+        place = make_place("Cottage", [], self.owner.id)
+        self.repo.add(place)
+        db.session.execute(sa.text("UPDATE places SET amenities = :amenities"), {"amenities": '["WiFi", "Pool"]'})
+
+        self.assertEqual(migrate_place_amenities(), 2)
+        self.assertEqual(migrate_place_amenities(drop_json_column=True), 0)
+        db.session.expire_all()
+
+        self.assertEqual(self.repo.get(place.id).amenities, ["WiFi", "Pool"])
+        self.assertEqual(migrate_place_amenities(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+# test_place_reviews.py
+
+import unittest
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.migrations import migrate_place_reviews, rebuild_place_ratings
+from app.persistence.repository import SQLAlchemyRepository
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.services.facade_user import UserFacade
+from app.services.facade_place import PlaceFacade
+from app.services.facade_review import ReviewFacade
+from app.services.facade_amenity import AmenityFacade
+from app.services.facade_relations_manager import FacadeRelationManager
+from app.services.sqlalchemy_facade_relation_manager import SQLAlchemyFacadeRelationManager
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+class TestSQLAlchemyPlaceReviews(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # Starting with one place
+        self.user_repo, self.place_repo = SQLAlchemyRepository(User), SQLAlchemyRepository(Place)
+        self.review_repo = SQLAlchemyRepository(Review)
+        facades = (UserFacade(self.user_repo), PlaceFacade(self.place_repo),
+                   AmenityFacade(SQLAlchemyRepository(Amenity)), ReviewFacade(self.review_repo, self.place_repo))
+        self.manager = SQLAlchemyFacadeRelationManager(*facades)
+        # The reviews of a place are read through the generic manager
+        self.reader = FacadeRelationManager(*facades)
+        self.user = User(first_name="John", last_name="Doe", email="john@example.com", password="secret")
+        self.user_repo.add(self.user)
+        self.place = self.manager.create_place_for_user(self.user.id, {
+            "title": "Chez John", "description": "Nice", "price": 100.0, "latitude": 10.0, "longitude": 20.0
+        })
+
+    def add_reviews(self, *ratings):
+        """Review the place once per rating, each time by a new user."""
+        reviews = []
+
+        for rating in ratings:
+            reviewer = User(first_name="Jane", last_name="Doe", email=f"jane{rating}@example.com", password="secret")
+            self.user_repo.add(reviewer)
+            reviews.append(self.manager.create_review_for_place(self.place["id"], reviewer.id,
+                                                                {"text": "Nice stay", "rating": rating}))
+
+        return reviews
+
+    def test_reviews_follow_place_id(self):
+        """Test that the place lists its reviews without storing their ids."""
+        first, second = self.add_reviews(5, 4)
+        place = self.place_repo.get(self.place["id"])
+
+        self.assertEqual(place.reviews, [first["id"], second["id"]])
+        self.assertEqual(place.to_dict()["reviews"], [first["id"], second["id"]])
+
+        self.manager.delete_review_from_place_list(first["id"], self.place["id"])
+        self.assertEqual(self.place_repo.get(self.place["id"]).reviews, [second["id"]])
+
+    def test_loading_a_place_does_not_load_its_reviews(self):
+        """Test that a place is one SELECT, and its review ids one id-only SELECT."""
+        self.add_reviews(5, 4)
+        db.session.expire_all()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            place = self.place_repo.get(self.place["id"])
+            loaded = len(statements)
+            reviews = place.reviews
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", record)
+
+        self.assertEqual(len(reviews), 2)
+        self.assertNotIn("FROM reviews", " ".join(statements[:loaded]))
+        self.assertEqual(len(statements) - loaded, 1)
+        self.assertTrue(statements[-1].startswith("SELECT reviews.place_id, reviews.id \nFROM reviews"))
+        self.assertNotIn(Review, {type(obj) for obj in db.session.identity_map.values()})
+
+    def test_listing_loads_the_review_ids_at_once(self):
+        """Test that serializing a listing selects the review ids of all its places with one query."""
+        self.add_reviews(5)
+        for number in range(20):
+            self.manager.create_place_for_user(self.user.id, {
+                "title": f"Place {number}", "description": "Nice", "price": 100.0, "latitude": 10.0, "longitude": 20.0
+            })
+        db.session.commit()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            places = [place.to_dict() for place in self.place_repo.get_all()]
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", record)
+
+        self.assertEqual(len(places), 21)
+        self.assertEqual(sum(len(place["reviews"]) for place in places), 1)
+        # The places, their amenities and their review ids
+        self.assertEqual(len(statements), 3)
+
+    def test_review_ids_follow_new_reviews(self):
+        """Test that the review ids loaded for a place are selected again once it is reviewed."""
+        self.assertEqual(self.place_repo.get(self.place["id"]).reviews, [])
+
+        review, = self.add_reviews(5)
+
+        self.assertEqual(self.place_repo.get(self.place["id"]).reviews, [review["id"]])
+
+    def test_stored_place_reviews_are_read_only(self):
+        """Test that the review ids of a stored place cannot be set through it."""
+        review, = self.add_reviews(5)
+        place = self.place_repo.get(self.place["id"])
+
+        with self.assertRaises(ValueError):
+            place.add_review("review-1")
+        with self.assertRaises(ValueError):
+            place.reviews = []
+
+        # Setting the ids the place already has changes nothing
+        place.reviews = [review["id"]]
+        self.assertEqual(place.reviews, [review["id"]])
+
+    def test_creating_a_review_only_updates_the_aggregates(self):
+        """Test that adding a review inserts the review row and updates the place ratings."""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            self.add_reviews(5)
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", record)
+
+        # The place row is locked, with a write changing nothing on SQLite, then updated
+        updates = [statement.split(" WHERE ")[0] for statement in statements if statement.startswith("UPDATE places")]
+        self.assertEqual(updates, [
+            "UPDATE places SET updated_at=places.updated_at",
+            "UPDATE places SET review_count=?, rating_sum=?, rating_histogram=?, average_rating=?, updated_at=?",
+        ])
+
+    def test_rating_aggregates_follow_the_reviews(self):
+        """Test the review count, rating sum and histogram through creation, update and deletion."""
+        first, second = self.add_reviews(5, 3)
+        self.manager.review_facade.update_review(second["id"], {"text": "Noisy", "rating": 2})
+        self.manager.delete_review_from_place_list(first["id"], self.place["id"])
+        self.add_reviews(4)
+
+        place = self.place_repo.get(self.place["id"]).to_dict()
+
+        self.assertEqual((place["review_count"], place["rating_sum"]), (2, 6))
+        self.assertEqual(place["rating_histogram"], [0, 1, 0, 1, 0])
+        self.assertEqual(place["average_rating"], 3.0)
+
+    def test_reviews_of_a_place_use_the_index(self):
+        """Test that the reviews of a place are one indexed SELECT."""
+        self.add_reviews(5, 4, 3)
+        db.session.expire_all()
+        plans = []
+
+        def explain(conn, cursor, statement, parameters, *args):
+            if statement.startswith("SELECT"):
+                plans.append(conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all())
+
+        sa.event.listen(db.engine, "before_cursor_execute", explain)
+        try:
+            reviews = self.reader.get_all_reviews_dict_from_place_reviews_id_list(self.place["id"])
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", explain)
+
+        self.assertEqual(len(reviews), 3)
+        self.assertEqual(len(plans), 1)
+        self.assertIn("ix_reviews_place_id", str(plans[0]))
+
+    def test_one_review_per_user_and_place(self):
+        """Test the indexed existence check and the unique (user_id, place_id) pair."""
+        review, = self.add_reviews(5)
+        reviewer_id, owner_id = review["user_id"], self.user.id
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa.event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            self.assertTrue(self.review_repo.exists(user_id=reviewer_id, place_id=self.place["id"]))
+            self.assertFalse(self.review_repo.exists(user_id=owner_id, place_id=self.place["id"]))
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", record)
+
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].startswith("SELECT EXISTS"))
+
+        with self.assertRaises(sa.exc.IntegrityError):
+            self.manager.create_review_for_place(self.place["id"], reviewer_id, {"text": "Again", "rating": 1})
+
+    def test_deleting_a_place_deletes_its_reviews(self):
+        """Test that the reviews of a deleted place are removed by place_id."""
+        self.add_reviews(5, 4)
+
+        self.manager.delete_place_and_associated_instances(self.place["id"])
+
+        self.assertEqual(self.review_repo.get_all(), [])
+
+    def test_migration_from_json_column(self):
+        """Test indexing the reviews and dropping the former JSON column."""
+        db.session.execute(sa.text("DROP INDEX ix_reviews_place_id"))
+        db.session.execute(sa.text("ALTER TABLE places ADD COLUMN reviews JSON"))
+
+        self.assertTrue(migrate_place_reviews(drop_json_column=True))
+        self.assertFalse(migrate_place_reviews(drop_json_column=True))
+
+        inspector = sa.inspect(db.engine)
+        self.assertIn("ix_reviews_place_id", [index["name"] for index in inspector.get_indexes("reviews")])
+        self.assertNotIn("reviews", [column["name"] for column in inspector.get_columns("places")])
+
+    def test_rebuild_ratings(self):
+        """Test recomputing the rating aggregates, adding their columns to a former places table."""
+        self.add_reviews(5, 4, 1)
+        db.session.commit()
+
+        for name in ("review_count", "rating_sum", "rating_histogram"):
+            db.session.execute(sa.text(f"ALTER TABLE places DROP COLUMN {name}"))
+
+        self.assertEqual(rebuild_place_ratings(), 1)
+        self.assertEqual(rebuild_place_ratings(), 0)
+
+        db.session.expire_all()
+        place = self.place_repo.get(self.place["id"])
+        self.assertEqual((place.review_count, place.rating_sum, place.rating_histogram), (3, 10, [1, 0, 0, 1, 1]))
+        self.assertAlmostEqual(place.average_rating, 10 / 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# test_query_plans.py
+
+import unittest
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.migrations import create_missing_indexes
+from app.persistence.query_plans import full_scans, is_full_scan
+from app.persistence.repository import SQLAlchemyRepository
+from app.models.amenity import Amenity
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+class TestQueryPlans(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+    def test_is_full_scan(self):
+        """Test telling table scans from index searches."""
+        self.assertTrue(is_full_scan("SCAN places"))
+        self.assertFalse(is_full_scan("SCAN places USING INDEX ix_places_created_at_id"))
+        self.assertFalse(is_full_scan("SEARCH places USING INDEX ix_places_title (title=?)"))
+        self.assertFalse(is_full_scan("SCAN CONSTANT ROW"))
+
+    def test_every_lookup_uses_an_index(self):
+        """Test that no repository lookup scans a whole table."""
+        self.assertEqual(full_scans(), [])
+
+    def test_missing_index_is_reported_and_created(self):
+        """Test that a dropped index shows up as a full scan until recreated."""
+        db.session.execute(sa.text("DROP INDEX ix_places_owner_id"))
+
+        scans = full_scans()
+        self.assertEqual([description for description, _, _ in scans], ["Place.get_by_attribute(owner_id)"])
+        self.assertEqual(scans[0][2], "SCAN places")
+
+        self.assertEqual(create_missing_indexes(), ["ix_places_owner_id"])
+        self.assertEqual(create_missing_indexes(), [])
+        self.assertEqual(full_scans(), [])
+
+    def test_amenity_names_are_unique(self):
+        """Test that the database rejects a second amenity with the same name."""
+        repo = SQLAlchemyRepository(Amenity)
+        repo.add(Amenity(name="WiFi"))
+
+        with self.assertRaises(sa.exc.IntegrityError):
+            repo.add(Amenity(name="WiFi"))
+
+        self.assertEqual([amenity.name for amenity in repo.get_all()], ["WiFi"])
+
+
+if __name__ == '__main__':
+    unittest.main()
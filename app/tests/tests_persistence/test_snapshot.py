@@ -0,0 +1,55 @@
+# test_snapshot.py
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.persistence.snapshot import write_atomic, read_checked, SnapshotChecksumError
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own directory
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """Test that a written payload is read back without its trailer."""
+        write_atomic(self.path, b'{"a": 1}')
+
+        self.assertEqual(read_checked(self.path), b'{"a": 1}')
+
+    def test_replace_leaves_no_temporary_file(self):
+        """Test that rewriting a snapshot only leaves the snapshot behind."""
+        write_atomic(self.path, b'{"a": 1}')
+        write_atomic(self.path, b'{"a": 2}')
+
+        self.assertEqual(os.listdir(self.directory), ["data.json"])
+        self.assertEqual(read_checked(self.path), b'{"a": 2}')
+
+    def test_checksum_mismatch(self):
+        """Test that a modified payload is detected."""
+        write_atomic(self.path, b'{"a": 1}')
+
+        with open(self.path, "rb") as snapshot_file:
+            content = snapshot_file.read()
+        with open(self.path, "wb") as snapshot_file:
+            snapshot_file.write(content.replace(b"1", b"2", 1))
+
+        with self.assertRaises(SnapshotChecksumError):
+            read_checked(self.path)
+
+    def test_file_without_trailer(self):
+        """Test that files written before trailers existed are still readable."""
+        with open(self.path, "wb") as snapshot_file:
+            snapshot_file.write(b'{\n    "a": 1\n}')
+
+        self.assertEqual(read_checked(self.path), b'{\n    "a": 1\n}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+# test_sorted_listing.py
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.persistence.indexes import SortedIndex
+from app.persistence.repository import Repository, InMemoryRepository, InFileRepository, SQLAlchemyRepository, SORTED
+from app.models.place import Place
+from app.models.records import PlaceRecord
+from app.services.facade_place import PlaceFacade
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+PLACE_INDEXES = {"price": SORTED, "average_rating": SORTED}
+
+
+def add_places(repo, count=30):
+    """
+    Add places whose prices and ratings repeat, every third place without
+    reviews.
+    """
+    places = []
+
+    for i in range(count):
+        place = Place(title=f"Place {i}", description="Nice", price=float((i * 7) % 10 * 10),
+                      latitude=10.0, longitude=20.0, owner_id="user-123", owner_first_name="Alice")
+        place = repo.add(place) or place
+
+        if i % 3:
+            histogram = [0] * 5
+            histogram[i % 5] = 1
+            histogram[(i * 3) % 5] += 1
+            repo.update(place.id, Place.rating_aggregates(histogram))
+
+        places.append(place)
+
+    return places
+
+
+def read_sorted_pages(repo, attr_name, limit, descending=False, bounds=None):
+    """Walk every sorted page of a repository and return the titles seen."""
+    titles = []
+    after_key = None
+
+    while True:
+        objs, next_key = repo.get_sorted_page(attr_name, after_key, limit, descending, bounds)
+        titles.extend(obj.title for obj in objs)
+
+        if next_key is None:
+            return titles
+
+        after_key = next_key
+
+
+class TestSortedIndex(unittest.TestCase):
+    def test_bulk_and_single_additions(self):
+        """Test that keys added in bulk or one by one come out sorted."""
+        index = SortedIndex("price")
+
+        for i in range(SortedIndex.BULK_THRESHOLD * 2):
+            index.add(f"place-{i:03}", float(i % 10))
+        index.count()
+
+        index.add("place-new", 4.5)
+        index.add("place-000", 9.5)
+        index.remove("place-001")
+
+        keys = list(index.walk())
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(keys), SortedIndex.BULK_THRESHOLD * 2)
+        self.assertEqual(keys[-1], (9.5, "place-000"))
+
+    def test_ranges_and_walks(self):
+        """Test counts, lookups and walks in both directions within bounds."""
+        index = SortedIndex("price")
+        for obj_id, price in (("a", 10.0), ("b", 20.0), ("c", 20.0), ("d", 30.0), ("e", None)):
+            index.add(obj_id, price)
+
+        self.assertEqual(index.count(15, 30), 3)
+        self.assertEqual(index.lookup(20.0), ["b", "c"])
+        self.assertEqual(index.lookup_range(high=20), ["a", "b", "c"])
+        self.assertEqual(list(index.walk(after=(20.0, "b"))), [(20.0, "c"), (30.0, "d"), (None, "e")])
+        self.assertEqual(list(index.walk(after=(20.0, "c"), descending=True, low=15)), [(20.0, "b")])
+        self.assertEqual(index.key_of("e"), (None, "e"))
+        self.assertIsNone(index.key_of("f"))
+
+    def test_missing_values_come_last(self):
+        """Test that objects without a value are walked last by id, in both directions, unless bounded."""
+        index = SortedIndex("average_rating")
+        for obj_id, rating in (("a", 4.0), ("b", None), ("c", 3.0), ("d", None)):
+            index.add(obj_id, rating)
+
+        self.assertEqual(list(index.walk(descending=True)), [(4.0, "a"), (3.0, "c"), (None, "b"), (None, "d")])
+        self.assertEqual(list(index.walk(after=(3.0, "c"))), [(4.0, "a"), (None, "b"), (None, "d")])
+        self.assertEqual(list(index.walk(after=(None, "b"), descending=True)), [(None, "d")])
+        self.assertEqual(list(index.walk(low=0)), [(3.0, "c"), (4.0, "a")])
+        self.assertEqual(index.lookup_range(), ["c", "a"])
+
+        index.add("b", 5.0)
+        index.remove("d")
+        self.assertEqual(list(index.walk()), [(3.0, "c"), (4.0, "a"), (5.0, "b")])
+
+
+class TestMemorySortedPages(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+        self.repo = InMemoryRepository(PLACE_INDEXES, PlaceRecord)
+        self.places = add_places(self.repo)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def expected(self, repo, attr_name, descending=False, bounds=None):
+        """Titles in the order of the sorting fallback of the base repository."""
+        objs, _ = Repository.get_sorted_page(repo, attr_name, None, len(self.places), descending, bounds)
+        return [obj.title for obj in objs]
+
+    def test_pages_follow_the_order(self):
+        """Test price and rating pages, with and without a price range."""
+        for attr_name, descending, bounds in (
+            ("price", False, None),
+            ("price", True, {"price": (20, 60)}),
+            ("average_rating", True, None),
+            ("average_rating", False, None),
+            ("average_rating", True, {"price": (30, 30)}),
+            ("created_at", False, {"price": (None, 40)}),
+        ):
+            for limit in (4, 7):
+                self.assertEqual(read_sorted_pages(self.repo, attr_name, limit, descending, bounds),
+                                 self.expected(self.repo, attr_name, descending, bounds))
+
+    def test_unrated_places_come_last(self):
+        """Test that places without reviews are listed by rating after the rated ones."""
+        titles = read_sorted_pages(self.repo, "average_rating", 6, descending=True)
+        unrated = {place.title for place in self.places if place.average_rating is None}
+
+        self.assertEqual(len(titles), 30)
+        self.assertEqual(set(titles[20:]), unrated)
+        self.assertIn("Place 0", unrated)
+
+    def test_selective_range_skips_the_walk(self):
+        """Test that a narrow price range is answered from the price index."""
+        rating_index = self.repo._indexes["average_rating"]
+
+        with patch.object(rating_index, 'walk', wraps=rating_index.walk) as walk:
+            objs, _ = self.repo.get_sorted_page("average_rating", None, 10, True, {"price": (30, 30)})
+
+        walk.assert_not_called()
+        self.assertTrue(objs)
+        self.assertTrue(all(obj.price == 30 for obj in objs))
+
+    def test_index_follows_updates(self):
+        """Test that updated and deleted places move in the sorted pages."""
+        cheapest = self.repo.get_sorted_page("price", None, 1)[0][0]
+
+        self.repo.update(cheapest.id, {"price": 1000.0})
+        self.repo.delete(self.places[1].id)
+
+        self.assertEqual(self.repo.get_sorted_page("price", None, 1, True)[0][0].id, cheapest.id)
+        self.assertEqual(read_sorted_pages(self.repo, "price", 7), self.expected(self.repo, "price"))
+
+    def test_file_records_are_listed_from_raw_values(self):
+        """Test sorted pages of the in-file repository once reloaded."""
+        repo = InFileRepository("place_data.json", PLACE_INDEXES, data_dir=self.data_dir)
+        add_places(repo)
+        repo.save_to_file()
+
+        reloaded = InFileRepository("place_data.json", PLACE_INDEXES, data_dir=self.data_dir)
+
+        self.assertEqual(read_sorted_pages(reloaded, "price", 6, bounds={"price": (10, 50)}),
+                         self.expected(reloaded, "price", bounds={"price": (10, 50)}))
+
+    def test_facade_cursors(self):
+        """Test that the facade pages cursors by sort and refuses one of another sort."""
+        facade = PlaceFacade(self.repo)
+
+        places, cursor = facade.get_places_page(None, 5, sort="price", min_price=20, max_price=60)
+        more, _ = facade.get_places_page(cursor, 5, sort="price", min_price=20, max_price=60)
+
+        prices = [place["price"] for place in places + more]
+        self.assertEqual(prices, sorted(prices))
+        self.assertTrue(all(20 <= price <= 60 for price in prices))
+
+        rated, seen, cursor = [], set(), None
+        while True:
+            places, cursor = facade.get_places_page(cursor, 7, sort="rating")
+            rated.extend(place["average_rating"] for place in places)
+            seen.update(place["id"] for place in places)
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), len(self.places))
+        self.assertEqual(rated[20:], [None] * 10)
+
+        with self.assertRaises(ValueError):
+            facade.get_places_page(facade.get_places_page(None, 5, sort="price")[1], 5, sort="rating")
+        with self.assertRaises(ValueError):
+            facade.get_places_page(None, 5, sort="title")
+        with self.assertRaises(ValueError):
+            facade.get_places_page(None, 5, min_price=60, max_price=20)
+
+
+class TestSQLAlchemySortedPages(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo = SQLAlchemyRepository(Place)
+        self.places = add_places(self.repo)
+
+    def test_sql_pages(self):
+        """Test that keyset pages over the sort indexes match the sorted objects."""
+        for attr_name, descending, bounds in (
+            ("price", False, {"price": (20, 60)}),
+            ("average_rating", True, None),
+            ("average_rating", False, {"price": (None, 50)}),
+            ("created_at", False, {"price": (None, 40)}),
+        ):
+            objs, _ = Repository.get_sorted_page(self.repo, attr_name, None, len(self.places), descending, bounds)
+
+            for limit in (4, 7):
+                self.assertEqual(read_sorted_pages(self.repo, attr_name, limit, descending, bounds),
+                                 [obj.title for obj in objs])
+
+        self.assertEqual(len(read_sorted_pages(self.repo, "average_rating", 7, True)), len(self.places))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# test_unit_of_work.py
+
+import unittest
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import unit_of_work, in_unit_of_work
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.services.facade_user import UserFacade
+from app.services.facade_place import PlaceFacade
+from app.services.facade_review import ReviewFacade
+from app.services.facade_amenity import AmenityFacade
+from app.services.sqlalchemy_facade_relation_manager import SQLAlchemyFacadeRelationManager
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+class TestUnitOfWork(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # Count the commits of the session
+        self.commits = 0
+        sa.event.listen(db.session, "after_commit", self.count_commit)
+
+        self.repo = SQLAlchemyRepository(Amenity)
+
+    def tearDown(self):
+        sa.event.remove(db.session, "after_commit", self.count_commit)
+        super().tearDown()
+
+    def count_commit(self, session):
+        """Count the commits of the session."""
+        self.commits += 1
+
+    def test_single_commit(self):
+        """Test that repository writes inside a unit of work commit once."""
+        with unit_of_work():
+            wifi = Amenity(name="WiFi")
+            self.repo.add(wifi)
+            self.repo.add(Amenity(name="Sauna"))
+            self.repo.update(wifi.id, {"name": "Fast WiFi"})
+
+            with unit_of_work():
+                self.repo.add(Amenity(name="Pool"))
+
+            self.assertTrue(in_unit_of_work())
+            self.assertEqual(self.commits, 0)
+
+        self.assertFalse(in_unit_of_work())
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(sorted(amenity.name for amenity in self.repo.get_all()), ["Fast WiFi", "Pool", "Sauna"])
+
+    def test_rollback_on_error(self):
+        """Test that an error undoes every write of the unit of work."""
+        self.repo.add(Amenity(name="WiFi"))
+
+        with self.assertRaises(ValueError):
+            with unit_of_work():
+                self.repo.add(Amenity(name="Sauna"))
+                self.repo.delete_many([amenity.id for amenity in self.repo.get_all()])
+                raise ValueError("boom")
+
+        self.assertEqual([amenity.name for amenity in self.repo.get_all()], ["WiFi"])
+
+    def test_relation_manager_operations(self):
+        """Test that relation manager operations commit once each."""
+        user_repo, place_repo = SQLAlchemyRepository(User), SQLAlchemyRepository(Place)
+        review_repo = SQLAlchemyRepository(Review)
+        manager = SQLAlchemyFacadeRelationManager(
+            UserFacade(user_repo), PlaceFacade(place_repo), AmenityFacade(self.repo), ReviewFacade(review_repo)
+        )
+        user = User(first_name="John", last_name="Doe", email="john@example.com", password="secret")
+        user_repo.add(user)
+        self.commits = 0
+
+        place = manager.create_place_for_user(user.id, {
+            "title": "Chez John", "description": "Nice", "price": 100.0, "latitude": 10.0, "longitude": 20.0
+        })
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(user_repo.get(user.id).places, [place["id"]])
+
+        reviewer = User(first_name="Jane", last_name="Doe", email="jane@example.com", password="secret")
+        user_repo.add(reviewer)
+        manager.create_review_for_place(place["id"], user.id, {"text": "Great", "rating": 5})
+        manager.create_review_for_place(place["id"], reviewer.id, {"text": "Good", "rating": 4})
+        self.commits = 0
+
+        manager.delete_user_and_associated_instances(user.id)
+        self.assertEqual(self.commits, 1)
+        self.assertEqual((user_repo.get_all(), place_repo.get_all(), review_repo.get_all()), ([reviewer], [], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
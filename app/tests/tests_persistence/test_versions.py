@@ -0,0 +1,112 @@
+# test_versions.py
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.persistence.repository import InMemoryRepository, InFileRepository, SQLAlchemyRepository
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity
+from app.models.records import AmenityRecord
+from app.services.facade_user import UserFacade
+from app.services.facade_place import PlaceFacade
+from app.services.facade_review import ReviewFacade
+from app.services.facade_amenity import AmenityFacade
+from app.services.sqlalchemy_facade_relation_manager import SQLAlchemyFacadeRelationManager
+from app.tests.tests_persistence.base_test import SQLiteTestCase
+
+
+class TestMemoryVersions(unittest.TestCase):
+    def setUp(self):
+        # Every test works in its own data directory
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_version_follows_updates(self):
+        """Test that updating an object changes its version."""
+        repo = InMemoryRepository({"name": True}, AmenityRecord)
+        wifi = repo.add(Amenity(name="WiFi"))
+        version = repo.get_version(wifi.id)
+
+        repo.update(wifi.id, {"name": "Fast WiFi"})
+
+        self.assertNotEqual(repo.get_version(wifi.id), version)
+        self.assertIsNone(repo.get_version("unknown"))
+
+    def test_version_read_without_hydration(self):
+        """Test that the in-file repository reads the version of a stored record as is."""
+        repo = InFileRepository("amenity_data.json", {"name": True}, data_dir=self.data_dir)
+        wifi = Amenity(name="WiFi")
+        repo.add(wifi)
+        repo.save_to_file()
+
+        reloaded = InFileRepository("amenity_data.json", {"name": True}, data_dir=self.data_dir)
+
+        with patch.object(reloaded, 'dict_to_obj') as dict_to_obj:
+            self.assertEqual(reloaded.get_version(wifi.id), wifi.updated_at.isoformat())
+
+        dict_to_obj.assert_not_called()
+
+
+class TestSQLAlchemyVersions(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # Starting with one place
+        self.user_repo, self.place_repo = SQLAlchemyRepository(User), SQLAlchemyRepository(Place)
+        self.manager = SQLAlchemyFacadeRelationManager(
+            UserFacade(self.user_repo), PlaceFacade(self.place_repo),
+            AmenityFacade(SQLAlchemyRepository(Amenity)), ReviewFacade(SQLAlchemyRepository(Review), self.place_repo)
+        )
+        owner = User(first_name="John", last_name="Doe", email="john@example.com", password="secret")
+        self.user_repo.add(owner)
+        self.place_id = self.manager.create_place_for_user(owner.id, {
+            "title": "Chez John", "description": "Nice", "price": 100.0, "latitude": 10.0, "longitude": 20.0
+        })["id"]
+
+    def test_version_is_one_query(self):
+        """Test that the version is probed with a single SELECT of the version columns."""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.session.expunge_all()
+        sa.event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            self.place_repo.get_version(self.place_id)
+        finally:
+            sa.event.remove(db.engine, "before_cursor_execute", record)
+
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn("description", statements[0])
+
+    def test_place_version_follows_reviews_and_amenities(self):
+        """Test that the place version changes with its reviews and amenities."""
+        versions = [self.place_repo.get_version(self.place_id)]
+
+        reviewer = User(first_name="Jane", last_name="Doe", email="jane@example.com", password="secret")
+        self.user_repo.add(reviewer)
+        review = self.manager.create_review_for_place(self.place_id, reviewer.id, {"text": "Nice", "rating": 5})
+        versions.append(self.place_repo.get_version(self.place_id))
+
+        self.manager.add_amenity_to_a_place(self.place_id, {"name": "WiFi"})
+        versions.append(self.place_repo.get_version(self.place_id))
+
+        self.manager.delete_review_from_place_list(review["id"], self.place_id)
+        versions.append(self.place_repo.get_version(self.place_id))
+
+        self.assertEqual(len(set(versions)), 4)
+        self.assertIsNone(self.place_repo.get_version("unknown"))
+
+
+if __name__ == '__main__':
+    unittest.main()
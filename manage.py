@@ -1,7 +1,20 @@
+import os
+
+import click
+from flask import current_app
 from flask.cli import FlaskGroup
 from app import create_app
 from app.extensions import db
 from app.models.user import User
+from app.persistence.repository import InFileRepository
+from app.persistence.snapshot import SNAPSHOT_FORMATS, convert_snapshot
+from app.persistence.migrations import (
+    migrate_place_amenities, migrate_place_reviews, rebuild_place_ratings, create_missing_indexes,
+    create_search_tables
+)
+from app.persistence.query_plans import full_scans
+
+DATA_FILES = ("user_data", "place_data", "amenity_data", "review_data")
 
 def create_my_app():
     """Factory function to create the Flask app."""
@@ -35,6 +48,83 @@ def create_superuser():
 
     print(f"Superuser {email} created successfully.")
 
+@cli.command("convert_snapshots", with_appcontext=False)
+@click.argument("snapshot_format", type=click.Choice(SNAPSHOT_FORMATS))
+@click.option("--data-dir", default=InFileRepository.DATA_DIR, help="Directory of the data files.")
+def convert_snapshots(snapshot_format, data_dir):
+    """Convert the in-file repository snapshots to JSON or binary."""
+    source_extension, destination_extension = (".json", ".bin") if snapshot_format == "binary" else (".bin", ".json")
+
+    for data_file in DATA_FILES:
+        source_path = os.path.join(data_dir, data_file + source_extension)
+
+        if not os.path.exists(source_path):
+            print(f"Skipping {source_path}: file not found.")
+            continue
+
+        destination_path = os.path.join(data_dir, data_file + destination_extension)
+        count = convert_snapshot(source_path, destination_path, snapshot_format)
+        print(f"{count} objects converted from {source_path} to {destination_path}")
+
+@cli.command("migrate_place_amenities")
+@click.option("--drop-json-column", is_flag=True, help="Drop the former places.amenities JSON column.")
+def migrate_place_amenities_command(drop_json_column):
+    """Move the place amenities from the JSON column to the place_amenities table."""
+    count = migrate_place_amenities(drop_json_column)
+    print(f"{count} place amenities migrated to the place_amenities table.")
+
+@cli.command("migrate_place_reviews")
+@click.option("--drop-json-column", is_flag=True, help="Drop the former places.reviews JSON column.")
+def migrate_place_reviews_command(drop_json_column):
+    """Index the reviews by place_id, which replaces the places.reviews JSON column."""
+    if migrate_place_reviews(drop_json_column):
+        print("Reviews are now looked up by their indexed place_id.")
+    else:
+        print("Nothing to migrate.")
+
+@cli.command("rebuild_place_ratings")
+def rebuild_place_ratings_command():
+    """Recompute the review count, rating sum and histogram of every place."""
+    if current_app.config.get('REPO_TYPE') == 'in_DB':
+        count = rebuild_place_ratings()
+    else:
+        facade = current_app.extensions['HBNB_FACADE']
+        count = facade.place_facade.rebuild_ratings(facade.review_facade.review_repo.iter_all())
+        facade.place_facade.place_repo.flush()
+
+    print(f"Rating aggregates corrected on {count} places.")
+
+@cli.command("create_indexes")
+def create_indexes():
+    """Create the indexes of the models missing from the database."""
+    created = create_missing_indexes()
+    print(f"{len(created)} indexes created: {', '.join(created)}" if created else "All indexes exist.")
+
+@cli.command("create_search_index")
+@click.option("--rebuild", is_flag=True, help="Index every row again, needed after a VACUUM.")
+def create_search_index(rebuild):
+    """Create the full-text search tables missing from the database (SQLite only)."""
+    indexed = create_search_tables(rebuild)
+
+    if indexed is None:
+        print("The database does not support FTS5: places are searched without a full-text index.")
+    else:
+        print(f"{len(indexed)} search tables indexed: {', '.join(indexed)}" if indexed else "All search tables exist.")
+
+@cli.command("check_query_plans")
+def check_query_plans():
+    """Fail if a repository lookup scans a whole table (SQLite only)."""
+    scans = full_scans()
+
+    for description, statement, detail in scans:
+        print(f"{description}: {detail}\n    {statement}")
+
+    if scans:
+        print(f"{len(scans)} repository lookups scan a whole table.")
+        raise SystemExit(1)
+
+    print("Every repository lookup uses an index.")
+
 if __name__ == "__main__":
     cli()
 